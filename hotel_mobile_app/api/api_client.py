@@ -1,10 +1,19 @@
 import requests
 import json
+import copy
+import threading
 from typing import Optional, Dict, List, Any
+from urllib.parse import urlsplit
 from datetime import datetime, timedelta
+from kivy.clock import Clock
 from kivy.storage.jsonstore import JsonStore
 
-from config import API_BASE_URL, API_ENDPOINTS, STORAGE_PATH
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from config import API_BASE_URL, API_ENDPOINTS, LIST_FIELDS, STORAGE_PATH, USE_MSGPACK
 from .models import User, Hotel, RoomType, Booking, Payment, CancellationPolicy, SearchFilters
 
 class APIClient:
@@ -17,6 +26,12 @@ class APIClient:
         self.user = None
         self.store = JsonStore(f'{STORAGE_PATH}/app_data.json')
         
+        # Réponses GET déjà reçues, revalidées par ETag (304 = rien à retélécharger)
+        self._etag_cache = {}
+        
+        # Lien `next` de la dernière liste arrêtée par max_pages (None: liste complète)
+        self.truncated_next = None
+        
         # Charger le token et les données utilisateur depuis le stockage local
         self._load_auth_data()
     
@@ -54,6 +69,8 @@ class APIClient:
             'Content-Type': 'application/json',
             'Accept': 'application/json',
         }
+        if USE_MSGPACK and msgpack is not None:
+            headers['Accept'] = 'application/msgpack, application/json;q=0.9'
         if self.token:
             headers['Authorization'] = f'Bearer {self.token}'
         return headers
@@ -63,6 +80,13 @@ class APIClient:
         url = f"{self.base_url}{endpoint}"
         headers = self._get_headers()
         
+        cache_key = None
+        if method == 'GET':
+            params = kwargs.get('params') or {}
+            cache_key = (url, tuple(sorted((k, str(v)) for k, v in params.items())), self.token)
+            if cache_key in self._etag_cache:
+                headers['If-None-Match'] = self._etag_cache[cache_key][0]
+        
         try:
             response = requests.request(
                 method=method,
@@ -77,8 +101,15 @@ class APIClient:
                 self._clear_auth_data()
                 return None
             
+            if response.status_code == 304 and cache_key in self._etag_cache:
+                # Copie: les appelants modifient les données reçues
+                return copy.deepcopy(self._etag_cache[cache_key][1])
+            
             if response.status_code in [200, 201]:
-                return response.json()
+                result = self._decode(response)
+                if cache_key and response.headers.get('ETag'):
+                    self._etag_cache[cache_key] = (response.headers['ETag'], copy.deepcopy(result))
+                return result
             else:
                 print(f"API Error {response.status_code}: {response.text}")
                 return None
@@ -86,10 +117,43 @@ class APIClient:
         except requests.exceptions.RequestException as e:
             print(f"Network error: {e}")
             return None
-        except json.JSONDecodeError as e:
-            print(f"JSON decode error: {e}")
+        except ValueError as e:
+            # JSON ou MessagePack invalide
+            print(f"Decode error: {e}")
             return None
     
+    def _get_all(self, endpoint: str, params: Optional[Dict] = None, max_pages: int = 20) -> Optional[List]:
+        """GET d'une liste paginée: suit les liens `next` (curseurs) et concatène les pages.
+        
+        Au-delà de max_pages, la liste est tronquée: le lien de la page
+        suivante reste dans self.truncated_next pour la reprendre.
+        """
+        items = []
+        self.truncated_next = None
+        for _ in range(max_pages):
+            result = self._make_request('GET', endpoint, params=params)
+            if result is None:
+                return items or None
+            if isinstance(result, list):
+                # Liste non paginée
+                return items + result
+            items.extend(result.get('results', []))
+            if not result.get('next'):
+                break
+            # Le lien porte déjà les paramètres et le curseur; l'hôte peut différer de base_url
+            next_url = urlsplit(result['next'])
+            endpoint, params = f'{next_url.path}?{next_url.query}', None
+        else:
+            self.truncated_next = result['next']
+            print(f"Liste tronquée après {max_pages} pages ({len(items)} éléments), suite: {result['next']}")
+        return items
+    
+    def _decode(self, response):
+        """Décode le corps selon le format renvoyé par le serveur"""
+        if response.headers.get('Content-Type', '').startswith('application/msgpack'):
+            return msgpack.unpackb(response.content, raw=False)
+        return response.json()
+    
     # ===== AUTHENTIFICATION =====
     
     def login(self, username: str, password: str) -> Optional[User]:
@@ -149,8 +213,9 @@ class APIClient:
     # ===== HOTELS =====
     
     def get_hotels(self, filters: Optional[Dict] = None) -> Optional[List[Hotel]]:
-        params = filters or {}
-        result = self._make_request('GET', self.endpoints['hotels'], params=params)
+        params = {'fields': LIST_FIELDS['hotels']}
+        params.update(filters or {})
+        result = self._get_all(self.endpoints['hotels'], params=params)
     
         if result:
             hotels = []
@@ -179,6 +244,18 @@ class APIClient:
     
         return None
     
+    def get_hotels_near(self, latitude: float, longitude: float, radius_km: float = 10,
+                        filters: Optional[Dict] = None) -> Optional[List[Hotel]]:
+        """Hôtels dans un rayon, du plus proche au plus loin (distance calculée par le serveur)"""
+        params = dict(filters or {})
+        params.update({'near': f'{latitude},{longitude}', 'radius_km': radius_km})
+        return self.get_hotels(params)
+    
+    def suggest(self, query: str, limit: int = 5) -> Dict[str, List[Dict]]:
+        """Autocomplétion: {'cities': [{name, hotels}], 'hotels': [{id, name, city}]}, les plus populaires d'abord"""
+        result = self._make_request('GET', self.endpoints['suggest'], params={'q': query, 'limit': limit})
+        return result or {'cities': [], 'hotels': []}
+    
     def get_hotel(self, hotel_id: int) -> Optional[Hotel]:
         """Récupère les détails d'un hôtel"""
         endpoint = self.endpoints['hotel_detail'].format(id=hotel_id)
@@ -202,7 +279,7 @@ class APIClient:
         
         if result:
             rooms = []
-            for room_data in result:
+            for room_data in result['results']:
                 room = RoomType(**room_data)
                 
                 # Gérer les images
@@ -214,6 +291,20 @@ class APIClient:
         
         return None
     
+    def search_flexible_dates(self, filters: SearchFilters, date_from: str, date_to: str,
+                              nights: int) -> Optional[List[Dict]]:
+        """Séjours de `nights` nuits les moins chers entre date_from et date_to (un seul appel).
+        
+        Chaque type de chambre renvoyé contient `cheapest_stays`:
+        [{'check_in', 'check_out', 'total_price', 'rooms_left'}, ...]
+        """
+        data = filters.to_dict()
+        data.pop('check_in', None)
+        data.pop('check_out', None)
+        data.update({'date_from': date_from, 'date_to': date_to, 'nights': nights})
+        result = self._make_request('POST', self.endpoints['search'], json=data)
+        return result['results'] if result else None
+    
     def get_hotel_rooms(self, hotel_id: int) -> Optional[List[RoomType]]:
         """Récupère les chambres d'un hôtel"""
         # Note: Cet endpoint doit être ajouté à votre API Django
@@ -234,11 +325,25 @@ class APIClient:
         
         return None
     
+    def get_hotel_availability(self, hotel_id: int, date_from: str, date_to: str) -> Optional[Dict]:
+        """Calendrier de disponibilité par nuit pour tous les types de chambre d'un hôtel"""
+        endpoint = self.endpoints['hotel_availability'].format(id=hotel_id)
+        params = {'from': date_from, 'to': date_to}
+        return self._make_request('GET', endpoint, params=params)
+    
+    def get_quotes(self, items: List[Dict]) -> Optional[List[Dict]]:
+        """Disponibilité et prix total (tarifs par date) de plusieurs séjours en un appel.
+        
+        items: [{'room_type': id, 'check_in': 'AAAA-MM-JJ', 'check_out': 'AAAA-MM-JJ', 'rooms': n}, ...]
+        """
+        return self._make_request('POST', self.endpoints['quotes'], json=items)
+    
     # ===== RESERVATIONS =====
     
     def get_my_bookings(self) -> Optional[List[Booking]]:
-        """Récupère les réservations de l'utilisateur"""
-        result = self._make_request('GET', self.endpoints['my_bookings'])
+        """Récupère les réservations de l'utilisateur (champs affichés par les listes uniquement)"""
+        params = {'fields': LIST_FIELDS['my_bookings']}
+        result = self._get_all(self.endpoints['my_bookings'], params=params)
         
         if result:
             bookings = []
@@ -262,6 +367,10 @@ class APIClient:
         
         return None
     
+    def get_spending_summary(self, months: int = 6) -> Optional[Dict]:
+        """Résumé des dépenses (totaux et montant par mois), calculé par le serveur"""
+        return self._make_request('GET', self.endpoints['my_bookings_summary'], params={'months': months})
+    
     def get_booking(self, booking_id: int) -> Optional[Booking]:
         """Récupère les détails d'une réservation"""
         endpoint = self.endpoints['booking_detail'].format(id=booking_id)
@@ -349,4 +458,19 @@ class APIClient:
             return False
 
 # Instance globale du client API
-api_client = APIClient()
\ No newline at end of file
+api_client = APIClient()
+
+def call_in_background(func, callback, *args, **kwargs):
+    """Appelle func(*args, **kwargs) hors du thread de l'interface, puis callback(résultat) sur celui-ci.
+    
+    Le résultat est None en cas d'erreur réseau.
+    """
+    def run():
+        try:
+            result = func(*args, **kwargs)
+        except requests.exceptions.RequestException as e:
+            print(f"Network error: {e}")
+            result = None
+        Clock.schedule_once(lambda dt: callback(result))
+    
+    threading.Thread(target=run, daemon=True).start()
\ No newline at end of file
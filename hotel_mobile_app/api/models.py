@@ -83,6 +83,8 @@ class Hotel:
     # Coordonnées
     latitude: Optional[float] = None
     longitude: Optional[float] = None
+    # Distance (km) au point recherché, renvoyée par ?near=
+    distance_km: Optional[float] = None
     
     # Images
     images: List[str] = field(default_factory=list)
@@ -236,6 +238,11 @@ class SearchFilters:
     stars: Optional[int] = None
     number_of_rooms: int = 1
     number_of_guests: int = 2
+    # Autour d'un point: "lat,lon" et rayon en km
+    near: Optional[str] = None
+    radius_km: Optional[float] = None
+    # Équipements requis, ex: "wifi,pool,balcony"
+    amenities: Optional[str] = None
     
     def to_dict(self) -> dict:
         """Convertit en dictionnaire pour l'API"""
@@ -252,6 +259,12 @@ class SearchFilters:
             data['max_price'] = self.max_price
         if self.stars:
             data['stars'] = self.stars
+        if self.near:
+            data['near'] = self.near
+            if self.radius_km:
+                data['radius_km'] = self.radius_km
+        if self.amenities:
+            data['amenities'] = self.amenities
         data['number_of_rooms'] = self.number_of_rooms
         data['number_of_guests'] = self.number_of_guests
         return data
\ No newline at end of file
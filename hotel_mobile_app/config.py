@@ -12,12 +12,28 @@ API_ENDPOINTS = {
     'profile': '/api/auth/profile/',
     'hotels': '/api/hotels/',
     'hotel_detail': '/api/hotels/{id}/',
+    'hotel_availability': '/api/hotels/{id}/availability/',
     'search': '/api/hotels/search/',
+    'suggest': '/api/hotels/suggest/',
     'bookings': '/api/bookings/',
     'my_bookings': '/api/bookings/my-bookings/',
+    'my_bookings_summary': '/api/bookings/my-bookings/summary/',
     'booking_detail': '/api/bookings/{id}/',
     'process_payment': '/api/bookings/{id}/pay/',
     'cancellation_policies': '/api/bookings/hotel/{id}/cancellation-policies/',
+    'quotes': '/api/quotes/',
+}
+
+# Réponses en MessagePack plutôt qu'en JSON (plus compactes; nécessite le paquet msgpack)
+USE_MSGPACK = False
+
+# Champs demandés pour les listes (?fields=): seulement ce que les écrans affichent
+LIST_FIELDS = {
+    'hotels': 'id,name,city,country,stars,description,has_wifi,has_parking,has_pool,has_restaurant,latitude,longitude,distance_km',
+    'my_bookings': (
+        'id,check_in_date,check_out_date,number_of_rooms,number_of_guests,total_price,status,created_at,'
+        'room_type_details.id,room_type_details.name,room_type_details.hotel_name,room_type_details.hotel_city'
+    ),
 }
 
 # Configuration de l'application
@@ -10,7 +10,7 @@ from kivy.metrics import dp
 from kivy.clock import Clock
 from datetime import datetime, timedelta
 
-from api.api_client import api_client
+from api.api_client import api_client, call_in_background
 from utils.validators import validators
 from utils.helpers import helpers
 from config import COLORS
@@ -21,6 +21,9 @@ class CreateBookingScreen(Screen):
         self.name = 'create_booking'
         self.room_id = None
         self.room = None
+        self.rooms_left_by_date = None
+        self._quote_event = None
+        self._quote_key = None
         self._build_ui()
     
     def _build_ui(self):
@@ -89,9 +92,49 @@ class CreateBookingScreen(Screen):
         
         self.display_booking_form()
     
+    def load_availability(self):
+        """Charge une seule fois le calendrier de disponibilité de la chambre (6 mois)"""
+        self.rooms_left_by_date = None
+        if not self.room or not self.room.get('hotel_id'):
+            return
+        
+        today = datetime.now().date()
+        calendar = api_client.get_hotel_availability(
+            self.room['hotel_id'],
+            today.strftime('%Y-%m-%d'),
+            (today + timedelta(days=180)).strftime('%Y-%m-%d')
+        )
+        if not calendar:
+            return
+        
+        for room_type in calendar.get('room_types', []):
+            if room_type['id'] == self.room['id']:
+                self.rooms_left_by_date = dict(zip(calendar['dates'], room_type['rooms_left']))
+                break
+    
+    def rooms_left_for_stay(self, check_in, check_out):
+        """Chambres libres sur toutes les nuits du séjour (None si inconnu)"""
+        if self.rooms_left_by_date is None:
+            return None
+        try:
+            night = datetime.strptime(check_in, '%Y-%m-%d').date()
+            end = datetime.strptime(check_out, '%Y-%m-%d').date()
+        except (ValueError, TypeError):
+            return None
+        
+        left = self.room['quantity_available']
+        while night < end:
+            key = night.strftime('%Y-%m-%d')
+            if key not in self.rooms_left_by_date:
+                return None
+            left = min(left, self.rooms_left_by_date[key])
+            night += timedelta(days=1)
+        return left
+    
     def display_booking_form(self):
         """Affiche le formulaire de réservation"""
         self.content_layout.clear_widgets()
+        self.load_availability()
         
         # En-tête
         self.content_layout.add_widget(Label(
@@ -173,7 +216,7 @@ class CreateBookingScreen(Screen):
             multiline=False
         )
         self.check_in_input.text = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
-        self.check_in_input.bind(text=self.calculate_price)
+        self.check_in_input.bind(text=self.schedule_price)
         
         self.check_out_input = TextInput(
             hint_text='Départ',
@@ -182,7 +225,7 @@ class CreateBookingScreen(Screen):
             multiline=False
         )
         self.check_out_input.text = (datetime.now() + timedelta(days=10)).strftime('%Y-%m-%d')
-        self.check_out_input.bind(text=self.calculate_price)
+        self.check_out_input.bind(text=self.schedule_price)
         
         date_layout.add_widget(self.check_in_input)
         date_layout.add_widget(self.check_out_input)
@@ -202,7 +245,7 @@ class CreateBookingScreen(Screen):
             size_hint_x=0.5,
             font_size=dp(14)
         )
-        self.rooms_spinner.bind(text=self.calculate_price)
+        self.rooms_spinner.bind(text=self.schedule_price)
         
         self.guests_spinner = Spinner(
             text='2 personnes',
@@ -210,7 +253,6 @@ class CreateBookingScreen(Screen):
             size_hint_x=0.5,
             font_size=dp(14)
         )
-        self.guests_spinner.bind(text=self.calculate_price)
         
         details_layout.add_widget(self.rooms_spinner)
         details_layout.add_widget(self.guests_spinner)
@@ -303,33 +345,58 @@ class CreateBookingScreen(Screen):
         # Calcul initial du prix
         self.calculate_price()
     
+    def schedule_price(self, *args):
+        """Recalcule le prix après une courte pause dans la saisie (une seule demande de devis)"""
+        if self._quote_event:
+            self._quote_event.cancel()
+        self._quote_event = Clock.schedule_once(lambda dt: self.calculate_price(), 0.4)
+    
     def calculate_price(self, *args):
-        """Calcule le prix total"""
+        """Calcule le prix total: estimation locale immédiate, puis devis du serveur (tarifs par date)"""
+        rooms_text = self.rooms_spinner.text
+        rooms = int(rooms_text.split()[0]) if rooms_text else 1
+        
+        try:
+            check_in = datetime.strptime(self.check_in_input.text, '%Y-%m-%d')
+            check_out = datetime.strptime(self.check_out_input.text, '%Y-%m-%d')
+        except ValueError:
+            # Date en cours de saisie: pas de devis
+            self._show_price(0, 0, rooms)
+            return
+        
+        nights = (check_out - check_in).days
+        if nights <= 0 or not self.room:
+            self._show_price(0, max(nights, 0), rooms)
+            return
+        
+        self._show_price(self.room['price_per_night'] * nights * rooms, nights, rooms)
+        
+        key = (self.room['id'], self.check_in_input.text, self.check_out_input.text, rooms)
+        if key == self._quote_key:
+            return
+        self._quote_key = key
+        call_in_background(
+            api_client.get_quotes,
+            lambda quotes: self._apply_quote(key, quotes, nights, rooms),
+            [{'room_type': key[0], 'check_in': key[1], 'check_out': key[2], 'rooms': rooms}]
+        )
+    
+    def _apply_quote(self, key, quotes, nights, rooms):
+        # Réponse d'une saisie dépassée: ignorée
+        if key != self._quote_key:
+            return
         try:
-            check_in = self.check_in_input.text
-            check_out = self.check_out_input.text
-            
-            # Extraire le nombre de chambres
-            rooms_text = self.rooms_spinner.text
-            rooms = int(rooms_text.split()[0]) if rooms_text else 1
-            
-            nights = 0
-            total = 0
-            
-            if check_in and check_out:
-                try:
-                    check_in_date = datetime.strptime(check_in, '%Y-%m-%d')
-                    check_out_date = datetime.strptime(check_out, '%Y-%m-%d')
-                    nights = (check_out_date - check_in_date).days
-                    if nights > 0 and self.room:
-                        total = self.room['price_per_night'] * nights * rooms
-                except:
-                    pass
-            
-            self.price_label.text = f'Prix total: {helpers.format_price(total)}'
-            self.nights_label.text = f'{nights} nuits • {rooms} chambre(s)'
-        except Exception as e:
-            print(f"Erreur calcul prix: {e}")
+            total = quotes[0]['total_price']
+        except (TypeError, IndexError, KeyError):
+            # Pas de devis (erreur réseau ou réponse inattendue): l'estimation locale reste affichée
+            self._quote_key = None
+            return
+        if total is not None:
+            self._show_price(float(total), nights, rooms)
+    
+    def _show_price(self, total, nights, rooms):
+        self.price_label.text = f'Prix total: {helpers.format_price(total)}'
+        self.nights_label.text = f'{nights} nuits • {rooms} chambre(s)'
     
     def confirm_booking(self, instance):
         """Confirme la réservation"""
@@ -353,6 +420,12 @@ class CreateBookingScreen(Screen):
             self.show_error(f"Maximum {self.room['capacity'] * rooms} personnes pour {rooms} chambre(s)")
             return
         
+        # Vérifier la disponibilité avant d'envoyer la demande
+        left = self.rooms_left_for_stay(check_in, check_out)
+        if left is not None and rooms > left:
+            self.show_error("Pas assez de chambres disponibles pour ces dates")
+            return
+        
         # Désactiver le bouton
         instance.disabled = True
         instance.text = "Création en cours..."
@@ -121,6 +121,7 @@ class ModernHomeScreen(Screen):
         ]
         
         self.stat_cards = []
+        self.stat_values = []
         for stat in stats:
             card = ModernCard()
             card.padding = SPACING['md']
@@ -134,12 +135,13 @@ class ModernHomeScreen(Screen):
                 size_hint_y=None,
                 height=dp(30)
             ))
-            stat_layout.add_widget(Label(
+            value_label = Label(
                 text=f'[b]{stat["value"]}[/b]',
                 markup=True,
                 font_size=sp(FONT_SIZES['lg']),
                 color=(0.1, 0.1, 0.1, 1)
-            ))
+            )
+            stat_layout.add_widget(value_label)
             stat_layout.add_widget(Label(
                 text=stat['label'],
                 font_size=sp(FONT_SIZES['xs']),
@@ -149,6 +151,7 @@ class ModernHomeScreen(Screen):
             card.add_widget(stat_layout)
             stats_layout.add_widget(card)
             self.stat_cards.append(card)
+            self.stat_values.append(value_label)
         
         # Menu rapide
         quick_actions = BoxLayout(
@@ -271,9 +274,18 @@ class ModernHomeScreen(Screen):
             self.greeting_label.text = f'Bonjour {name} 👋'
     
     def load_stats(self):
-        """Charge les statistiques"""
-        # TODO: Implémenter le chargement des stats depuis l'API
-        pass
+        """Charge les statistiques (résumé agrégé par le serveur)"""
+        summary = api_client.get_spending_summary()
+        if not summary:
+            return
+        
+        values = [
+            summary['hotel_count'],
+            summary['booking_count'],
+            f"{float(summary['total_spent']):.0f}€",
+        ]
+        for label, value in zip(self.stat_values, values):
+            label.text = f'[b]{value}[/b]'
     
     def load_recommendations(self):
         """Charge les recommandations"""
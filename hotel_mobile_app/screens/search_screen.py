@@ -11,7 +11,7 @@ from kivy.metrics import dp
 from kivy.clock import Clock
 from datetime import datetime, timedelta
 
-from api.api_client import api_client
+from api.api_client import api_client, call_in_background
 from api.models import SearchFilters
 from components.hotel_card import HotelCard
 from utils.validators import validators
@@ -24,6 +24,9 @@ class SearchScreen(Screen):
         super().__init__(**kwargs)
         self.name = 'search'
         self.search_results = []
+        self._suggest_event = None
+        # Saisie dont on attend les suggestions (les réponses plus anciennes sont ignorées)
+        self._suggest_query = None
         self._build_ui()
     
     def _build_ui(self):
@@ -34,7 +37,7 @@ class SearchScreen(Screen):
         filter_layout = BoxLayout(
             orientation='vertical',
             size_hint_y=None,
-            height=dp(400),
+            height=dp(440),
             padding=dp(15),
             spacing=dp(10)
         )
@@ -58,8 +61,18 @@ class SearchScreen(Screen):
             multiline=False,
             background_color=(1, 1, 1, 0.9)
         )
+        self.city_input.bind(text=self._on_city_text)
         filter_layout.add_widget(self.city_input)
         
+        # Suggestions de villes (GET /api/hotels/suggest/)
+        self.suggestions_layout = BoxLayout(
+            orientation='horizontal',
+            spacing=dp(5),
+            size_hint_y=None,
+            height=dp(30)
+        )
+        filter_layout.add_widget(self.suggestions_layout)
+        
         # Dates
         date_layout = BoxLayout(
             orientation='horizontal',
@@ -227,6 +240,47 @@ class SearchScreen(Screen):
         
         self.add_widget(main_layout)
     
+    def _on_city_text(self, instance, text):
+        """Attend une courte pause dans la saisie avant de demander des suggestions"""
+        if self._suggest_event:
+            self._suggest_event.cancel()
+        self._suggest_event = Clock.schedule_once(lambda dt: self._load_suggestions(text), 0.2)
+    
+    def _load_suggestions(self, text):
+        self.suggestions_layout.clear_widgets()
+        query = text.strip()
+        self._suggest_query = query or None
+        if not query:
+            return
+        
+        # Hors du thread de l'interface: la saisie reste fluide pendant l'appel
+        call_in_background(api_client.suggest, lambda result: self._show_suggestions(query, result), query, limit=3)
+    
+    def _show_suggestions(self, query, result):
+        if query != self._suggest_query or not result:
+            return
+        
+        self.suggestions_layout.clear_widgets()
+        for city in result['cities']:
+            # Déjà saisie en entier: inutile de la proposer
+            if city['name'] == query:
+                continue
+            button = Button(
+                text=f"{city['name']} ({city['hotels']})",
+                font_size=dp(12),
+                background_color=COLORS['light'],
+                color=COLORS['dark']
+            )
+            button.bind(on_press=lambda btn, name=city['name']: self._pick_city(name))
+            self.suggestions_layout.add_widget(button)
+    
+    def _pick_city(self, name):
+        self.city_input.text = name
+        if self._suggest_event:
+            self._suggest_event.cancel()
+        self._suggest_query = None
+        self.suggestions_layout.clear_widgets()
+    
     def search_hotels(self, instance):
         """Recherche des hôtels avec les filtres"""
         # Désactiver le bouton
@@ -1,3 +1,39 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
+from .models import User
 
-# Create your tests here.
+class QueryCountTests(TestCase):
+    """Endpoints d'authentification: nombre de requêtes fixe"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='client', email='client@test.com', password='password123')
+    
+    def test_register(self):
+        data = {
+            'username': 'nouveau',
+            'email': 'nouveau@test.com',
+            'password': 'password123',
+            'password_confirm': 'password123',
+        }
+        # unicité du nom d'utilisateur + insertion
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.post('/api/auth/register/', data, format='json').status_code, 201)
+    
+    def test_login_and_refresh(self):
+        # utilisateur + session (créée puis enregistrée) + last_login, savepoints compris
+        with self.assertNumQueries(9):
+            response = self.client.post('/api/auth/login/', {'username': 'client', 'password': 'password123'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        
+        # vérification que l'utilisateur est toujours actif
+        with self.assertNumQueries(1):
+            response = self.client.post('/api/auth/token/refresh/', {'refresh': response.data['refresh']}, format='json')
+        self.assertEqual(response.status_code, 200)
+    
+    def test_profile_and_logout(self):
+        self.client.force_authenticate(self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/auth/profile/').status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.post('/api/auth/logout/').status_code, 200)
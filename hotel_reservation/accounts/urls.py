@@ -1,5 +1,6 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
+from hotel_reservation.query_budget import query_budget
 from .views import RegisterView, LoginView, LogoutView, UserProfileView
 
 urlpatterns = [
@@ -7,5 +8,5 @@ urlpatterns = [
     path('login/', LoginView.as_view(), name='login'),
     path('logout/', LogoutView.as_view(), name='logout'),
     path('profile/', UserProfileView.as_view(), name='profile'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/refresh/', query_budget(POST=2)(TokenRefreshView.as_view()), name='token_refresh'),
 ]
\ No newline at end of file
@@ -5,12 +5,15 @@ from rest_framework.views import APIView
 from django.contrib.auth import login, logout
 from .serializers import UserSerializer, RegisterSerializer, LoginSerializer
 from .models import User
+from hotel_reservation.query_budget import query_budget
 
+@query_budget(POST=6)
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = RegisterSerializer
     permission_classes = [permissions.AllowAny]
 
+@query_budget(POST=6)
 class LoginView(APIView):
     permission_classes = [permissions.AllowAny]
     
@@ -29,11 +32,13 @@ class LoginView(APIView):
             })
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@query_budget(POST=4)
 class LogoutView(APIView):
     def post(self, request):
         logout(request)
         return Response({"message": "Déconnexion réussie"})
 
+@query_budget(GET=2, PUT=6, PATCH=6)
 class UserProfileView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
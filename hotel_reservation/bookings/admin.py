@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Booking, Payment, CancellationPolicy
+from .models import Booking, Payment, CancellationPolicy, RoomInventory, OutboxEmail
 
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
@@ -19,4 +19,17 @@ class PaymentAdmin(admin.ModelAdmin):
 @admin.register(CancellationPolicy)
 class CancellationPolicyAdmin(admin.ModelAdmin):
     list_display = ('hotel', 'days_before_checkin', 'penalty_percentage')
-    list_filter = ('hotel',)
\ No newline at end of file
+    list_filter = ('hotel',)
+
+@admin.register(RoomInventory)
+class RoomInventoryAdmin(admin.ModelAdmin):
+    list_display = ('room_type', 'date', 'rooms_sold', 'rooms_left')
+    list_filter = ('room_type__hotel',)
+    date_hierarchy = 'date'
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'booking__id')
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
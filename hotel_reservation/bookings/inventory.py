@@ -0,0 +1,198 @@
+from collections import defaultdict
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import F, Min
+from django.dispatch import Signal
+from hotels.models import RoomType
+from .models import Booking, InventoryVersion, RoomInventory
+
+# Envoyé après commit à chaque modification de l'inventaire
+# (arguments: room_type_id, hotel_id, check_in, check_out, rooms, version).
+# Après rebuild(), rooms et check_out valent None: tout l'inventaire à
+# partir de check_in a pu changer, pour le type de chambre donné ou pour
+# tous (room_type_id et hotel_id None).
+inventory_changed = Signal()
+
+# Statuts qui bloquent des chambres dans l'inventaire
+HOLDING_STATUSES = ('pending', 'confirmed')
+
+# Identifiant de l'unique ligne InventoryVersion
+VERSION_ID = 1
+
+class RoomsUnavailable(Exception):
+    """Pas assez de chambres libres sur au moins une nuit du séjour"""
+
+def version():
+    """Version courante de l'inventaire (une requête sur la clé primaire)"""
+    return InventoryVersion.objects.filter(pk=VERSION_ID).values_list('version', flat=True).first() or 0
+
+def bump_version():
+    """Incrémente la version après une écriture validée et renvoie la nouvelle valeur.
+    
+    Appelé hors de la transaction de la réservation (on_commit): le verrou
+    de la ligne ne dure que le temps de l'UPDATE. Si un autre processus
+    incrémente entre l'UPDATE et la lecture, la valeur renvoyée saute un
+    cran et l'appelant se croit en retard (reconstruction de trop, jamais
+    d'écriture manquée).
+    """
+    if not InventoryVersion.objects.filter(pk=VERSION_ID).update(version=F('version') + 1):
+        InventoryVersion.objects.get_or_create(pk=VERSION_ID, defaults={'version': 1})
+    return version()
+
+def stay_nights(check_in, check_out):
+    """Liste des nuits d'un séjour [check_in, check_out)"""
+    return [check_in + timedelta(days=i) for i in range((check_out - check_in).days)]
+
+def holds_inventory(booking):
+    """Indique si la réservation occupe des chambres"""
+    return booking.status in HOLDING_STATUSES
+
+def _ensure_nights(room_type, check_in, check_out):
+    """Crée les lignes d'inventaire manquantes pour le séjour"""
+    RoomInventory.objects.bulk_create([
+        RoomInventory(
+            room_type=room_type,
+            date=night,
+            rooms_sold=0,
+            rooms_left=room_type.quantity_available
+        )
+        for night in stay_nights(check_in, check_out)
+    ], ignore_conflicts=True)
+
+def adjust(room_type, check_in, check_out, rooms):
+    """Ajoute (ou retire si négatif) des chambres vendues sur chaque nuit du séjour.
+    
+    Une réservation ne passe que si chaque nuit a encore `rooms` chambres libres:
+    la mise à jour est conditionnelle et porte sur des lignes verrouillées,
+    sinon RoomsUnavailable est levée et rien n'est modifié.
+    
+    Portée des verrous: sur PostgreSQL / MySQL, select_for_update ne
+    verrouille que les nuits de ce type de chambre et les autres hôtels ne
+    sont pas bloqués. SQLite n'a pas de verrou de ligne (select_for_update
+    y est sans effet): avec transaction_mode IMMEDIATE, la transaction
+    prend le verrou d'écriture de toute la base dès BEGIN, si bien que
+    toutes les réservations, même d'hôtels différents, passent l'une après
+    l'autre. La transaction reste courte pour limiter l'attente.
+    """
+    nights = (check_out - check_in).days
+    
+    with transaction.atomic():
+        _ensure_nights(room_type, check_in, check_out)
+        stay = RoomInventory.objects.filter(
+            room_type=room_type,
+            date__gte=check_in,
+            date__lt=check_out
+        )
+        
+        # Verrouiller les nuits dans l'ordre des dates (pas d'interblocage entre séjours)
+        list(stay.select_for_update().order_by('date').values_list('id', flat=True))
+        
+        if rooms > 0:
+            stay = stay.filter(rooms_left__gte=rooms)
+        updated = stay.update(
+            rooms_sold=F('rooms_sold') + rooms,
+            rooms_left=F('rooms_left') - rooms
+        )
+        if updated != nights:
+            raise RoomsUnavailable(
+                f"Pas assez de chambres disponibles pour {room_type} du {check_in} au {check_out}"
+            )
+    
+    transaction.on_commit(lambda: inventory_changed.send(
+        sender=RoomInventory,
+        room_type_id=room_type.id,
+        hotel_id=room_type.hotel_id,
+        check_in=check_in,
+        check_out=check_out,
+        rooms=rooms,
+        version=bump_version()
+    ))
+
+def reserve(booking):
+    """Bloque les chambres d'une réservation dans l'inventaire"""
+    adjust(booking.room_type, booking.check_in_date, booking.check_out_date, booking.number_of_rooms)
+
+def release(booking):
+    """Libère les chambres d'une réservation (annulation, modification)"""
+    adjust(booking.room_type, booking.check_in_date, booking.check_out_date, -booking.number_of_rooms)
+
+def available_rooms(room_type, check_in, check_out):
+    """Nombre de chambres libres sur toutes les nuits du séjour"""
+    rooms_left = RoomInventory.objects.filter(
+        room_type=room_type,
+        date__gte=check_in,
+        date__lt=check_out
+    ).aggregate(Min('rooms_left'))['rooms_left__min']
+
+    # Les nuits sans ligne n'ont encore aucune chambre vendue
+    if rooms_left is None:
+        return room_type.quantity_available
+    return min(rooms_left, room_type.quantity_available)
+
+def resize(room_type, since=None):
+    """Recalcule les chambres restantes après un changement de quantity_available"""
+    rows = RoomInventory.objects.filter(room_type=room_type)
+    if since:
+        rows = rows.filter(date__gte=since)
+    rows.update(rooms_left=room_type.quantity_available - F('rooms_sold'))
+
+def rebuild(since, room_type_id=None, batch_size=5000):
+    """Recalcule l'inventaire à partir des réservations, pour les nuits à partir de `since`.
+    
+    Les lignes existantes sont remplacées: relancer donne le même résultat.
+    Suppression, lecture des réservations et réécriture forment une seule
+    transaction, si bien qu'une réservation validée pendant le recalcul
+    n'est pas perdue. inventory_changed est envoyé après commit.
+    Renvoie (nombre de nuits écrites, nombre de types de chambre).
+    """
+    room_types = RoomType.objects.all()
+    bookings = Booking.objects.filter(status__in=HOLDING_STATUSES, check_out_date__gt=since)
+    if room_type_id:
+        room_types = room_types.filter(id=room_type_id)
+        bookings = bookings.filter(room_type_id=room_type_id)
+    
+    with transaction.atomic():
+        quantities, hotels = {}, set()
+        for pk, quantity, hotel_id in room_types.values_list('id', 'quantity_available', 'hotel_id'):
+            quantities[pk] = quantity
+            hotels.add(hotel_id)
+        
+        # Supprimer avant de lire: les nuits supprimées restent verrouillées
+        # jusqu'au commit (SQLite: toute la base, dès BEGIN), les réservations
+        # concurrentes attendent la fin du recalcul
+        RoomInventory.objects.filter(room_type_id__in=quantities, date__gte=since).delete()
+        
+        # Chambres vendues par (type de chambre, nuit)
+        sold = defaultdict(int)
+        rows = bookings.values_list('room_type_id', 'check_in_date', 'check_out_date', 'number_of_rooms')
+        for booking_room_type, check_in, check_out, rooms in rows.iterator(chunk_size=batch_size):
+            night = max(check_in, since)
+            while night < check_out:
+                sold[(booking_room_type, night)] += rooms
+                night += timedelta(days=1)
+        
+        RoomInventory.objects.bulk_create(
+            (
+                RoomInventory(
+                    room_type_id=booking_room_type,
+                    date=night,
+                    rooms_sold=rooms,
+                    rooms_left=quantities[booking_room_type] - rooms
+                )
+                for (booking_room_type, night), rooms in sold.items()
+                if booking_room_type in quantities
+            ),
+            batch_size=batch_size
+        )
+    
+    # Calendriers, cache de recherche, matrices d'occupation et suggestions
+    transaction.on_commit(lambda: inventory_changed.send(
+        sender=RoomInventory,
+        room_type_id=room_type_id,
+        hotel_id=next(iter(hotels)) if room_type_id and hotels else None,
+        check_in=since,
+        check_out=None,
+        rooms=None,
+        version=bump_version()
+    ))
+    return len(sold), len(quantities)
@@ -0,0 +1,27 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from bookings import inventory
+
+class Command(BaseCommand):
+    help = "Recalcule l'inventaire par nuit à partir des réservations"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help="Première nuit à recalculer (AAAA-MM-JJ), par défaut aujourd'hui")
+        parser.add_argument('--room-type', type=int, help="Limiter à un type de chambre")
+        parser.add_argument('--batch-size', type=int, default=5000)
+    
+    def handle(self, *args, **options):
+        if options['since']:
+            try:
+                since = datetime.strptime(options['since'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError("Format de date invalide pour --since")
+        else:
+            since = timezone.now().date()
+        
+        nights, room_types = inventory.rebuild(since, options['room_type'], options['batch_size'])
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"Inventaire recalculé: {nights} nuit(s) pour {room_types} type(s) de chambre"
+        ))
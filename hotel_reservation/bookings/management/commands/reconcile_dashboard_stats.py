@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from bookings import stats
+
+class Command(BaseCommand):
+    help = "Recalcule les compteurs de la page d'accueil à partir des tables"
+    
+    def handle(self, *args, **options):
+        before = stats.get_stats()
+        after = stats.reconcile()
+        drift = {
+            field: getattr(after, field) - getattr(before, field)
+            for field in ('hotel_count', 'stars_total', 'room_count', 'booking_count')
+            if getattr(after, field) != getattr(before, field)
+        }
+        if drift:
+            self.stdout.write(self.style.WARNING(f"Écarts corrigés: {drift}"))
+        self.stdout.write(self.style.SUCCESS(f"Compteurs recalculés: {after}"))
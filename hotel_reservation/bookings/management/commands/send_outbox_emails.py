@@ -0,0 +1,24 @@
+import time
+from django.core.management.base import BaseCommand
+from bookings import outbox
+
+class Command(BaseCommand):
+    help = "Envoie les emails en attente de l'outbox par lots"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-attempts', type=int, help="Essais avant abandon (défaut: EMAIL_OUTBOX['MAX_ATTEMPTS'])")
+        parser.add_argument('--loop', action='store_true', help="Tourner en continu (worker)")
+        parser.add_argument('--interval', type=float, default=5, help="Pause en secondes quand l'outbox est vide")
+    
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = outbox.drain(options['batch_size'], options['max_attempts'])
+            if sent or failed:
+                self.stdout.write(f"{sent} email(s) envoyé(s), {failed} en échec")
+            
+            if not options['loop']:
+                break
+            # Lot plein: il reste probablement des emails, on enchaîne sans attendre
+            if sent + failed < options['batch_size']:
+                time.sleep(options['interval'])
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0001_initial'),
+        ('hotels', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomInventory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('rooms_sold', models.IntegerField(default=0)),
+                ('rooms_left', models.IntegerField()),
+                ('room_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory', to='hotels.roomtype')),
+            ],
+            options={
+                'verbose_name_plural': 'Room inventories',
+                'ordering': ['room_type', 'date'],
+                'constraints': [models.UniqueConstraint(fields=('room_type', 'date'), name='unique_room_type_night')],
+            },
+        ),
+    ]
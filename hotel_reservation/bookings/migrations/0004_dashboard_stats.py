@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_outbox_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hotel_count', models.IntegerField(default=0)),
+                ('stars_total', models.IntegerField(default=0)),
+                ('room_count', models.IntegerField(default=0)),
+                ('booking_count', models.IntegerField(default=0, help_text='Réservations confirmées')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Dashboard stats',
+            },
+        ),
+    ]
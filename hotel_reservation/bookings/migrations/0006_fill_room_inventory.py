@@ -0,0 +1,55 @@
+from collections import defaultdict
+from datetime import timedelta
+from django.db import migrations
+from django.utils import timezone
+
+# Copie figée de bookings.inventory à la date de cette migration
+# (la migration ne doit pas dépendre du code de l'application)
+HOLDING_STATUSES = ('pending', 'confirmed')
+
+
+def fill_inventory(apps, schema_editor):
+    # Les réservations antérieures au registre: sans cela, tout paraît libre
+    Booking = apps.get_model('bookings', 'Booking')
+    RoomInventory = apps.get_model('bookings', 'RoomInventory')
+    RoomType = apps.get_model('hotels', 'RoomType')
+    since = timezone.now().date()
+    
+    quantities = dict(RoomType.objects.values_list('id', 'quantity_available'))
+    RoomInventory.objects.filter(date__gte=since).delete()
+    
+    sold = defaultdict(int)
+    rows = Booking.objects.filter(status__in=HOLDING_STATUSES, check_out_date__gt=since).values_list(
+        'room_type_id', 'check_in_date', 'check_out_date', 'number_of_rooms'
+    )
+    for room_type_id, check_in, check_out, rooms in rows.iterator(chunk_size=5000):
+        night = max(check_in, since)
+        while night < check_out:
+            sold[(room_type_id, night)] += rooms
+            night += timedelta(days=1)
+    
+    RoomInventory.objects.bulk_create(
+        (
+            RoomInventory(
+                room_type_id=room_type_id,
+                date=night,
+                rooms_sold=rooms,
+                rooms_left=quantities[room_type_id] - rooms
+            )
+            for (room_type_id, night), rooms in sold.items()
+            if room_type_id in quantities
+        ),
+        batch_size=5000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_booking_user_created_idx'),
+        ('hotels', '0002_room_type_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_inventory, migrations.RunPython.noop),
+    ]
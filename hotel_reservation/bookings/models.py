@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from hotels.models import RoomType
 
 class Booking(models.Model):
@@ -29,6 +30,10 @@ class Booking(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Historique d'un utilisateur par plage de dates (résumé des dépenses)
+            models.Index(fields=['user', 'created_at'], name='booking_user_created_idx'),
+        ]
     
     def __str__(self):
         return f"Réservation {self.id} - {self.user.username}"
@@ -73,4 +78,84 @@ class CancellationPolicy(models.Model):
         ordering = ['days_before_checkin']
     
     def __str__(self):
-        return f"{self.hotel.name} - {self.days_before_checkin} jours: {self.penalty_percentage}%"
\ No newline at end of file
+        return f"{self.hotel.name} - {self.days_before_checkin} jours: {self.penalty_percentage}%"
+
+class RoomInventory(models.Model):
+    """Inventaire par nuit d'un type de chambre (chambres vendues / restantes)"""
+    room_type = models.ForeignKey(RoomType, on_delete=models.CASCADE, related_name='inventory')
+    date = models.DateField()
+    rooms_sold = models.IntegerField(default=0)
+    rooms_left = models.IntegerField()
+    
+    class Meta:
+        verbose_name_plural = "Room inventories"
+        ordering = ['room_type', 'date']
+        constraints = [
+            models.UniqueConstraint(fields=['room_type', 'date'], name='unique_room_type_night'),
+        ]
+    
+    def __str__(self):
+        return f"{self.room_type} - {self.date}: {self.rooms_left} restante(s)"
+
+class InventoryVersion(models.Model):
+    """Compteur des écritures d'inventaire (une seule ligne), partagé par tous les processus.
+    
+    Incrémenté après chaque écriture validée: une matrice d'occupation
+    construite sous une autre version sait qu'elle a manqué une écriture.
+    """
+    version = models.BigIntegerField(default=0)
+    
+    def __str__(self):
+        return f"Inventaire v{self.version}"
+
+class OutboxEmail(models.Model):
+    """Email en attente d'envoi, écrit dans la même transaction que la réservation"""
+    STATUS_CHOICES = [
+        ('pending', 'En attente'),
+        ('sending', 'En cours d\'envoi'),
+        ('retry', 'Nouvel essai prévu'),
+        ('sent', 'Envoyé'),
+        ('dead', 'Abandonné'),
+    ]
+    
+    booking = models.ForeignKey(Booking, on_delete=models.SET_NULL, null=True, blank=True, related_name='emails')
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
+
+class DashboardStats(models.Model):
+    """Compteurs de la page d'accueil (une seule ligne), tenus à jour par signaux.
+    
+    Recalculés par: python manage.py reconcile_dashboard_stats
+    """
+    hotel_count = models.IntegerField(default=0)
+    stars_total = models.IntegerField(default=0)
+    room_count = models.IntegerField(default=0)
+    booking_count = models.IntegerField(default=0, help_text="Réservations confirmées")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = "Dashboard stats"
+    
+    def __str__(self):
+        return f"{self.hotel_count} hôtel(s), {self.room_count} chambre(s), {self.booking_count} réservation(s)"
+    
+    @property
+    def avg_rating(self):
+        return self.stars_total / self.hotel_count if self.hotel_count else 0
@@ -0,0 +1,111 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import OutboxEmail
+
+# Statuts à (re)traiter par le worker ('sending' dont le bail a expiré: worker arrêté en cours d'envoi)
+DUE_STATUSES = ('pending', 'retry', 'sending')
+
+def _config():
+    return getattr(settings, 'EMAIL_OUTBOX', {})
+
+def enqueue(subject, message, recipients, from_email=None, booking=None):
+    """Enregistre un email à envoyer (une simple insertion dans la transaction courante)"""
+    return OutboxEmail.objects.create(
+        booking=booking,
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=[r for r in recipients if r],
+    )
+
+def backoff(attempts):
+    """Délai avant le prochain essai: exponentiel, plafonné"""
+    base = _config().get('RETRY_BASE_DELAY', 60)
+    cap = _config().get('RETRY_MAX_DELAY', 6 * 60 * 60)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), cap))
+
+def claim_batch(batch_size):
+    """Réserve un lot d'emails dus pour ce worker (transaction courte)"""
+    now = timezone.now()
+    lease = timedelta(seconds=_config().get('LEASE_SECONDS', 300))
+    
+    with transaction.atomic():
+        rows = OutboxEmail.objects.filter(
+            status__in=DUE_STATUSES,
+            next_attempt_at__lte=now
+        ).order_by('next_attempt_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            # Les autres workers sautent les lignes déjà réservées
+            rows = rows.select_for_update(skip_locked=True)
+        emails = list(rows[:batch_size])
+        OutboxEmail.objects.filter(id__in=[e.id for e in emails]).update(
+            status='sending',
+            next_attempt_at=now + lease
+        )
+    return emails
+
+def drain(batch_size=100, max_attempts=None):
+    """Envoie un lot d'emails sur une seule connexion SMTP réutilisée.
+    
+    Un échec programme un nouvel essai avec backoff exponentiel; après
+    `max_attempts` essais l'email passe à l'état 'dead'. Renvoie le
+    nombre d'emails envoyés et en échec.
+    """
+    if max_attempts is None:
+        max_attempts = _config().get('MAX_ATTEMPTS', 5)
+    
+    emails = claim_batch(batch_size)
+    if not emails:
+        return 0, 0
+    
+    mail_connection = get_connection()
+    try:
+        mail_connection.open()
+    except Exception as e:
+        # Serveur injoignable: tout le lot est reprogrammé
+        for email in emails:
+            _mark_failed(email, e, max_attempts)
+        return 0, len(emails)
+    
+    sent = failed = 0
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject,
+                email.body,
+                email.from_email,
+                email.recipients,
+                connection=mail_connection
+            )
+            try:
+                message.send()
+            except Exception as e:
+                _mark_failed(email, e, max_attempts)
+                failed += 1
+            else:
+                _mark_sent(email)
+                sent += 1
+    finally:
+        mail_connection.close()
+    
+    return sent, failed
+
+def _mark_sent(email):
+    email.status = 'sent'
+    email.attempts += 1
+    email.sent_at = timezone.now()
+    email.last_error = ''
+    email.save(update_fields=['status', 'attempts', 'sent_at', 'last_error'])
+
+def _mark_failed(email, error, max_attempts):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= max_attempts:
+        email.status = 'dead'
+    else:
+        email.status = 'retry'
+        email.next_attempt_at = timezone.now() + backoff(email.attempts)
+    email.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at'])
@@ -43,4 +43,15 @@ class PaymentSerializer(serializers.ModelSerializer):
 class CancellationPolicySerializer(serializers.ModelSerializer): 
     class Meta:
         model = CancellationPolicy
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+class MonthlySpendingSerializer(serializers.Serializer):
+    month = serializers.CharField()
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    bookings = serializers.IntegerField()
+
+class SpendingSummarySerializer(serializers.Serializer):
+    booking_count = serializers.IntegerField()
+    hotel_count = serializers.IntegerField()
+    total_spent = serializers.DecimalField(max_digits=12, decimal_places=2)
+    months = MonthlySpendingSerializer(many=True)
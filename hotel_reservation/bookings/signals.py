@@ -0,0 +1,63 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from hotel_reservation import charts
+from hotels.models import Hotel, RoomType
+from .models import Booking
+from . import inventory, stats
+
+@receiver(post_save, sender=RoomType)
+def resize_room_inventory(sender, instance, created, **kwargs):
+    """Garde rooms_left cohérent quand la quantité de chambres change"""
+    if not created:
+        inventory.resize(instance)
+
+@receiver([post_save, post_delete], sender=Booking)
+def invalidate_spending_chart(sender, instance, **kwargs):
+    charts.invalidate('monthly_spending', instance.user_id)
+
+# Compteurs de la page d'accueil (DashboardStats), mis à jour de façon incrémentale.
+# Les update() / bulk_create() en masse ne passent pas par ici:
+# python manage.py reconcile_dashboard_stats les remet d'aplomb.
+
+@receiver(pre_save, sender=Hotel)
+def remember_hotel_stars(sender, instance, **kwargs):
+    if not instance._state.adding:
+        instance._previous_stars = Hotel.objects.filter(pk=instance.pk).values_list('stars', flat=True).first()
+
+@receiver(post_save, sender=Hotel)
+def count_hotel(sender, instance, created, **kwargs):
+    if created:
+        stats.adjust(hotel_count=1, stars_total=instance.stars)
+    elif getattr(instance, '_previous_stars', None) is not None:
+        stats.adjust(stars_total=instance.stars - instance._previous_stars)
+
+@receiver(post_delete, sender=Hotel)
+def uncount_hotel(sender, instance, **kwargs):
+    stats.adjust(hotel_count=-1, stars_total=-instance.stars)
+
+@receiver(post_save, sender=RoomType)
+def count_room_type(sender, instance, created, **kwargs):
+    if created:
+        stats.adjust(room_count=1)
+
+@receiver(post_delete, sender=RoomType)
+def uncount_room_type(sender, instance, **kwargs):
+    stats.adjust(room_count=-1)
+
+@receiver(pre_save, sender=Booking)
+def remember_booking_status(sender, instance, update_fields=None, **kwargs):
+    instance._previous_status = None
+    if not instance._state.adding and (update_fields is None or 'status' in update_fields):
+        instance._previous_status = Booking.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+@receiver(post_save, sender=Booking)
+def count_booking(sender, instance, created, update_fields=None, **kwargs):
+    if not created and update_fields is not None and 'status' not in update_fields:
+        return
+    was_confirmed = instance._previous_status == 'confirmed'
+    stats.adjust(booking_count=(instance.status == 'confirmed') - was_confirmed)
+
+@receiver(post_delete, sender=Booking)
+def uncount_booking(sender, instance, **kwargs):
+    if instance.status == 'confirmed':
+        stats.adjust(booking_count=-1)
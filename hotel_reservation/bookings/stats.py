@@ -0,0 +1,87 @@
+from datetime import date, datetime, time
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from hotels.models import Hotel, RoomType
+from .models import Booking, DashboardStats
+
+# Identifiant de l'unique ligne de compteurs
+STATS_ID = 1
+
+def compute():
+    """Compteurs recalculés depuis les tables (coûteux sur une grosse base)"""
+    hotels = Hotel.objects.aggregate(count=Count('id'), stars=Sum('stars'))
+    return {
+        'hotel_count': hotels['count'],
+        'stars_total': hotels['stars'] or 0,
+        'room_count': RoomType.objects.count(),
+        'booking_count': Booking.objects.filter(status='confirmed').count(),
+    }
+
+def reconcile():
+    """Remplace les compteurs par leur valeur exacte"""
+    with transaction.atomic():
+        stats, _ = DashboardStats.objects.update_or_create(pk=STATS_ID, defaults=compute())
+    return stats
+
+def get_stats():
+    """Compteurs de l'accueil en une requête (recalculés si la ligne n'existe pas encore)"""
+    stats = DashboardStats.objects.filter(pk=STATS_ID).first()
+    if stats is None:
+        stats = reconcile()
+    return stats
+
+def adjust(**deltas):
+    """Ajoute les deltas aux compteurs, en SQL (pas de lecture préalable ni de course).
+    
+    Sans ligne, rien n'est fait: get_stats() la créera avec les valeurs exactes.
+    """
+    updates = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if updates:
+        DashboardStats.objects.filter(pk=STATS_ID).update(updated_at=timezone.now(), **updates)
+
+# ==================== DÉPENSES PAR UTILISATEUR ====================
+
+def month_start(day, months_back=0):
+    """Premier jour du mois, `months_back` mois avant celui de `day`"""
+    month = day.year * 12 + day.month - 1 - months_back
+    return date(month // 12, month % 12 + 1, 1)
+
+def spending_summary(user_id, months=6):
+    """Totaux des réservations d'un utilisateur et montant par mois sur les `months` derniers mois.
+    
+    Agrégé en base (TruncMonth / Sum) sur la plage (user, created_at) de
+    l'index booking_user_created_idx: rien n'est chargé ligne par ligne.
+    Les mois sans réservation sont présents avec un total nul.
+    """
+    bookings = Booking.objects.filter(user_id=user_id)
+    totals = bookings.aggregate(
+        booking_count=Count('id'),
+        hotel_count=Count('room_type__hotel', distinct=True),
+        total_spent=Sum('total_price')
+    )
+    
+    first_month = month_start(timezone.localdate(), months - 1)
+    since = timezone.make_aware(datetime.combine(first_month, time.min))
+    rows = (
+        bookings.filter(created_at__gte=since)
+        .annotate(month=TruncMonth('created_at'))
+        .values('month')
+        .annotate(total=Sum('total_price'), bookings=Count('id'))
+        .order_by('month')
+    )
+    by_month = {timezone.localtime(row['month']).strftime('%Y-%m'): row for row in rows}
+    
+    history = []
+    for i in range(months - 1, -1, -1):
+        key = month_start(timezone.localdate(), i).strftime('%Y-%m')
+        row = by_month.get(key, {})
+        history.append({'month': key, 'total': row.get('total') or 0, 'bookings': row.get('bookings', 0)})
+    
+    return {
+        'booking_count': totals['booking_count'],
+        'hotel_count': totals['hotel_count'],
+        'total_spent': totals['total_spent'] or 0,
+        'months': history,
+    }
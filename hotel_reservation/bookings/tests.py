@@ -1,3 +1,588 @@
-from django.test import TestCase
+import threading
+import time
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest import mock
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from hotel_reservation.fast_serializers import FastListSerializer
+from accounts.models import User
+from hotels.models import Hotel, RoomType, RoomImage
+from .models import Booking, Payment, CancellationPolicy, RoomInventory, OutboxEmail
+from .serializers import BookingSerializer
+from .views import BookingDetailView
+from . import inventory, outbox, stats
 
-# Create your tests here.
+def create_room_type(quantity=5, **kwargs):
+    hotel = Hotel.objects.create(
+        name=kwargs.pop('hotel_name', 'Hôtel Test'),
+        description='Hôtel de test',
+        address='1 rue du Test',
+        city=kwargs.pop('city', 'Paris'),
+        country='France',
+        stars=3,
+        email='hotel@test.com',
+        phone='0100000000'
+    )
+    return RoomType.objects.create(
+        hotel=hotel,
+        name='Chambre Double',
+        room_type='double',
+        description='Chambre double',
+        capacity=2,
+        price_per_night=100,
+        size=20,
+        quantity_available=quantity,
+        **kwargs
+    )
+
+class InventoryTests(TestCase):
+    def setUp(self):
+        self.room_type = create_room_type(quantity=3)
+        self.check_in = timezone.now().date() + timedelta(days=10)
+        self.check_out = self.check_in + timedelta(days=3)
+    
+    def test_reserve_and_release(self):
+        inventory.adjust(self.room_type, self.check_in, self.check_out, 2)
+        self.assertEqual(inventory.available_rooms(self.room_type, self.check_in, self.check_out), 1)
+        
+        inventory.adjust(self.room_type, self.check_in, self.check_out, -2)
+        self.assertEqual(inventory.available_rooms(self.room_type, self.check_in, self.check_out), 3)
+    
+    def test_overbooking_is_rejected_atomically(self):
+        # Une seule nuit complète suffit à refuser tout le séjour
+        inventory.adjust(self.room_type, self.check_in + timedelta(days=2), self.check_out, 3)
+        
+        with self.assertRaises(inventory.RoomsUnavailable):
+            inventory.adjust(self.room_type, self.check_in, self.check_out, 1)
+        
+        self.assertEqual(inventory.available_rooms(self.room_type, self.check_in, self.check_in + timedelta(days=2)), 3)
+        self.assertEqual(sum(RoomInventory.objects.values_list('rooms_sold', flat=True)), 3)
+    
+    def test_api_booking_rejected_when_full(self):
+        user = User.objects.create_user(username='client', password='password123')
+        client = APIClient()
+        client.force_authenticate(user)
+        data = {
+            'room_type': self.room_type.id,
+            'check_in_date': self.check_in.isoformat(),
+            'check_out_date': self.check_out.isoformat(),
+            'number_of_rooms': 2,
+            'number_of_guests': 2,
+        }
+        
+        self.assertEqual(client.post('/api/bookings/', data, format='json').status_code, 201)
+        self.assertEqual(client.post('/api/bookings/', data, format='json').status_code, 400)
+        self.assertEqual(Booking.objects.count(), 1)
+    
+    def book(self, rooms, status='confirmed'):
+        user, _ = User.objects.get_or_create(username='client')
+        return Booking.objects.create(
+            user=user,
+            room_type=self.room_type,
+            check_in_date=self.check_in,
+            check_out_date=self.check_out,
+            number_of_rooms=rooms,
+            number_of_guests=2,
+            total_price=300,
+            status=status
+        )
+    
+    def ledger(self):
+        return list(RoomInventory.objects.order_by('date').values_list('date', 'rooms_sold', 'rooms_left'))
+    
+    def test_reserve_release_resize_counts(self):
+        booking = self.book(2)
+        inventory.reserve(booking)
+        nights = inventory.stay_nights(self.check_in, self.check_out)
+        self.assertEqual(self.ledger(), [(night, 2, 1) for night in nights])
+        
+        # Plus de chambres: les nuits déjà vendues gardent leurs ventes
+        self.room_type.quantity_available = 5
+        self.room_type.save()
+        inventory.resize(self.room_type)
+        self.assertEqual(self.ledger(), [(night, 2, 3) for night in nights])
+        
+        inventory.release(booking)
+        self.assertEqual(self.ledger(), [(night, 0, 5) for night in nights])
+    
+    def test_full_room_type_raises(self):
+        inventory.reserve(self.book(3))
+        with self.assertRaises(inventory.RoomsUnavailable):
+            inventory.reserve(self.book(1))
+        self.assertEqual({sold for _, sold, _ in self.ledger()}, {3})
+    
+    def test_rebuild_matches_bookings_and_is_idempotent(self):
+        self.book(2)
+        self.book(1)
+        self.book(3, status='cancelled')
+        nights = inventory.stay_nights(self.check_in, self.check_out)
+        
+        for _ in range(2):
+            out = StringIO()
+            call_command('rebuild_inventory', stdout=out)
+            self.assertEqual(self.ledger(), [(night, 3, 0) for night in nights])
+        self.assertIn('3 nuit(s)', out.getvalue())
+        
+        # Une ligne faussée est corrigée, --since borne le recalcul
+        RoomInventory.objects.filter(date=self.check_in).update(rooms_sold=0, rooms_left=3)
+        call_command('rebuild_inventory', since=(self.check_in + timedelta(days=1)).isoformat(), stdout=StringIO())
+        self.assertEqual(self.ledger()[0], (self.check_in, 0, 3))
+        call_command('rebuild_inventory', stdout=StringIO())
+        self.assertEqual(self.ledger()[0], (self.check_in, 3, 0))
+    
+    def test_rebuild_notifies_after_commit(self):
+        self.book(2)
+        received = []
+        listener = lambda sender, **kwargs: received.append(kwargs)
+        inventory.inventory_changed.connect(listener)
+        self.addCleanup(inventory.inventory_changed.disconnect, listener)
+        
+        with self.captureOnCommitCallbacks() as callbacks:
+            inventory.rebuild(self.check_in, room_type_id=self.room_type.id)
+        self.assertEqual(received, [])
+        for callback in callbacks:
+            callback()
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0]['hotel_id'], self.room_type.hotel_id)
+        self.assertIsNone(received[0]['rooms'])
+        self.assertEqual(received[0]['version'], inventory.version())
+
+class BookingStatusChangeTests(TestCase):
+    """Paiement, annulation et suppression relisent la réservation verrouillée"""
+    
+    def setUp(self):
+        self.room_type = create_room_type(quantity=3)
+        self.user = User.objects.create_user(username='client', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.check_in = timezone.now().date() + timedelta(days=10)
+        response = self.client.post('/api/bookings/', {
+            'room_type': self.room_type.id,
+            'check_in_date': self.check_in.isoformat(),
+            'check_out_date': (self.check_in + timedelta(days=2)).isoformat(),
+            'number_of_rooms': 2,
+            'number_of_guests': 2,
+        }, format='json')
+        self.booking = Booking.objects.get(pk=response.data['id'])
+    
+    def rooms_left(self):
+        return set(RoomInventory.objects.values_list('rooms_left', flat=True))
+    
+    def pay(self):
+        return self.client.post(f'/api/bookings/{self.booking.id}/pay/')
+    
+    def test_payment_reserves_once(self):
+        self.assertEqual(self.pay().status_code, 200)
+        self.assertEqual(self.pay().status_code, 409)
+        self.assertEqual(self.rooms_left(), {1})
+        
+        # Terminée: pas de nouveau paiement ni de chambres reprises
+        Booking.objects.filter(pk=self.booking.pk).update(status='completed')
+        self.assertEqual(self.pay().status_code, 409)
+        self.assertEqual(Booking.objects.get(pk=self.booking.pk).status, 'completed')
+        
+        # Annulée puis payée à nouveau: reprend ses chambres
+        inventory.release(self.booking)
+        Booking.objects.filter(pk=self.booking.pk).update(status='cancelled')
+        self.assertEqual(self.pay().status_code, 200)
+        self.assertEqual(self.rooms_left(), {1})
+    
+    def test_stale_delete_does_not_release_twice(self):
+        stale = Booking.objects.get(pk=self.booking.pk)
+        self.client.force_login(self.user)
+        for _ in range(2):
+            self.client.post(f'/booking/{self.booking.id}/', {'status': 'cancelled'})
+        self.assertEqual(self.rooms_left(), {3})
+        
+        # Instance chargée avant l'annulation: la ligne relue ne bloque plus rien
+        BookingDetailView().perform_destroy(stale)
+        self.assertEqual(self.rooms_left(), {3})
+        self.assertFalse(Booking.objects.filter(pk=self.booking.pk).exists())
+    
+    def test_web_cancel_after_arrival_refused(self):
+        Booking.objects.filter(pk=self.booking.pk).update(check_in_date=timezone.now().date())
+        self.client.force_login(self.user)
+        self.client.post(f'/booking/{self.booking.id}/', {'status': 'cancelled'})
+        self.assertEqual(Booking.objects.get(pk=self.booking.pk).status, 'pending')
+        self.assertEqual(self.rooms_left(), {1})
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.room_type = create_room_type()
+        self.user = User.objects.create_user(username='client', email='client@test.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        check_in = timezone.now().date() + timedelta(days=10)
+        self.data = {
+            'room_type': self.room_type.id,
+            'check_in_date': check_in.isoformat(),
+            'check_out_date': (check_in + timedelta(days=2)).isoformat(),
+            'number_of_rooms': 1,
+            'number_of_guests': 2,
+        }
+    
+    def test_booking_enqueues_email_without_sending(self):
+        self.assertEqual(self.client.post('/api/bookings/', self.data, format='json').status_code, 201)
+        self.assertEqual(len(mail.outbox), 0)
+        
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.status, 'pending')
+        self.assertEqual(email.recipients, ['client@test.com'])
+        
+        self.assertEqual(outbox.drain(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(OutboxEmail.objects.get().status, 'sent')
+    
+    def test_failed_email_is_retried_then_abandoned(self):
+        outbox.enqueue('Sujet', 'Message', ['client@test.com'])
+        
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('SMTP indisponible')):
+            self.assertEqual(outbox.drain(max_attempts=2), (0, 1))
+            email = OutboxEmail.objects.get()
+            self.assertEqual(email.status, 'retry')
+            self.assertGreater(email.next_attempt_at, timezone.now())
+            
+            # Pas encore dû: rien n'est renvoyé
+            self.assertEqual(outbox.drain(max_attempts=2), (0, 0))
+            
+            OutboxEmail.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(outbox.drain(max_attempts=2), (0, 1))
+            self.assertEqual(OutboxEmail.objects.get().status, 'dead')
+
+class QueryCountTests(TestCase):
+    """Nombre de requêtes constant quelle que soit la taille de la page"""
+    
+    def setUp(self):
+        self.room_type = create_room_type(quantity=50)
+        RoomImage.objects.create(room_type=self.room_type, image='room_images/test.jpg')
+        self.user = User.objects.create_user(username='client', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.check_in = timezone.now().date() + timedelta(days=10)
+    
+    def create_bookings(self, count):
+        for i in range(count):
+            booking = Booking.objects.create(
+                user=self.user,
+                room_type=self.room_type,
+                check_in_date=self.check_in,
+                check_out_date=self.check_in + timedelta(days=2),
+                number_of_guests=2,
+                total_price=200
+            )
+            Payment.objects.create(booking=booking, amount=200, payment_method='credit_card')
+    
+    def test_user_bookings(self):
+        for size in (1, 8):
+            self.create_bookings(size)
+            # réservations (avec utilisateur, chambre, hôtel) + images
+            with self.assertNumQueries(2):
+                self.assertEqual(self.client.get('/api/bookings/my-bookings/').status_code, 200)
+    
+    def test_fast_serializer_matches_drf(self):
+        self.create_bookings(3)
+        Booking.objects.filter(id=Booking.objects.first().id).update(status='cancelled', special_requests='Lit bébé')
+        
+        bookings = list(Booking.objects.select_related('user', 'room_type__hotel').prefetch_related('room_type__images'))
+        self.assertEqual(
+            JSONRenderer().render(FastListSerializer(bookings, BookingSerializer).data),
+            JSONRenderer().render(BookingSerializer(bookings, many=True).data)
+        )
+    
+    def test_sparse_fields(self):
+        self.create_bookings(3)
+        # réservations jointes au type de chambre, sans utilisateur, hôtel ni images
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/bookings/my-bookings/?fields=id,status,room_type_details.name')
+        self.assertEqual(response.data['results'][0]['room_type_details'], {'name': 'Chambre Double'})
+        self.assertEqual(list(response.data['results'][0]), ['id', 'room_type_details', 'status'])
+        
+        # sans room_type_details, plus besoin des images
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/bookings/my-bookings/?expand=')
+        self.assertNotIn('room_type_details', response.data['results'][0])
+        self.assertEqual(response.data['results'][0]['hotel_name'], 'Hôtel Test')
+    
+    def test_keyset_pages_by_creation_date(self):
+        self.create_bookings(5)
+        # Même created_at: l'id départage
+        Booking.objects.update(created_at=timezone.now())
+        ids, url = [], '/api/bookings/my-bookings/?page_size=2&fields=id'
+        while url:
+            data = self.client.get(url).json()
+            ids += [booking['id'] for booking in data['results']]
+            url = data['next']
+        self.assertEqual(ids, list(Booking.objects.order_by('-id').values_list('id', flat=True)))
+    
+    def test_booking_detail(self):
+        self.create_bookings(1)
+        booking = Booking.objects.get()
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(f'/api/bookings/{booking.id}/').status_code, 200)
+    
+    def test_cancellation_policies(self):
+        for days in (1, 7, 30):
+            CancellationPolicy.objects.create(
+                hotel=self.room_type.hotel, days_before_checkin=days, penalty_percentage=50, description='-'
+            )
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/bookings/hotel/{self.room_type.hotel_id}/cancellation-policies/')
+        self.assertEqual(response.status_code, 200)
+    
+    def test_create_and_pay_within_budget(self):
+        # Le budget déclaré sur la vue fait échouer le test en cas de dépassement
+        response = self.client.post('/api/bookings/', {
+            'room_type': self.room_type.id,
+            'check_in_date': self.check_in.isoformat(),
+            'check_out_date': (self.check_in + timedelta(days=7)).isoformat(),
+            'number_of_rooms': 1,
+            'number_of_guests': 2,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        
+        response = self.client.post(f"/api/bookings/{response.data['id']}/pay/")
+        self.assertEqual(response.status_code, 200)
+
+class ConcurrentBookingTests(TransactionTestCase):
+    """Réservations concurrentes sur un même type de chambre"""
+    
+    THREADS = 200
+    # Secondes pour THREADS réservations concurrentes: environ 5 s mesurées
+    # sur SQLite (25 ms par réservation), marge pour les machines lentes
+    THROUGHPUT_BOUND = 20
+    
+    def run_threads(self, target, count):
+        threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    
+    def test_last_room_sold_once(self):
+        room_type = create_room_type(quantity=5)
+        user = User.objects.create_user(username='client', password='password123')
+        check_in = timezone.now().date() + timedelta(days=30)
+        statuses = []
+        start = threading.Barrier(30)
+        
+        def book(i):
+            client = APIClient()
+            client.force_authenticate(user)
+            start.wait()
+            try:
+                statuses.append(client.post('/api/bookings/', {
+                    'room_type': room_type.id,
+                    'check_in_date': check_in.isoformat(),
+                    'check_out_date': (check_in + timedelta(days=2)).isoformat(),
+                    'number_of_rooms': 1,
+                    'number_of_guests': 2,
+                }, format='json').status_code)
+            finally:
+                connection.close()
+        
+        self.run_threads(book, 30)
+        # Exactement la capacité: ni survente, ni refus à tort
+        self.assertEqual(sorted(statuses), [201] * 5 + [400] * 25)
+        self.assertEqual(Booking.objects.count(), 5)
+        self.assertEqual(set(RoomInventory.objects.values_list('rooms_sold', 'rooms_left')), {(5, 0)})
+    
+    def test_concurrent_bookings_throughput(self):
+        # Réservations toutes acceptables, sur plusieurs hôtels: seul le
+        # débit est mesuré. SQLite (transaction_mode IMMEDIATE) passe les
+        # écritures une à une; la borne vaut pour ce cas, le plus lent.
+        room_types = [
+            create_room_type(quantity=self.THREADS, hotel_name=f'Hôtel {i}', city='Paris')
+            for i in range(10)
+        ]
+        user = User.objects.create_user(username='client', password='password123')
+        check_in = timezone.now().date() + timedelta(days=30)
+        statuses = []
+        start = threading.Barrier(self.THREADS + 1)
+        
+        def book(i):
+            client = APIClient()
+            client.force_authenticate(user)
+            start.wait()
+            try:
+                statuses.append(client.post('/api/bookings/', {
+                    'room_type': room_types[i % 10].id,
+                    'check_in_date': check_in.isoformat(),
+                    'check_out_date': (check_in + timedelta(days=3)).isoformat(),
+                    'number_of_rooms': 1,
+                    'number_of_guests': 2,
+                }, format='json').status_code)
+            finally:
+                connection.close()
+        
+        threads = [threading.Thread(target=book, args=(i,)) for i in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        
+        self.assertEqual(statuses, [201] * self.THREADS)
+        self.assertLess(elapsed, self.THROUGHPUT_BOUND, f"{self.THREADS} réservations en {elapsed:.1f} s")
+        self.assertEqual(set(RoomInventory.objects.values_list('rooms_sold', flat=True)), {self.THREADS // 10})
+    
+    def test_concurrent_bookings_never_oversell(self):
+        room_type = create_room_type(quantity=20)
+        other_room_type = create_room_type(quantity=20, hotel_name='Autre Hôtel', city='Lyon')
+        user = User.objects.create_user(username='client', password='password123')
+        check_in = timezone.now().date() + timedelta(days=30)
+        
+        results = {'created': 0, 'refused': 0, 'errors': []}
+        lock = threading.Lock()
+        start = threading.Barrier(self.THREADS)
+        
+        def book(i):
+            # Séjours de longueurs variées qui se chevauchent
+            client = APIClient()
+            client.force_authenticate(user)
+            target = room_type if i % 10 else other_room_type
+            start.wait()
+            try:
+                response = client.post('/api/bookings/', {
+                    'room_type': target.id,
+                    'check_in_date': (check_in + timedelta(days=i % 3)).isoformat(),
+                    'check_out_date': (check_in + timedelta(days=3 + i % 4)).isoformat(),
+                    'number_of_rooms': 1 + i % 2,
+                    'number_of_guests': 2,
+                }, format='json')
+                with lock:
+                    if response.status_code == 201:
+                        results['created'] += 1
+                    elif response.status_code == 400:
+                        results['refused'] += 1
+                    else:
+                        results['errors'].append(response.status_code)
+            except Exception as e:
+                with lock:
+                    results['errors'].append(repr(e))
+            finally:
+                connection.close()
+        
+        self.run_threads(book, self.THREADS)
+        
+        self.assertEqual(results['errors'], [])
+        self.assertEqual(results['created'] + results['refused'], self.THREADS)
+        self.assertGreater(results['created'], 0)
+        
+        # Aucune nuit survendue, et l'inventaire correspond exactement aux réservations
+        for room in (room_type, other_room_type):
+            nights = RoomInventory.objects.filter(room_type=room)
+            self.assertFalse(nights.filter(rooms_left__lt=0).exists())
+            for night in nights:
+                booked = sum(
+                    b.number_of_rooms for b in Booking.objects.filter(
+                        room_type=room,
+                        check_in_date__lte=night.date,
+                        check_out_date__gt=night.date
+                    )
+                )
+                self.assertEqual(night.rooms_sold, booked)
+                self.assertLessEqual(booked, room.quantity_available)
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        self.room_type = create_room_type()
+        self.user = User.objects.create_user(username='client', password='password123')
+        stats.reconcile()
+    
+    def assertStatsExact(self):
+        current = stats.get_stats()
+        for field, value in stats.compute().items():
+            self.assertEqual(getattr(current, field), value, field)
+    
+    def test_signals_keep_counters_current(self):
+        hotel = create_room_type(hotel_name='Hôtel 5*', city='Lyon').hotel
+        hotel.stars = 5
+        hotel.save()
+        booking = Booking.objects.create(
+            user=self.user,
+            room_type=self.room_type,
+            check_in_date=timezone.now().date() + timedelta(days=5),
+            check_out_date=timezone.now().date() + timedelta(days=7),
+            number_of_guests=2,
+            total_price=200
+        )
+        self.assertStatsExact()
+        
+        booking.status = 'confirmed'
+        booking.save()
+        self.assertEqual(stats.get_stats().booking_count, 1)
+        self.assertEqual(stats.get_stats().avg_rating, 4)
+        
+        booking.status = 'cancelled'
+        booking.save()
+        booking.status = 'confirmed'
+        booking.save()
+        hotel.delete()
+        self.room_type.delete()
+        self.assertStatsExact()
+        self.assertEqual(stats.get_stats().hotel_count, 1)
+    
+    def test_home_reads_one_row(self):
+        with self.assertNumQueries(1):
+            stats.get_stats()
+        
+        response = self.client.get('/')
+        self.assertEqual(response.context['stats'].hotel_count, 1)
+    
+    def test_reconcile_command_fixes_drift(self):
+        # update() en masse: pas de signal
+        Hotel.objects.update(stars=5)
+        call_command('reconcile_dashboard_stats', stdout=StringIO())
+        self.assertEqual(stats.get_stats().avg_rating, 5)
+
+class SpendingSummaryTests(TestCase):
+    def setUp(self):
+        self.room_type = create_room_type()
+        self.user = User.objects.create_user(username='client', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        today = timezone.localdate()
+        # Deux réservations ce mois-ci, une il y a deux mois, une il y a un an
+        for months_back, price in [(0, 100), (0, 50), (2, 200), (12, 300)]:
+            booking = Booking.objects.create(
+                user=self.user,
+                room_type=self.room_type,
+                check_in_date=today + timedelta(days=5),
+                check_out_date=today + timedelta(days=6),
+                number_of_guests=2,
+                total_price=price
+            )
+            created_at = timezone.make_aware(datetime.combine(stats.month_start(today, months_back), datetime.min.time()))
+            Booking.objects.filter(pk=booking.pk).update(created_at=created_at + timedelta(hours=12))
+    
+    def test_monthly_totals_aggregated_in_database(self):
+        with self.assertNumQueries(2):
+            summary = stats.spending_summary(self.user.id, months=6)
+        
+        self.assertEqual(summary['booking_count'], 4)
+        self.assertEqual(summary['hotel_count'], 1)
+        self.assertEqual(summary['total_spent'], 650)
+        self.assertEqual([row['total'] for row in summary['months']], [0, 0, 0, 200, 0, 150])
+        self.assertEqual(summary['months'][-1]['bookings'], 2)
+    
+    def test_api_endpoint(self):
+        response = self.client.get('/api/bookings/my-bookings/summary/?months=3')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['months']), 3)
+        self.assertEqual(response.data['total_spent'], '650.00')
+        self.assertEqual(response.data['months'][0]['total'], '200.00')
+        
+        self.assertEqual(self.client.get('/api/bookings/my-bookings/summary/?months=0').status_code, 400)
+    
+    def test_my_bookings_chart(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/my-bookings/')
+        self.assertEqual(response.context['spending_chart']['data'][0]['y'], [0, 0, 0, 200.0, 0, 150.0])
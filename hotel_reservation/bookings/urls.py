@@ -1,10 +1,11 @@
 from django.urls import path
 from .views import (BookingCreateView, UserBookingsView, BookingDetailView, 
-                   ProcessPaymentView, CancellationPolicyView)
+                   ProcessPaymentView, CancellationPolicyView, SpendingSummaryView)
 
 urlpatterns = [
     path('', BookingCreateView.as_view(), name='booking-create'),
     path('my-bookings/', UserBookingsView.as_view(), name='user-bookings'),
+    path('my-bookings/summary/', SpendingSummaryView.as_view(), name='user-bookings-summary'),
     path('<int:pk>/', BookingDetailView.as_view(), name='booking-detail'),
     path('<int:booking_id>/pay/', ProcessPaymentView.as_view(), name='process-payment'),
     path('hotel/<int:hotel_id>/cancellation-policies/', 
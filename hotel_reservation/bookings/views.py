@@ -2,41 +2,69 @@ from rest_framework import generics, status, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
 from django.utils import timezone
-from django.core.mail import send_mail
 from django.conf import settings
+from django.db import transaction
 from .models import Booking, Payment, CancellationPolicy
-from .serializers import BookingSerializer, PaymentSerializer, CancellationPolicySerializer 
+from . import inventory, outbox, stats
+from .serializers import BookingSerializer, PaymentSerializer, CancellationPolicySerializer, SpendingSummarySerializer
 from hotels.models import RoomType
+from hotels import pricing
+from hotel_reservation.query_budget import query_budget
+from hotel_reservation.fast_serializers import FastListMixin
+from hotel_reservation.pagination import KeysetPagination
+from hotel_reservation.sparse_fields import SparseFieldsMixin
 
+class BookingFieldsMixin(SparseFieldsMixin):
+    """?fields= / ?expand= sur les réservations, avec les jointures de chaque champ"""
+    expandable_fields = ('room_type_details',)
+    field_relations = {
+        'user_name': (['user'], []),
+        'hotel_name': (['room_type__hotel'], []),
+        'room_type_details': (['room_type'], []),
+        'room_type_details.hotel_name': (['room_type__hotel'], []),
+        'room_type_details.hotel_city': (['room_type__hotel'], []),
+        'room_type_details.images': ([], ['room_type__images']),
+    }
+
+@query_budget(POST=25)
 class BookingCreateView(generics.CreateAPIView):
     serializer_class = BookingSerializer
     permission_classes = [IsAuthenticated]
     
     def perform_create(self, serializer):
-        room_type = serializer.validated_data['room_type']
-        nights = (serializer.validated_data['check_out_date'] - 
-                 serializer.validated_data['check_in_date']).days
-        
-        total_price = room_type.price_per_night * nights * serializer.validated_data['number_of_rooms']
-        
-        booking = serializer.save(
-            user=self.request.user,
-            total_price=total_price,
-            status='pending'
+        # Prix de chaque nuit du séjour (tarifs par date, sinon price_per_night)
+        total_price = pricing.quote(
+            serializer.validated_data['room_type'],
+            serializer.validated_data['check_in_date'],
+            serializer.validated_data['check_out_date'],
+            serializer.validated_data['number_of_rooms']
         )
         
-        # Créer un paiement simulé
-        Payment.objects.create(
-            booking=booking,
-            amount=total_price,
-            payment_method='credit_card',
-            payment_status='pending',
-            transaction_id=f"TXN{booking.id:06d}"
-        )
-        
-        # Envoyer l'email de confirmation
-        self.send_confirmation_email(booking)
+        try:
+            with transaction.atomic():
+                booking = serializer.save(
+                    user=self.request.user,
+                    total_price=total_price,
+                    status='pending'
+                )
+                # Réservation atomique des chambres (annule tout si une nuit est complète)
+                inventory.reserve(booking)
+                
+                # Créer un paiement simulé
+                Payment.objects.create(
+                    booking=booking,
+                    amount=total_price,
+                    payment_method='credit_card',
+                    payment_status='pending',
+                    transaction_id=f"TXN{booking.id:06d}"
+                )
+                
+                # Email de confirmation (envoyé par le worker de l'outbox)
+                self.send_confirmation_email(booking)
+        except inventory.RoomsUnavailable:
+            raise ValidationError("Pas assez de chambres disponibles pour ces dates")
     
     def send_confirmation_email(self, booking):
         subject = f'Confirmation de réservation #{booking.id}'
@@ -60,22 +88,42 @@ class BookingCreateView(generics.CreateAPIView):
         L'équipe de réservation
         """
         
-        send_mail(
+        outbox.enqueue(
             subject,
             message,
-            settings.EMAIL_HOST_USER,
             [booking.user.email],
-            fail_silently=False,
+            from_email=settings.EMAIL_HOST_USER,
+            booking=booking
         )
 
-class UserBookingsView(generics.ListAPIView):
+@query_budget(5)
+class UserBookingsView(BookingFieldsMixin, FastListMixin, generics.ListAPIView):
     serializer_class = BookingSerializer
     permission_classes = [IsAuthenticated]
+    # Curseur sur (created_at, id), index booking_user_created_idx
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
-        return Booking.objects.filter(user=self.request.user).order_by('-created_at')
+        return Booking.objects.filter(user=self.request.user).order_by('-created_at', '-id')
+
+@query_budget(4)
+class SpendingSummaryView(APIView):
+    """Résumé des dépenses de l'utilisateur (?months=, 6 par défaut, 24 au plus)"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        try:
+            months = int(request.query_params.get('months', 6))
+        except ValueError:
+            raise ValidationError({'months': "Nombre de mois invalide"})
+        if not 1 <= months <= 24:
+            raise ValidationError({'months': "Entre 1 et 24 mois"})
+        
+        summary = stats.spending_summary(request.user.id, months)
+        return Response(SpendingSummarySerializer(summary).data)
 
-class BookingDetailView(generics.RetrieveUpdateDestroyAPIView):
+@query_budget(GET=4, PUT=25, PATCH=25, DELETE=20)
+class BookingDetailView(BookingFieldsMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = BookingSerializer
     permission_classes = [IsAuthenticated]
     
@@ -83,6 +131,19 @@ class BookingDetailView(generics.RetrieveUpdateDestroyAPIView):
         return Booking.objects.filter(user=self.request.user)
     
     def perform_update(self, serializer):
+        try:
+            with transaction.atomic():
+                # Libérer l'ancien séjour puis bloquer le nouveau (dates, chambres ou statut modifiés)
+                previous = Booking.objects.select_for_update().get(pk=serializer.instance.pk)
+                if inventory.holds_inventory(previous):
+                    inventory.release(previous)
+                self._update_booking(serializer)
+                if inventory.holds_inventory(serializer.instance):
+                    inventory.reserve(serializer.instance)
+        except inventory.RoomsUnavailable:
+            raise ValidationError("Pas assez de chambres disponibles pour ces dates")
+    
+    def _update_booking(self, serializer):
         # Mise à jour du statut de la réservation
         if 'status' in serializer.validated_data:
             if serializer.validated_data['status'] == 'cancelled':
@@ -109,60 +170,87 @@ class BookingDetailView(generics.RetrieveUpdateDestroyAPIView):
                     self.send_cancellation_email(booking, penalty, refund_amount)
         
         serializer.save()
+    
+    def send_cancellation_email(self, booking, penalty, refund_amount):
+        subject = f'Annulation de réservation #{booking.id}'
+        message = f"""
+        Bonjour {booking.user.get_full_name()},
+        
+        Votre réservation #{booking.id} a été annulée.
+        
+        Détails de l'annulation:
+        - Hôtel: {booking.room_type.hotel.name}
+        - Type de chambre: {booking.room_type.name}
+        - Date d'arrivée: {booking.check_in_date}
+        - Pénalité appliquée: {penalty}%
+        - Montant remboursé: {refund_amount}€
+        
+        Cordialement,
+        L'équipe de réservation
+        """
+        
+        outbox.enqueue(
+            subject,
+            message,
+            [booking.user.email],
+            from_email=settings.EMAIL_HOST_USER,
+            booking=booking
+        )
+    
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            # Relire la ligne verrouillée: deux suppressions (ou une annulation)
+            # concurrentes ne libèrent les nuits qu'une fois
+            booking = Booking.objects.select_for_update().filter(pk=instance.pk).first()
+            if booking is None:
+                return
+            if inventory.holds_inventory(booking):
+                inventory.release(booking)
+            booking.delete()
 
+@query_budget(POST=15)
 class ProcessPaymentView(APIView):
     permission_classes = [IsAuthenticated]
+    # Statuts qu'un paiement peut confirmer
+    PAYABLE_STATUSES = ('pending', 'cancelled')
     
     def post(self, request, booking_id):
         try:
-            booking = Booking.objects.get(id=booking_id, user=request.user)
-            payment = booking.payment
-            
-            # Simulation de paiement
-            payment.payment_status = 'completed'
-            payment.payment_date = timezone.now()
-            payment.save()
-            
-            # Mettre à jour le statut de la réservation
-            booking.status = 'confirmed'
-            booking.save()
+            with transaction.atomic():
+                # Ligne verrouillée: deux paiements concurrents ne réservent qu'une fois
+                booking = Booking.objects.select_for_update().get(id=booking_id, user=request.user)
+                if booking.status not in self.PAYABLE_STATUSES:
+                    return Response(
+                        {"error": f"Paiement impossible: réservation {booking.get_status_display().lower()}"},
+                        status=status.HTTP_409_CONFLICT
+                    )
+                
+                # Simulation de paiement
+                payment = booking.payment
+                payment.payment_status = 'completed'
+                payment.payment_date = timezone.now()
+                payment.save()
+                
+                # Une réservation annulée payée à nouveau reprend ses chambres
+                if not inventory.holds_inventory(booking):
+                    inventory.reserve(booking)
+                
+                # Mettre à jour le statut de la réservation
+                booking.status = 'confirmed'
+                booking.save()
             
             return Response({"message": "Paiement effectué avec succès"})
         
         except Booking.DoesNotExist:
             return Response({"error": "Réservation non trouvée"}, status=status.HTTP_404_NOT_FOUND)
+        except inventory.RoomsUnavailable:
+            return Response({"error": "Plus assez de chambres disponibles pour ces dates"}, status=status.HTTP_409_CONFLICT)
 
+@query_budget(4)
 class CancellationPolicyView(generics.ListAPIView):
     serializer_class = CancellationPolicySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     
     def get_queryset(self):
         hotel_id = self.kwargs.get('hotel_id')
-        return CancellationPolicy.objects.filter(hotel_id=hotel_id).order_by('days_before_checkin')
-
-# Ajoutez ces méthodes manquantes à la classe BookingDetailView
-def send_cancellation_email(self, booking, penalty, refund_amount):
-    subject = f'Annulation de réservation #{booking.id}'
-    message = f"""
-    Bonjour {booking.user.get_full_name()},
-    
-    Votre réservation #{booking.id} a été annulée.
-    
-    Détails de l'annulation:
-    - Hôtel: {booking.room_type.hotel.name}
-    - Type de chambre: {booking.room_type.name}
-    - Date d'arrivée: {booking.check_in_date}
-    - Pénalité appliquée: {penalty}%
-    - Montant remboursé: {refund_amount}€
-    
-    Cordialement,
-    L'équipe de réservation
-    """
-    
-    send_mail(
-        subject,
-        message,
-        settings.EMAIL_HOST_USER,
-        [booking.user.email],
-        fail_silently=False,
-    )
\ No newline at end of file
+        return CancellationPolicy.objects.filter(hotel_id=hotel_id).order_by('days_before_checkin')
\ No newline at end of file
@@ -0,0 +1,108 @@
+import hashlib
+from functools import lru_cache
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count
+
+# Les graphiques sont des spécifications JSON (data + layout) dessinées par
+# plotly.js côté navigateur: plotly n'est importé que pour servir plotly.js
+
+_MISSING = object()
+
+LAYOUT = {
+    'plot_bgcolor': 'rgba(0,0,0,0)',
+    'paper_bgcolor': 'rgba(0,0,0,0)',
+    'font': {'color': '#1e293b'},
+    'margin': {'l': 50, 'r': 50, 't': 50, 'b': 50},
+}
+
+def _config():
+    return getattr(settings, 'CHARTS', {})
+
+def _cache():
+    return caches[_config().get('CACHE_ALIAS', 'default')]
+
+def _key(kind, key):
+    return f'chart:{kind}:{key}'
+
+def cached_chart(kind, key, build):
+    """Spécification du graphique (kind, key), construite par build() si absente du cache"""
+    spec = _cache().get(_key(kind, key), _MISSING)
+    if spec is _MISSING:
+        spec = build()
+        _cache().set(_key(kind, key), spec, _config().get('TIMEOUT', 24 * 60 * 60))
+    return spec
+
+def invalidate(kind, key):
+    _cache().delete(_key(kind, key))
+
+def figure(trace, title, title_size, height, **layout):
+    return {
+        'data': [trace],
+        'layout': {
+            **LAYOUT,
+            'title': {'text': title, 'font': {'size': title_size}},
+            'height': height,
+            **layout,
+        },
+    }
+
+# ==================== GRAPHIQUES ====================
+
+def hotels_by_city():
+    """Accueil: répartition des hôtels par ville (5 premières), None sans hôtel"""
+    def build():
+        from hotels.models import Hotel
+        rows = list(Hotel.objects.values('city').annotate(count=Count('id')).order_by('-count')[:5])
+        if not rows:
+            return None
+        return figure({
+            'type': 'bar',
+            'x': [row['city'] for row in rows],
+            'y': [row['count'] for row in rows],
+            'marker': {'color': ['#2563eb', '#0ea5e9', '#10b981', '#f59e0b', '#ef4444'][:len(rows)]},
+        }, 'Hôtels par ville', 16, 300)
+    return cached_chart('hotels_by_city', 'all', build)
+
+def room_prices(hotel_id, rooms):
+    """Détail hôtel: prix des chambres, None sans chambre"""
+    def build():
+        if not rooms:
+            return None
+        prices = [float(room.price_per_night) for room in rooms]
+        return figure({
+            'type': 'bar',
+            'x': [room.name for room in rooms],
+            'y': prices,
+            'marker': {'color': '#2563eb'},
+            'text': prices,
+            'texttemplate': '%{text:.0f}€',
+            'textposition': 'outside',
+        }, 'Prix des chambres', 14, 250, xaxis={'tickangle': -45})
+    return cached_chart('room_prices', hotel_id, build)
+
+def monthly_spending(user_id):
+    """Mes réservations: dépenses des 6 derniers mois, None sans réservation"""
+    def build():
+        from bookings.stats import spending_summary
+        summary = spending_summary(user_id, months=6)
+        if not summary['booking_count']:
+            return None
+        return figure({
+            'type': 'scatter',
+            'x': [row['month'] for row in summary['months']],
+            'y': [float(row['total']) for row in summary['months']],
+            'mode': 'lines+markers',
+            'line': {'color': '#2563eb', 'width': 3},
+            'marker': {'size': 8, 'color': '#2563eb'},
+        }, 'Historique des dépenses', 14, 300)
+    return cached_chart('monthly_spending', user_id, build)
+
+# ==================== PLOTLY.JS ====================
+
+@lru_cache(maxsize=None)
+def plotly_js():
+    """(contenu, etag) de plotly.js, lu une fois par processus depuis le paquet plotly"""
+    from plotly.offline import get_plotlyjs
+    content = get_plotlyjs().encode()
+    return content, hashlib.sha1(content).hexdigest()
@@ -0,0 +1,129 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+# Optionnel: brotli (paquet brotli), sinon gzip uniquement
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Contenus déjà compressés: les recompresser ne fait que coûter du CPU
+SKIP_CONTENT_TYPES = (
+    'image/', 'video/', 'audio/', 'font/woff',
+    'application/zip', 'application/gzip', 'application/x-gzip',
+    'application/pdf', 'application/octet-stream',
+)
+
+def _config():
+    return getattr(settings, 'COMPRESSION', {})
+
+def accepted_encodings(header):
+    """Encodages acceptés par le client (q > 0)"""
+    encodings = set()
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0
+        if name and q > 0:
+            encodings.add(name.strip().lower())
+    return encodings
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=_config().get('BROTLI_QUALITY', 5))
+    # Octets aléatoires dans l'en-tête gzip: atténue BREACH comme GZipMiddleware
+    return compress_string(content, max_random_bytes=100)
+
+def is_public(response):
+    """Cache-Control: public, sans private ni no-store"""
+    directives = {
+        item.split('=', 1)[0].strip().lower()
+        for item in response.get('Cache-Control', '').split(',')
+    }
+    return 'public' in directives and not directives & {'private', 'no-store'}
+
+class CompressionMiddleware:
+    """Compression gzip / brotli des réponses, avec cache des octets compressés.
+    
+    Les réponses trop petites, déjà encodées, en streaming ou de type déjà
+    compressé (images, zip...) sont laissées telles quelles. Pour une
+    réponse avec ETag ou publique (Cache-Control: public), la version
+    compressée est mise en cache: une page chaude n'est compressée qu'une
+    fois. Les autres sont compressées à chaque fois, sans cache.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.should_compress(response):
+            return response
+        
+        patch_vary_headers(response, ('Accept-Encoding',))
+        accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli is not None and 'br' in accepted:
+            encoding = 'br'
+        elif 'gzip' in accepted:
+            encoding = 'gzip'
+        else:
+            return response
+        
+        compressed = self.compressed_content(response, encoding)
+        if compressed is None:
+            return response
+        
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        response.headers['Content-Encoding'] = encoding
+        # Les octets diffèrent de la représentation d'origine: ETag faible
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        return response
+    
+    def should_compress(self, response):
+        if response.streaming or response.status_code != 200:
+            return False
+        if response.has_header('Content-Encoding'):
+            return False
+        if len(response.content) < _config().get('MIN_SIZE', 1024):
+            return False
+        content_type = response.get('Content-Type', '').lower()
+        return not content_type.startswith(SKIP_CONTENT_TYPES)
+    
+    def cache_key(self, response, encoding):
+        """Clé de la version compressée, ou None si elle ne doit pas être mise en cache"""
+        etag = response.get('ETag')
+        if etag:
+            return f'compressed:{encoding}:{etag}'
+        # Réponse propre à une requête (résultats, page avec jeton CSRF...):
+        # une entrée par contenu ne serait jamais relue et chasserait les autres
+        if not is_public(response):
+            return None
+        digest = hashlib.blake2b(response.content, digest_size=20).hexdigest()
+        return f'compressed:{encoding}:{digest}'
+    
+    def compressed_content(self, response, encoding):
+        """Octets compressés (depuis le cache si possible), ou None si aucun gain"""
+        key = self.cache_key(response, encoding)
+        cache = caches[_config().get('CACHE_ALIAS', 'default')]
+        if key is not None:
+            compressed = cache.get(key)
+            if compressed is not None:
+                return compressed or None
+        
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            compressed = b''
+        if key is not None:
+            # b'' mémorise aussi l'absence de gain
+            cache.set(key, compressed, _config().get('CACHE_TIMEOUT', 60 * 60))
+        return compressed or None
@@ -0,0 +1,58 @@
+import hashlib
+from django.db.models import Count, Max
+from django.http import HttpResponseNotModified
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+class ConditionalGetMixin:
+    """ETag / Last-Modified sur les vues génériques, 304 sans sérialisation.
+    
+    Les validateurs viennent d'un agrégat sur le queryset filtré (nombre
+    de lignes et max des champs `last_modified_fields`): une création,
+    une suppression ou une modification les change. Ils incluent aussi
+    l'URL complète (page, filtres, ?fields=) et le format de réponse.
+    """
+    last_modified_fields = ('updated_at',)
+    
+    def get_validators(self):
+        """(etag, last_modified) ou (None, None) si aucune ligne ne correspond"""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg in self.kwargs:
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        
+        aggregates = queryset.order_by().aggregate(
+            rows=Count('pk'),
+            **{f'max_{i}': Max(field) for i, field in enumerate(self.last_modified_fields)}
+        )
+        if not aggregates['rows']:
+            return None, None
+        
+        dates = [aggregates[f'max_{i}'] for i in range(len(self.last_modified_fields))]
+        last_modified = max(date for date in dates if date is not None)
+        key = repr((
+            aggregates['rows'],
+            [date.isoformat() if date else None for date in dates],
+            self.request.get_full_path(),
+            self.request.accepted_media_type,
+            self.get_validator_extra(),
+        ))
+        return quote_etag(hashlib.sha1(key.encode()).hexdigest()), last_modified
+    
+    def get_validator_extra(self):
+        """Autre donnée dont dépend la réponse, ajoutée à l'ETag (None par défaut)"""
+        return None
+    
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        if etag is None:
+            return super().get(request, *args, **kwargs)
+        
+        timestamp = int(last_modified.timestamp())
+        if get_conditional_response(request, etag=etag, last_modified=timestamp) is not None:
+            response = HttpResponseNotModified()
+        else:
+            response = super().get(request, *args, **kwargs)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(timestamp)
+        return response
@@ -0,0 +1,148 @@
+import inspect
+from datetime import datetime
+from operator import attrgetter
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
+from django.db.models import Manager
+from rest_framework import ISO_8601, serializers
+from rest_framework.fields import get_attribute
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.settings import api_settings
+from rest_framework.utils.serializer_helpers import ReturnList
+
+# Conversions équivalentes à to_representation() pour les champs simples
+_CONVERTERS = {
+    serializers.IntegerField: int,
+    serializers.CharField: str,
+    serializers.EmailField: str,
+    serializers.BooleanField: bool,
+}
+
+def _datetime_converter(field):
+    """DateTimeField ISO 8601: fuseau horaire résolu une fois au lieu d'une fois par valeur"""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+    
+    def convert(value):
+        # Valeurs naïves ou inattendues: chemin complet de DRF
+        if not isinstance(value, datetime) or value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+def _resolve_source(model, source_attrs):
+    """Getter précompilé pour un chemin `a.b.c` (appelle les méthodes comme DRF)"""
+    steps = []
+    for attr in source_attrs:
+        if model is None:
+            # Chemin inconnu (annotation, propriété...): lecture générique de DRF
+            return lambda obj: get_attribute(obj, source_attrs)
+        try:
+            related = model._meta.get_field(attr).related_model
+        except FieldDoesNotExist:
+            related = None
+        steps.append((attr, inspect.isfunction(getattr(model, attr, None))))
+        model = related
+    
+    if not any(call for attr, call in steps):
+        return attrgetter('.'.join(source_attrs))
+    
+    def getter(obj):
+        for attr, call in steps:
+            obj = getattr(obj, attr)
+            if call:
+                obj = obj()
+        return obj
+    return getter
+
+def _compile_field(field, model):
+    """Fonction objet -> valeur représentée, identique à ce que produit DRF"""
+    if isinstance(field, serializers.SerializerMethodField):
+        return getattr(field.parent, field.method_name)
+    
+    if isinstance(field, serializers.ListSerializer):
+        child = RowSerializer(field.child)
+        getter = _resolve_source(model, field.source_attrs)
+        
+        def extract(obj):
+            value = getter(obj)
+            if value is None:
+                return None
+            if isinstance(value, Manager):
+                value = value.all()
+            return [child(item) for item in value]
+        return extract
+    
+    if isinstance(field, serializers.BaseSerializer):
+        child = RowSerializer(field)
+        getter = _resolve_source(model, field.source_attrs)
+        
+        def extract(obj):
+            value = getter(obj)
+            return None if value is None else child(value)
+        return extract
+    
+    if isinstance(field, PrimaryKeyRelatedField) and model is not None and len(field.source_attrs) == 1:
+        # Comme l'optimisation PKOnlyObject de DRF: la clé étrangère suffit
+        return attrgetter(model._meta.get_field(field.source).attname)
+    
+    getter = _resolve_source(model, field.source_attrs)
+    if type(field) is serializers.DateTimeField:
+        convert = _datetime_converter(field)
+    else:
+        convert = _CONVERTERS.get(type(field), field.to_representation)
+    
+    def extract(obj):
+        value = getter(obj)
+        return None if value is None else convert(value)
+    return extract
+
+class RowSerializer:
+    """Sérialiseur en lecture seule précompilé à partir d'un sérialiseur DRF.
+    
+    Les champs sont analysés une seule fois; chaque objet est ensuite
+    converti en dict par une suite de getters et de conversions, sans
+    passer par la mécanique générique de DRF. Un objet qui sort du cas
+    prévu (attribut manquant...) est délégué au sérialiseur d'origine.
+    """
+    
+    def __init__(self, serializer):
+        self.serializer = serializer
+        model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+        self.fields = [
+            (field.field_name, _compile_field(field, model))
+            for field in serializer._readable_fields
+        ]
+    
+    def __call__(self, obj):
+        try:
+            return {name: extract(obj) for name, extract in self.fields}
+        except (AttributeError, KeyError, ObjectDoesNotExist):
+            return self.serializer.to_representation(obj)
+
+class FastListSerializer:
+    """Remplace `Serializer(instances, many=True)` pour les réponses en lecture"""
+    
+    many = True
+    
+    def __init__(self, instances, serializer_class, context=None):
+        self.instances = instances
+        self.child = serializer_class(context=context or {})
+    
+    @property
+    def data(self):
+        # Compilé au dernier moment: les champs de `child` peuvent avoir été restreints
+        row = RowSerializer(self.child)
+        return ReturnList([row(obj) for obj in self.instances], serializer=self)
+
+class FastListMixin:
+    """Vues génériques: listes GET sérialisées par FastListSerializer (écritures inchangées)"""
+    
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.get('many') and self.request.method in ('GET', 'HEAD'):
+            return FastListSerializer(args[0], self.get_serializer_class(), self.get_serializer_context())
+        return super().get_serializer(*args, **kwargs)
@@ -0,0 +1,121 @@
+from functools import reduce
+from operator import or_
+from django.core import signing
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+class KeysetPagination(BasePagination):
+    """Pagination par clé (keyset): pas d'OFFSET ni de COUNT(*).
+
+    L'ordre est celui du queryset filtré (order_by, ?ordering=...), complété
+    par la clé primaire pour être total. Le curseur, opaque et signé,
+    contient les valeurs de ces champs pour le dernier (ou premier) élément
+    de la page: la page suivante est un WHERE (a, b, id) > (...) servi par
+    l'index correspondant, quelle que soit sa profondeur. Les champs de
+    tri ne doivent pas être NULL.
+
+    Réponse: {"next": url, "previous": url, "results": [...]}.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    salt = 'keyset-pagination'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_ordering(self, queryset):
+        """[(champ, décroissant)] de l'ordre du queryset, clé primaire en dernier"""
+        fields = []
+        for name in queryset.query.order_by or queryset.model._meta.ordering:
+            if not isinstance(name, str):
+                raise TypeError("KeysetPagination: ordre par nom de champ uniquement")
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            if name in ('pk', queryset.model._meta.pk.name):
+                # Clé unique: les champs suivants ne départagent plus rien
+                return fields + [('pk', descending)]
+            fields.append((name, descending))
+        return fields + [('pk', fields[0][1] if fields else False)]
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            return signing.loads(cursor, salt=self.salt)
+        except signing.BadSignature:
+            raise NotFound("Curseur invalide")
+
+    def encode_cursor(self, obj, reverse):
+        values = []
+        for name, _ in self.ordering:
+            value = obj
+            for attr in name.split('__'):
+                value = getattr(value, attr)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else
+                          value if isinstance(value, (int, float)) else str(value))
+        cursor = signing.dumps({'v': values, 'r': reverse}, salt=self.salt, compress=True)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def seek(self, values, reverse):
+        """Lignes strictement après (ou avant, si reverse) la position values"""
+        conditions = []
+        for i, (name, descending) in enumerate(self.ordering):
+            lookup = 'lt' if descending != reverse else 'gt'
+            equal = {field: value for (field, _), value in zip(self.ordering[:i], values)}
+            conditions.append(Q(**equal, **{f'{name}__{lookup}': values[i]}))
+        return reduce(or_, conditions)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(queryset)
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor['r'])
+
+        order_by = [('-' if descending != reverse else '') + name for name, descending in self.ordering]
+        queryset = queryset.order_by(*order_by)
+        if cursor is not None:
+            if len(cursor['v']) != len(self.ordering):
+                raise NotFound("Curseur invalide")
+            queryset = queryset.filter(self.seek(cursor['v'], reverse))
+
+        # Un élément de plus: y a-t-il une page au-delà ?
+        page = list(queryset[:page_size + 1])
+        has_more = len(page) > page_size
+        page = page[:page_size]
+        if reverse:
+            page.reverse()
+
+        self.next = self.previous = None
+        if page:
+            if has_more or reverse:
+                self.next = self.encode_cursor(page[-1], reverse=False)
+            if cursor is not None and (has_more or not reverse):
+                self.previous = self.encode_cursor(page[0], reverse=True)
+        return page
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.next, 'previous': self.previous, 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,71 @@
+import logging
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+class QueryBudgetExceeded(AssertionError):
+    """Une vue a exécuté plus de requêtes SQL que son budget"""
+
+def query_budget(default=None, **per_method):
+    """Déclare le nombre maximal de requêtes SQL d'une vue (fonction ou classe).
+    
+    Exemples: @query_budget(4) ou @query_budget(GET=4, POST=12).
+    Le contrôle est fait par QueryBudgetMiddleware.
+    """
+    budgets = {method.upper(): limit for method, limit in per_method.items()}
+    if default is not None:
+        budgets['*'] = default
+    
+    def decorator(view):
+        view.query_budget = budgets
+        return view
+    return decorator
+
+def get_budget(view_func, method):
+    """Budget déclaré pour une vue et une méthode HTTP, ou None"""
+    budgets = getattr(view_func, 'query_budget', None)
+    if budgets is None:
+        view_class = getattr(view_func, 'view_class', None)
+        budgets = getattr(view_class, 'query_budget', None)
+    if not budgets:
+        return None
+    return budgets.get(method, budgets.get('*'))
+
+def _is_strict():
+    return getattr(settings, 'QUERY_BUDGET', {}).get('STRICT', False)
+
+class QueryCounter:
+    """Compte les requêtes passant par la connexion (execute_wrapper)"""
+    
+    def __init__(self):
+        self.count = 0
+    
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+class QueryBudgetMiddleware:
+    """Fait échouer les tests (STRICT) ou journalise en production les vues hors budget"""
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        
+        budget = getattr(request, '_query_budget', None)
+        if budget is not None and counter.count > budget:
+            message = (
+                f"{request.method} {request.path}: {counter.count} requêtes SQL "
+                f"pour un budget de {budget}"
+            )
+            if _is_strict():
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+    
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget = get_budget(view_func, request.method)
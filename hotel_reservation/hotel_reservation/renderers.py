@@ -0,0 +1,59 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Dépendances optionnelles: sans elles, on retombe sur le JSON de DRF
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Types non natifs (Decimal, dates, lazy strings...) convertis comme le JSONRenderer
+# de DRF: les deux formats décodent vers exactement les mêmes données
+_default = JSONEncoder().default
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer encodé par orjson (même JSON, plusieurs fois plus rapide)"""
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Sortie indentée (API navigable, `; indent=`): chemin DRF
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        ret = orjson.dumps(
+            data,
+            default=_default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        )
+        # Comme DRF: U+2028/U+2029 échappés (JSON valide en JavaScript)
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+class MessagePackRenderer(BaseRenderer):
+    """Réponses en MessagePack (Accept: application/msgpack ou ?format=msgpack)"""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_default, use_bin_type=True, datetime=False)
+
+class MessagePackParser(BaseParser):
+    """Corps de requête en MessagePack"""
+    media_type = 'application/msgpack'
+    
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, strict_map_key=False)
+        except Exception as e:
+            raise ParseError(f"MessagePack invalide: {e}")
@@ -1,4 +1,5 @@
-﻿import os
+﻿import importlib.util
+import os
 from datetime import timedelta
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SECRET_KEY = 'votre-secret-key-ici'
@@ -21,6 +22,7 @@ INSTALLED_APPS = [
 ]
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'hotel_reservation.compression.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -28,6 +30,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'hotel_reservation.query_budget.QueryBudgetMiddleware',
 ]
 ROOT_URLCONF = 'hotel_reservation.urls'
 TEMPLATES = [
@@ -51,6 +54,18 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'OPTIONS': {
+            # Les transactions prennent le verrou d'écriture dès BEGIN: les
+            # réservations concurrentes attendent au lieu d'échouer. Ce verrou
+            # porte sur toute la base: les écritures de tous les hôtels sont
+            # sérialisées (verrous par ligne seulement sur PostgreSQL / MySQL)
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        'TEST': {
+            # Base de test sur disque (les tests de concurrence ouvrent plusieurs connexions)
+            'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3'),
+        },
     }
 }
 AUTH_PASSWORD_VALIDATORS = [
@@ -77,9 +92,22 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'hotel_reservation.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10
 }
+# MessagePack (optionnel, paquet msgpack): Accept / Content-Type application/msgpack
+if importlib.util.find_spec('msgpack'):
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('hotel_reservation.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('hotel_reservation.renderers.MessagePackParser')
 # Configuration CORS
 CORS_ALLOW_ALL_ORIGINS = True
 # Login URLs
@@ -87,3 +115,66 @@ LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
 AUTH_USER_MODEL = 'accounts.User'
+# Matrice d'occupation en mémoire pour la recherche
+OCCUPANCY_MATRIX = {
+    'ENABLED': True,
+    'HORIZON_DAYS': 365,
+    'MAX_AGE': 300,  # secondes avant reconstruction
+}
+# Outbox des emails (envoyés par: python manage.py send_outbox_emails --loop)
+EMAIL_OUTBOX = {
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BASE_DELAY': 60,  # secondes, doublé à chaque échec
+    'RETRY_MAX_DELAY': 6 * 60 * 60,
+    'LEASE_SECONDS': 300,  # un lot non terminé est repris après ce délai
+}
+# Budget de requêtes SQL par vue (@query_budget): erreur si STRICT, avertissement sinon.
+# STRICT est forcé par le lanceur de tests (TEST_RUNNER), ou par QUERY_BUDGET_STRICT=1
+QUERY_BUDGET = {
+    'STRICT': os.environ.get('QUERY_BUDGET_STRICT') == '1',
+}
+TEST_RUNNER = 'hotel_reservation.test_runner.QueryBudgetTestRunner'
+# Compression des réponses (gzip, brotli si le paquet est installé)
+COMPRESSION = {
+    'MIN_SIZE': 1024,  # octets, en dessous le gain ne vaut pas le coût
+    'BROTLI_QUALITY': 5,
+    'CACHE_ALIAS': 'default',  # versions compressées des réponses avec ETag
+    'CACHE_TIMEOUT': 60 * 60,
+}
+# Graphiques des pages (spécifications JSON en cache, invalidées par signaux)
+CHARTS = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 24 * 60 * 60,
+}
+
+# Caches: 'search' est dédié aux résultats de recherche (éviction LRU au-delà de MAX_ENTRIES)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'search': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'search',
+        'TIMEOUT': 5 * 60,
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+
+# Cache des résultats de recherche (invalidé par hôtel et par dates, voir hotels/search_cache.py)
+SEARCH_CACHE = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'search',
+    'TIMEOUT': 5 * 60,
+}
+
+# Facettes de recherche (comptes par ville, étoiles, équipements, prix)
+FACETS = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 10 * 60,
+}
+
+# Index d'autocomplétion en mémoire (villes et hôtels, voir hotels/suggest.py)
+SUGGEST = {
+    'MAX_AGE': 10 * 60,  # secondes avant reconstruction (hôtels modifiés par d'autres processus)
+    'RANKING_MAX_AGE': 60,  # secondes avant de reclasser les hôtels après des réservations
+}
@@ -0,0 +1,99 @@
+from rest_framework import serializers
+
+def parse_fields(value):
+    """'id,name,images.image' -> {'id': None, 'name': None, 'images': {'image': None}}
+    
+    None signifie "tous les champs" à ce niveau.
+    """
+    if value is None:
+        return None
+    tree = {}
+    for path in value.split(','):
+        parts = [part for part in path.strip().split('.') if part]
+        node = tree
+        for i, part in enumerate(parts):
+            last = i == len(parts) - 1
+            if part in node and node[part] is None:
+                break
+            if last:
+                node[part] = None
+            else:
+                node = node.setdefault(part, {})
+    return tree
+
+def _nested(field):
+    """Sérialiseur enfant d'un champ imbriqué, ou None"""
+    if isinstance(field, serializers.ListSerializer):
+        return field.child
+    if isinstance(field, serializers.BaseSerializer):
+        return field
+    return None
+
+class SparseFieldsMixin:
+    """Paramètres ?fields= et ?expand= sur les vues génériques (lecture seule).
+    
+    - fields=id,name,images.image : ne garder que ces champs (les chemins
+      pointés restreignent les objets imbriqués);
+    - expand=images : parmi `expandable_fields`, n'inclure que ceux-ci
+      (expand= vide: aucun objet imbriqué). Sans expand, tout est inclus.
+    
+    `field_relations` associe un chemin de champ aux jointures qu'il
+    nécessite: {'images': ([select_related], [prefetch_related])}. Seules
+    celles des champs conservés sont appliquées.
+    """
+    expandable_fields = ()
+    field_relations = {}
+    
+    def _sparse_params(self):
+        if self.request.method not in ('GET', 'HEAD'):
+            return None, None
+        params = self.request.query_params
+        expand = params.get('expand')
+        if expand is not None:
+            expand = {name.strip() for name in expand.split(',') if name.strip()}
+        return parse_fields(params.get('fields')), expand
+    
+    def field_is_kept(self, path):
+        """Le champ `a.b.c` fait-il partie de la réponse ?"""
+        tree, expand = self._sparse_params()
+        parts = path.split('.')
+        root = parts[0]
+        if (expand is not None and root in self.expandable_fields and root not in expand
+                and (tree is None or root not in tree)):
+            return False
+        for part in parts:
+            if tree is None:
+                return True
+            if part not in tree:
+                return False
+            tree = tree[part]
+        return True
+    
+    def prune_serializer(self, serializer, prefix=''):
+        for name, field in list(serializer.fields.items()):
+            path = prefix + name
+            if not self.field_is_kept(path):
+                serializer.fields.pop(name)
+                continue
+            child = _nested(field)
+            if child is not None:
+                self.prune_serializer(child, path + '.')
+    
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self._sparse_params() != (None, None):
+            self.prune_serializer(serializer.child if kwargs.get('many') else serializer)
+        return serializer
+    
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        select, prefetch = [], []
+        for path, (select_related, prefetch_related) in self.field_relations.items():
+            if self.field_is_kept(path):
+                select.extend(select_related)
+                prefetch.extend(prefetch_related)
+        if select:
+            queryset = queryset.select_related(*dict.fromkeys(select))
+        if prefetch:
+            queryset = queryset.prefetch_related(*dict.fromkeys(prefetch))
+        return queryset
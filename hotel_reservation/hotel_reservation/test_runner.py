@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+class QueryBudgetTestRunner(DiscoverRunner):
+    """Lanceur de tests: une vue hors budget fait échouer le test (QUERY_BUDGET STRICT)"""
+    
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._query_budget = settings.QUERY_BUDGET
+        settings.QUERY_BUDGET = {**settings.QUERY_BUDGET, 'STRICT': True}
+    
+    def teardown_test_environment(self, **kwargs):
+        settings.QUERY_BUDGET = self._query_budget
+        super().teardown_test_environment(**kwargs)
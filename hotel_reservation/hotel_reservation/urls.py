@@ -3,6 +3,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from hotels.views import QuoteView
 from . import views
 
 urlpatterns = [
@@ -28,10 +29,12 @@ urlpatterns = [
     # API
     path('api/status/', views.api_status, name='api_status'),
     path('api/search/', views.api_search_hotels, name='api_search'),
+    path('charts/plotly.js', views.plotly_js, name='plotly_js'),
     
     # API REST (existant)
     path('api/auth/', include('accounts.urls')),
     path('api/hotels/', include('hotels.urls')),
+    path('api/quotes/', QuoteView.as_view(), name='quotes'),
     path('api/bookings/', include('bookings.urls')),
     
     # Admin
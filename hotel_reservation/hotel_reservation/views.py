@@ -5,66 +5,40 @@ from django.contrib import messages
 from django.utils import timezone
 from django.core.mail import send_mail
 from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import etag
 from datetime import datetime, timedelta
-import plotly.graph_objects as go
-import plotly.offline as opy
-from django.db.models import Count, Avg, Q
+from django.db.models import Avg, Q
 import json
 
 # Import des modèles
 from accounts.models import User
 from hotels.models import Hotel, RoomType, HotelImage
 from bookings.models import Booking, Payment, CancellationPolicy
+from bookings import inventory, outbox
+from bookings import stats as dashboard_stats
+from hotels import facets, pricing, search_cache, suggest
+from hotels.search import find_available_rooms
+from . import charts
 
 # ==================== VUES PUBLIQUES ====================
 
 def home(request):
     """Page d'accueil avec statistiques et graphiques"""
-    # Statistiques
-    stats = {
-        'hotel_count': Hotel.objects.count(),
-        'room_count': RoomType.objects.count(),
-        'booking_count': Booking.objects.filter(status='confirmed').count(),
-        'avg_rating': Hotel.objects.aggregate(Avg('stars'))['stars__avg'] or 0,
-    }
-    
-    # Graphique Plotly - Répartition des hôtels par ville
-    hotels_by_city = Hotel.objects.values('city').annotate(
-        count=Count('id')
-    ).order_by('-count')[:5]
+    # Statistiques (compteurs matérialisés, une requête)
+    stats = dashboard_stats.get_stats()
     
-    if hotels_by_city:
-        cities = [item['city'] for item in hotels_by_city]
-        counts = [item['count'] for item in hotels_by_city]
-        
-        fig = go.Figure(data=[
-            go.Bar(
-                x=cities,
-                y=counts,
-                marker_color=['#2563eb', '#0ea5e9', '#10b981', '#f59e0b', '#ef4444']
-            )
-        ])
-        
-        fig.update_layout(
-            title='Hôtels par ville',
-            title_font_size=16,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#1e293b'),
-            height=300,
-            margin=dict(l=50, r=50, t=50, b=50)
-        )
-        
-        plot_div = opy.plot(fig, auto_open=False, output_type='div')
-    else:
-        plot_div = "<div class='no-data'>Aucune donnée disponible</div>"
+    # Graphique - Répartition des hôtels par ville (spécification JSON en cache)
+    city_chart = charts.hotels_by_city()
     
     # Derniers hôtels ajoutés
     latest_hotels = Hotel.objects.order_by('-created_at')[:3]
     
     context = {
         'stats': stats,
-        'plot_div': plot_div,
+        'city_chart': city_chart,
         'latest_hotels': latest_hotels,
     }
     return render(request, 'index.html', context)
@@ -73,6 +47,9 @@ def hotel_list(request):
     """Liste de tous les hôtels avec filtres"""
     hotels = Hotel.objects.all()
     
+    # Facettes (une requête, en cache): chacune tient compte des autres filtres
+    hotel_facets = facets.hotel_facets(hotels, city=request.GET.get('city'), stars=request.GET.get('stars'))
+    
     # Filtrage
     city = request.GET.get('city')
     if city:
@@ -91,12 +68,9 @@ def hotel_list(request):
     else:
         hotels = hotels.order_by('name')
     
-    # Villes uniques pour le filtre
-    cities = Hotel.objects.values_list('city', flat=True).distinct()
-    
     context = {
         'hotels': hotels,
-        'cities': cities,
+        'facets': hotel_facets,
         'selected_city': city,
         'selected_stars': stars,
         'sort_by': sort_by,
@@ -108,47 +82,20 @@ def hotel_detail(request, hotel_id):
     hotel = get_object_or_404(Hotel, id=hotel_id)
     rooms = hotel.room_types.all()
     
-    # Graphique Plotly - Prix des chambres
-    if rooms:
-        room_names = [room.name for room in rooms]
-        room_prices = [float(room.price_per_night) for room in rooms]
-        
-        fig = go.Figure(data=[
-            go.Bar(
-                x=room_names,
-                y=room_prices,
-                marker_color='#2563eb',
-                text=room_prices,
-                texttemplate='%{text:.0f}€',
-                textposition='outside'
-            )
-        ])
-        
-        fig.update_layout(
-            title='Prix des chambres',
-            title_font_size=14,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#1e293b'),
-            height=250,
-            margin=dict(l=50, r=50, t=50, b=50),
-            xaxis_tickangle=-45
-        )
-        
-        price_plot = opy.plot(fig, auto_open=False, output_type='div')
-    else:
-        price_plot = None
+    # Graphique - Prix des chambres
+    price_chart = charts.room_prices(hotel.id, rooms)
     
     context = {
         'hotel': hotel,
         'rooms': rooms,
-        'price_plot': price_plot,
+        'price_chart': price_chart,
     }
     return render(request, 'hotels/detail.html', context)
 
 def search_hotels(request):
     """Page de recherche d'hôtels"""
-    cities = Hotel.objects.values_list('city', flat=True).distinct()
+    # Villes les plus fournies depuis l'index d'autocomplétion; la saisie interroge /api/hotels/suggest/
+    cities = [city['name'] for city in suggest.suggest('', limit=suggest.MAX_LIMIT)['cities']]
     
     context = {
         'cities': cities,
@@ -241,46 +188,12 @@ def my_bookings(request):
     """Page des réservations de l'utilisateur"""
     bookings = Booking.objects.filter(user=request.user).order_by('-created_at')
     
-    # Graphique Plotly - Évolution des dépenses
-    if bookings:
-        # Regrouper par mois
-        monthly_data = {}
-        for booking in bookings:
-            month_year = booking.created_at.strftime('%Y-%m')
-            if month_year not in monthly_data:
-                monthly_data[month_year] = 0
-            monthly_data[month_year] += float(booking.total_price)
-        
-        months = sorted(monthly_data.keys())[-6:]  # 6 derniers mois
-        amounts = [monthly_data[m] for m in months]
-        
-        fig = go.Figure(data=[
-            go.Scatter(
-                x=months,
-                y=amounts,
-                mode='lines+markers',
-                line=dict(color='#2563eb', width=3),
-                marker=dict(size=8, color='#2563eb')
-            )
-        ])
-        
-        fig.update_layout(
-            title='Historique des dépenses',
-            title_font_size=14,
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#1e293b'),
-            height=300,
-            margin=dict(l=50, r=50, t=50, b=50)
-        )
-        
-        plot_div = opy.plot(fig, auto_open=False, output_type='div')
-    else:
-        plot_div = None
+    # Graphique - Évolution des dépenses
+    spending_chart = charts.monthly_spending(request.user.id)
     
     context = {
         'bookings': bookings,
-        'plot_div': plot_div,
+        'spending_chart': spending_chart,
     }
     return render(request, 'bookings/list.html', context)
 
@@ -299,17 +212,27 @@ def booking_detail(request, booking_id):
             
             if days_before <= 0:
                 messages.error(request, 'Impossible d\'annuler une réservation après la date d\'arrivée')
+                return redirect('booking_detail', booking_id=booking_id)
             elif days_before < 7:
                 messages.warning(request, 'Annulation tardive - pénalité de 100%')
             
-            booking.status = 'cancelled'
-            booking.cancellation_reason = "Annulée par l'utilisateur"
-            booking.save()
-            
-            # Mettre à jour le paiement
-            if hasattr(booking, 'payment'):
-                booking.payment.payment_status = 'refunded'
-                booking.payment.save()
+            with transaction.atomic():
+                # Relire la ligne verrouillée: deux annulations concurrentes ne libèrent qu'une fois
+                booking = Booking.objects.select_for_update().get(pk=booking.pk)
+                if booking.status == 'cancelled':
+                    messages.info(request, "Réservation déjà annulée")
+                    return redirect('booking_detail', booking_id=booking_id)
+                if inventory.holds_inventory(booking):
+                    inventory.release(booking)
+                
+                booking.status = 'cancelled'
+                booking.cancellation_reason = "Annulée par l'utilisateur"
+                booking.save()
+                
+                # Mettre à jour le paiement
+                if hasattr(booking, 'payment'):
+                    booking.payment.payment_status = 'refunded'
+                    booking.payment.save()
             
             messages.success(request, "Réservation annulée avec succès")
             return redirect('booking_detail', booking_id=booking_id)
@@ -376,52 +299,48 @@ def create_booking(request, room_id):
         if guests > room.capacity * rooms:
             errors.append(f"Maximum {room.capacity * rooms} personne(s) pour {rooms} chambre(s)")
         
-        # Vérifier la disponibilité
-        overlapping_bookings = Booking.objects.filter(
-            room_type=room,
-            check_in_date__lt=check_out,
-            check_out_date__gt=check_in,
-            status__in=['pending', 'confirmed']
-        ).count()
-        
-        if overlapping_bookings + rooms > room.quantity_available:
+        # Vérifier la disponibilité (inventaire par nuit)
+        if check_in < check_out and inventory.available_rooms(room, check_in, check_out) < rooms:
             errors.append(f"Pas assez de chambres disponibles pour ces dates")
         
         if errors:
             for error in errors:
                 messages.error(request, error)
         else:
-            # Calcul du prix
-            nights = (check_out - check_in).days
-            total_price = room.price_per_night * nights * rooms
+            # Calcul du prix (tarifs par date, sinon price_per_night)
+            total_price = pricing.quote(room, check_in, check_out, rooms)
             
-            # Créer la réservation
-            booking = Booking.objects.create(
-                user=request.user,
-                room_type=room,
-                check_in_date=check_in,
-                check_out_date=check_out,
-                number_of_rooms=rooms,
-                number_of_guests=guests,
-                total_price=total_price,
-                status='pending',
-                special_requests=special_requests
-            )
-            
-            # Créer un paiement simulé
-            Payment.objects.create(
-                booking=booking,
-                amount=total_price,
-                payment_method='credit_card',
-                payment_status='pending',
-                transaction_id=f"TXN{booking.id:06d}"
-            )
-            
-            # Envoyer un email de confirmation
             try:
-                send_confirmation_email(booking)
-            except Exception as e:
-                print(f"Erreur d'envoi d'email: {e}")
+                with transaction.atomic():
+                    # Créer la réservation
+                    booking = Booking.objects.create(
+                        user=request.user,
+                        room_type=room,
+                        check_in_date=check_in,
+                        check_out_date=check_out,
+                        number_of_rooms=rooms,
+                        number_of_guests=guests,
+                        total_price=total_price,
+                        status='pending',
+                        special_requests=special_requests
+                    )
+                    # Réservation atomique des chambres (une autre réservation a pu passer entre-temps)
+                    inventory.reserve(booking)
+                    
+                    # Créer un paiement simulé
+                    Payment.objects.create(
+                        booking=booking,
+                        amount=total_price,
+                        payment_method='credit_card',
+                        payment_status='pending',
+                        transaction_id=f"TXN{booking.id:06d}"
+                    )
+                    
+                    # Email de confirmation (envoyé par le worker de l'outbox)
+                    send_confirmation_email(booking)
+            except inventory.RoomsUnavailable:
+                messages.error(request, "Pas assez de chambres disponibles pour ces dates")
+                return redirect('create_booking', room_id=room_id)
             
             messages.success(request, f"Réservation créée avec succès! Référence: #{booking.id}")
             return redirect('booking_detail', booking_id=booking.id)
@@ -441,20 +360,18 @@ def process_payment(request, booking_id):
     booking = get_object_or_404(Booking, id=booking_id, user=request.user)
     
     if booking.status == 'pending' and hasattr(booking, 'payment'):
-        # Simuler le paiement
-        booking.payment.payment_status = 'completed'
-        booking.payment.payment_date = timezone.now()
-        booking.payment.save()
-        
-        # Mettre à jour le statut de la réservation
-        booking.status = 'confirmed'
-        booking.save()
-        
-        # Envoyer un email de confirmation de paiement
-        try:
+        with transaction.atomic():
+            # Simuler le paiement
+            booking.payment.payment_status = 'completed'
+            booking.payment.payment_date = timezone.now()
+            booking.payment.save()
+            
+            # Mettre à jour le statut de la réservation
+            booking.status = 'confirmed'
+            booking.save()
+            
+            # Email de confirmation de paiement (envoyé par le worker de l'outbox)
             send_payment_confirmation_email(booking)
-        except Exception as e:
-            print(f"Erreur d'envoi d'email: {e}")
         
         messages.success(request, "Paiement effectué avec succès! Votre réservation est confirmée.")
     else:
@@ -465,7 +382,7 @@ def process_payment(request, booking_id):
 # ==================== FONCTIONS UTILITAIRES ====================
 
 def send_confirmation_email(booking):
-    """Envoyer un email de confirmation de réservation"""
+    """Mettre en file un email de confirmation de réservation"""
     subject = f'Confirmation de réservation #{booking.id}'
     
     message = f"""
@@ -492,16 +409,10 @@ def send_confirmation_email(booking):
     L'équipe HotelReservation
     """
     
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [booking.user.email],
-        fail_silently=False,
-    )
+    outbox.enqueue(subject, message, [booking.user.email], booking=booking)
 
 def send_payment_confirmation_email(booking):
-    """Envoyer un email de confirmation de paiement"""
+    """Mettre en file un email de confirmation de paiement"""
     subject = f'Confirmation de paiement - Réservation #{booking.id}'
     
     message = f"""
@@ -526,16 +437,10 @@ def send_payment_confirmation_email(booking):
     L'équipe HotelReservation
     """
     
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [booking.user.email],
-        fail_silently=False,
-    )
+    outbox.enqueue(subject, message, [booking.user.email], booking=booking)
 
 def send_cancellation_email(booking):
-    """Envoyer un email d'annulation"""
+    """Mettre en file un email d'annulation"""
     subject = f'Annulation de réservation #{booking.id}'
     
     message = f"""
@@ -559,13 +464,7 @@ def send_cancellation_email(booking):
     L'équipe HotelReservation
     """
     
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [booking.user.email],
-        fail_silently=False,
-    )
+    outbox.enqueue(subject, message, [booking.user.email], booking=booking)
 
 # ==================== VUE DE RECHERCHE API ====================
 
@@ -581,51 +480,60 @@ def api_search_hotels(request):
             min_price = data.get('min_price')
             max_price = data.get('max_price')
             stars = data.get('stars')
+            number_of_rooms = int(data.get('number_of_rooms') or 1)
+            number_of_guests = int(data.get('number_of_guests') or 1)
             
             # Convertir les dates
             check_in_date = datetime.strptime(check_in, '%Y-%m-%d').date()
             check_out_date = datetime.strptime(check_out, '%Y-%m-%d').date()
             
-            # Trouver les chambres réservées pendant cette période
-            booked_rooms = Booking.objects.filter(
-                Q(check_in_date__lt=check_out_date) & Q(check_out_date__gt=check_in_date),
-                status__in=['confirmed', 'pending']
-            ).values_list('room_type_id', flat=True)
-            
-            # Filtrer les chambres disponibles
-            rooms = RoomType.objects.filter(
-                quantity_available__gt=0
-            ).exclude(id__in=booked_rooms)
-            
-            # Appliquer les filtres supplémentaires
-            if city:
-                rooms = rooms.filter(hotel__city__icontains=city)
-            
-            if min_price:
-                rooms = rooms.filter(price_per_night__gte=min_price)
-            
-            if max_price:
-                rooms = rooms.filter(price_per_night__lte=max_price)
-            
-            if stars:
-                rooms = rooms.filter(hotel__stars=stars)
+            def search():
+                # Chambres ayant assez de disponibilité sur tout le séjour
+                rooms = find_available_rooms(
+                    check_in_date, check_out_date,
+                    number_of_rooms=number_of_rooms,
+                    number_of_guests=number_of_guests,
+                    city=city,
+                    min_price=min_price,
+                    max_price=max_price,
+                    stars=stars
+                )
+                
+                # Prix du séjour de chaque chambre trouvée (une requête pour toutes)
+                rooms = pricing.annotate_stay_prices(rooms, check_in_date, check_out_date, number_of_rooms)
+                
+                # Préparer les résultats
+                results = []
+                for room in rooms:
+                    results.append({
+                        'id': room.id,
+                        'name': room.hotel.name,
+                        'city': room.hotel.city,
+                        'room_name': room.name,
+                        'price_per_night': float(room.price_per_night),
+                        'total_price': float(room.total_price),
+                        'capacity': room.capacity,
+                        'rooms_left': room.rooms_left,
+                        'description': room.hotel.description[:100] + '...' if room.hotel.description else '',
+                        'stars': room.hotel.stars,
+                        'has_wifi': room.hotel.has_wifi,
+                        'has_parking': room.hotel.has_parking,
+                        'has_pool': room.hotel.has_pool,
+                    })
+                
+                return results, [room.hotel_id for room in rooms]
             
-            # Préparer les résultats
-            results = []
-            for room in rooms:
-                results.append({
-                    'id': room.id,
-                    'name': room.hotel.name,
-                    'city': room.hotel.city,
-                    'room_name': room.name,
-                    'price_per_night': float(room.price_per_night),
-                    'capacity': room.capacity,
-                    'description': room.hotel.description[:100] + '...' if room.hotel.description else '',
-                    'stars': room.hotel.stars,
-                    'has_wifi': room.hotel.has_wifi,
-                    'has_parking': room.hotel.has_parking,
-                    'has_pool': room.hotel.has_pool,
-                })
+            # Même recherche normalisée: servie depuis le cache tant qu'aucune écriture ne la concerne
+            results = search_cache.cached_search('web', {
+                'check_in': check_in_date,
+                'check_out': check_out_date,
+                'city': city,
+                'min_price': min_price,
+                'max_price': max_price,
+                'stars': stars,
+                'number_of_rooms': number_of_rooms,
+                'number_of_guests': number_of_guests,
+            }, check_in_date, check_out_date, search)
             
             return JsonResponse(results, safe=False)
             
@@ -659,6 +567,15 @@ def api_status(request):
         }
     })
 
+# ==================== PLOTLY.JS ====================
+
+@etag(lambda request: charts.plotly_js()[1])
+def plotly_js(request):
+    """plotly.js servi par l'application (mis en cache par le navigateur)"""
+    response = HttpResponse(charts.plotly_js()[0], content_type='application/javascript')
+    patch_cache_control(response, public=True, max_age=7 * 24 * 60 * 60)
+    return response
+
 # ==================== VUE ERREUR 404 ====================
 
 def custom_404(request, exception):
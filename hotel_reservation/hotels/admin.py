@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Hotel, HotelImage, RoomType, RoomImage
+from .models import Hotel, HotelImage, RoomType, RoomImage, RoomRate
 
 class HotelImageInline(admin.TabularInline):
     model = HotelImage
@@ -21,4 +21,10 @@ class RoomTypeAdmin(admin.ModelAdmin):
     list_display = ('name', 'hotel', 'room_type', 'price_per_night', 'capacity', 'quantity_available')
     list_filter = ('room_type', 'hotel')
     search_fields = ('name', 'hotel__name')
-    inlines = [RoomImageInline]
\ No newline at end of file
+    inlines = [RoomImageInline]
+
+@admin.register(RoomRate)
+class RoomRateAdmin(admin.ModelAdmin):
+    list_display = ('room_type', 'date', 'price', 'label')
+    list_filter = ('room_type__hotel', 'label')
+    date_hierarchy = 'date'
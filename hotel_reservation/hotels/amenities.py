@@ -0,0 +1,71 @@
+import numpy as np
+from rest_framework.exceptions import ValidationError
+
+# Nom public (?amenities=) -> champ booléen. La position donne le bit du
+# masque amenity_mask: ne jamais réordonner, seulement ajouter à la fin.
+HOTEL_AMENITIES = {
+    'wifi': 'has_wifi',
+    'parking': 'has_parking',
+    'pool': 'has_pool',
+    'spa': 'has_spa',
+    'restaurant': 'has_restaurant',
+    'gym': 'has_gym',
+}
+ROOM_AMENITIES = {
+    'tv': 'has_tv',
+    'ac': 'has_ac',
+    'minibar': 'has_minibar',
+    'safe': 'has_safe',
+    'balcony': 'has_balcony',
+    'smoking': 'is_smoking',
+}
+
+def mask_of(obj, amenities):
+    """Masque des équipements présents sur obj"""
+    return sum(1 << i for i, field in enumerate(amenities.values()) if getattr(obj, field))
+
+def parse(value, *groups):
+    """'wifi,pool,tv' -> un masque par groupe d'équipements (HOTEL_AMENITIES, ROOM_AMENITIES...)"""
+    masks = [0] * len(groups)
+    for name in (part.strip().lower() for part in str(value).split(',')):
+        if not name:
+            continue
+        for i, amenities in enumerate(groups):
+            if name in amenities:
+                masks[i] |= 1 << list(amenities).index(name)
+                break
+        else:
+            known = ', '.join(name for amenities in groups for name in amenities)
+            raise ValidationError({'amenities': [f"Équipement inconnu: {name} (valeurs possibles: {known})"]})
+    return masks
+
+def with_all(mask, amenities):
+    """Masques contenant tous les bits de `mask`.
+    
+    « amenity_mask & mask = mask » devient « amenity_mask IN (...) »:
+    même prédicat, mais servi par l'index sur amenity_mask (au plus
+    2^6 valeurs pour 6 équipements).
+    """
+    return [value for value in range(1 << len(amenities)) if value & mask == mask]
+
+def has_all(queryset, mask, amenities, prefix=''):
+    """Filtre le queryset sur les lignes ayant tous les équipements du masque"""
+    if not mask:
+        return queryset
+    return queryset.filter(**{f'{prefix}amenity_mask__in': with_all(mask, amenities)})
+
+def matches(masks, mask):
+    """Version vectorisée: tableau de booléens (masks & mask) == mask"""
+    masks = np.asarray(masks)
+    return (masks & mask) == mask
+
+def backfill(model, amenities, batch_size=500):
+    """Recalcule amenity_mask de toutes les lignes du modèle; renvoie le nombre corrigé"""
+    stale = []
+    for obj in model.objects.only('pk', 'amenity_mask', *amenities.values()).iterator(chunk_size=batch_size):
+        mask = mask_of(obj, amenities)
+        if obj.amenity_mask != mask:
+            obj.amenity_mask = mask
+            stale.append(obj)
+    model.objects.bulk_update(stale, ['amenity_mask'], batch_size=batch_size)
+    return len(stale)
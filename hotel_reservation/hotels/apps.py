@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class HotelsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hotels'
+    
+    def ready(self):
+        from . import occupancy, availability, search_cache, signals, suggest  # noqa: F401
@@ -0,0 +1,156 @@
+from datetime import timedelta
+from django.core.cache import cache
+from django.db.models import CharField, DateField, DecimalField, F, IntegerField, Value
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from bookings.inventory import inventory_changed
+from bookings.models import RoomInventory
+from .models import CalendarVersion, Hotel, RoomType, RoomRate
+from . import pricing
+
+# Durée de vie d'un calendrier en cache (les écritures l'invalident avant)
+CALENDAR_TIMEOUT = 60 * 60
+MAX_CALENDAR_DAYS = 366
+
+# Lignes de la requête du calendrier: type de chambre, tarif d'une nuit, nuit vendue
+ROOM, RATE, NIGHT = 0, 1, 2
+
+# Colonnes communes aux trois parties de l'UNION (NULL là où elles sont sans objet)
+_COLUMNS = {
+    'cal_kind': IntegerField(),
+    'cal_room_type': IntegerField(),
+    'cal_date': DateField(),
+    'cal_rooms': IntegerField(),
+    'cal_price': DecimalField(max_digits=10, decimal_places=2),
+    'cal_name': CharField(),
+    'cal_category': CharField(),
+    'cal_capacity': IntegerField(),
+}
+
+def _calendar_key(hotel_id, version, start, end):
+    return f'availability:{hotel_id}:{version}:{start.isoformat()}:{end.isoformat()}'
+
+def invalidate_hotel(hotel_id):
+    """Périme les calendriers en cache d'un hôtel (None: de tous les hôtels), dans tous les processus"""
+    versions = CalendarVersion.objects.all()
+    if hotel_id is not None:
+        versions = versions.filter(hotel_id=hotel_id)
+    # Sans ligne, l'hôtel n'a encore aucun calendrier en cache
+    versions.update(version=F('version') + 1)
+
+def _select(queryset, kind, **columns):
+    """Partie de l'UNION: les colonnes données, NULL pour les autres"""
+    columns['cal_kind'] = Value(kind)
+    for name, field in _COLUMNS.items():
+        columns.setdefault(name, Value(None, output_field=field))
+    return queryset.order_by().annotate(**columns).values_list(*_COLUMNS)
+
+def calendar_rows(hotel_id, start, end):
+    """Types de chambre, tarifs et nuits vendues de l'hôtel sur [start, end), en une requête (UNION ALL)"""
+    rooms = _select(
+        RoomType.objects.filter(hotel_id=hotel_id), ROOM,
+        cal_room_type=F('id'), cal_rooms=F('quantity_available'), cal_price=F('price_per_night'),
+        cal_name=F('name'), cal_category=F('room_type'), cal_capacity=F('capacity')
+    )
+    rates = _select(
+        RoomRate.objects.filter(room_type__hotel_id=hotel_id, date__gte=start, date__lt=end), RATE,
+        cal_room_type=F('room_type_id'), cal_date=F('date'), cal_price=F('price')
+    )
+    # Seules les nuits déjà vendues ont une ligne d'inventaire
+    nights = _select(
+        RoomInventory.objects.filter(room_type__hotel_id=hotel_id, date__gte=start, date__lt=end), NIGHT,
+        cal_room_type=F('room_type_id'), cal_date=F('date'), cal_rooms=F('rooms_left')
+    )
+    return list(rooms.union(rates, nights, all=True))
+
+def build_calendar(hotel_id, start, end):
+    """Grille par nuit (chambres restantes, prix) de chaque type de chambre de l'hôtel"""
+    nights = (end - start).days
+    dates = [start + timedelta(days=i) for i in range(nights)]
+    
+    rows = calendar_rows(hotel_id, start, end)
+    room_types = sorted(
+        (
+            {'id': room_type_id, 'name': name, 'room_type': category, 'capacity': capacity,
+             'quantity_available': rooms, 'price_per_night': price}
+            for kind, room_type_id, _, rooms, price, name, category, capacity in rows if kind == ROOM
+        ),
+        key=lambda room: room['id']
+    )
+    grid = {
+        room['id']: [room['quantity_available']] * nights
+        for room in room_types
+    }
+    
+    # Prix de chaque nuit (tarifs par date, sinon price_per_night)
+    ids, prices = pricing.nightly_prices(
+        {room['id']: room['price_per_night'] for room in room_types}, start, end,
+        rates=[(row[1], row[2], row[4]) for row in rows if row[0] == RATE]
+    )
+    prices = {
+        room_type_id: [str(pricing.from_cents(cents)) for cents in row]
+        for room_type_id, row in zip(ids, prices.tolist())
+    }
+    
+    for _, room_type_id, date, rooms_left, *_ in (row for row in rows if row[0] == NIGHT):
+        row = grid[room_type_id]
+        i = (date - start).days
+        row[i] = max(min(rooms_left, row[i]), 0)
+    
+    return {
+        'hotel': hotel_id,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'dates': [d.isoformat() for d in dates],
+        'room_types': [
+            {
+                'id': room['id'],
+                'name': room['name'],
+                'room_type': room['room_type'],
+                'capacity': room['capacity'],
+                'rooms_left': grid[room['id']],
+                'prices': prices[room['id']],
+            }
+            for room in room_types
+        ],
+    }
+
+def hotel_calendar(hotel_id, start, end):
+    """Calendrier de disponibilité (None si l'hôtel n'existe pas).
+    
+    Servi depuis le cache tant que la version de l'hôtel, lue en base avec
+    l'hôtel lui-même (une requête), n'a pas changé: une écriture validée
+    dans n'importe quel processus périme les calendriers de tous, même avec
+    un cache propre à chaque processus.
+    """
+    versions = list(Hotel.objects.filter(pk=hotel_id).values_list('calendar_version__version', flat=True))
+    if not versions:
+        return None
+    version = versions[0]
+    if version is None:
+        # Première demande pour cet hôtel. Si un autre processus crée la ligne
+        # puis l'incrémente entre-temps, la clé v0 n'est simplement plus lue.
+        CalendarVersion.objects.bulk_create([CalendarVersion(hotel_id=hotel_id)], ignore_conflicts=True)
+        version = 0
+    key = _calendar_key(hotel_id, version, start, end)
+    calendar = cache.get(key)
+    if calendar is None:
+        calendar = build_calendar(hotel_id, start, end)
+        cache.set(key, calendar, CALENDAR_TIMEOUT)
+    return calendar
+
+# ==================== SIGNAUX ====================
+
+@receiver(inventory_changed)
+def invalidate_on_booking(sender, hotel_id, **kwargs):
+    invalidate_hotel(hotel_id)
+
+@receiver(post_save, sender=RoomType)
+@receiver(post_delete, sender=RoomType)
+def invalidate_on_room_change(sender, instance, **kwargs):
+    invalidate_hotel(instance.hotel_id)
+
+@receiver(post_save, sender=RoomRate)
+@receiver(post_delete, sender=RoomRate)
+def invalidate_on_rate_change(sender, instance, **kwargs):
+    invalidate_hotel(instance.room_type.hotel_id)
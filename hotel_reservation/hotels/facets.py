@@ -0,0 +1,162 @@
+import hashlib
+from collections import Counter
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, OuterRef, Q, Subquery
+from .models import Hotel, RoomType
+
+# Tranches de prix: prix de la chambre la moins chère de l'hôtel (par nuit)
+PRICE_BUCKETS = ((0, 50), (50, 100), (100, 200), (200, None))
+
+AMENITIES = tuple(field.name for field in Hotel._meta.fields if field.name.startswith('has_'))
+
+_GENERATION_KEY = 'facets:generation'
+
+# Paramètres de pagination et d'affichage: sans effet sur les hôtels comptés
+IGNORED_PARAMS = ('cursor', 'page_size', 'fields', 'expand', 'ordering', 'facets', 'format')
+
+def _config():
+    return getattr(settings, 'FACETS', {})
+
+def _cache():
+    return caches[_config().get('CACHE_ALIAS', 'default')]
+
+def generation():
+    """Numéro incrémenté à chaque invalidation (fait partie des clés de cache)"""
+    return _cache().get(_GENERATION_KEY, 0)
+
+def invalidate():
+    """Périme toutes les facettes en cache (hôtel ou type de chambre modifié)"""
+    try:
+        _cache().incr(_GENERATION_KEY)
+    except ValueError:
+        _cache().set(_GENERATION_KEY, 1, None)
+
+def _bucket_filter(low, high, field):
+    condition = Q(**{f'{field}__gte': low})
+    if high is not None:
+        condition &= Q(**{f'{field}__lt': high})
+    return condition
+
+def _bucket(price):
+    for i, (low, high) in enumerate(PRICE_BUCKETS):
+        if price >= low and (high is None or price < high):
+            return i
+    return None
+
+def facet_rows(hotels):
+    """Comptes par (ville, étoiles) du queryset d'hôtels, en une requête.
+    
+    Chaque ligne porte, par agrégation conditionnelle, le nombre d'hôtels,
+    celui de chaque équipement has_* et de chaque tranche de prix: toutes
+    les facettes s'en déduisent sans autre requête.
+    """
+    cheapest = RoomType.objects.filter(hotel=OuterRef('pk')).order_by('price_per_night').values('price_per_night')[:1]
+    rows = hotels.order_by().annotate(from_price=Subquery(cheapest)).values('city', 'stars').annotate(
+        count=Count('pk'),
+        **{name: Count('pk', filter=Q(**{name: True})) for name in AMENITIES},
+        **{
+            f'price_{i}': Count('pk', filter=_bucket_filter(low, high, 'from_price'))
+            for i, (low, high) in enumerate(PRICE_BUCKETS)
+        }
+    ).order_by()
+    return [
+        {
+            'city': row['city'],
+            'stars': row['stars'],
+            'count': row['count'],
+            'amenities': {name: row[name] for name in AMENITIES},
+            'prices': [row[f'price_{i}'] for i in range(len(PRICE_BUCKETS))],
+        }
+        for row in rows
+    ]
+
+def room_facet_rows(rooms):
+    """Mêmes lignes pour des types de chambre déjà chargés (résultats de recherche).
+    
+    Un hôtel compte une fois, dans la tranche de sa chambre la moins chère
+    parmi les résultats; aucune requête.
+    """
+    hotels = {}
+    for room in rooms:
+        hotel, price = hotels.get(room.hotel_id, (room.hotel, room.price_per_night))
+        hotels[room.hotel_id] = (hotel, min(price, room.price_per_night))
+    
+    rows = {}
+    for hotel, price in hotels.values():
+        row = rows.setdefault((hotel.city, hotel.stars), {
+            'city': hotel.city,
+            'stars': hotel.stars,
+            'count': 0,
+            'amenities': dict.fromkeys(AMENITIES, 0),
+            'prices': [0] * len(PRICE_BUCKETS),
+        })
+        row['count'] += 1
+        for name in AMENITIES:
+            row['amenities'][name] += bool(getattr(hotel, name))
+        bucket = _bucket(price)
+        if bucket is not None:
+            row['prices'][bucket] += 1
+    return list(rows.values())
+
+def summarize(rows, city=None, stars=None):
+    """Facettes à partir des lignes (ville, étoiles).
+    
+    `city` (sous-chaîne, sans casse) et `stars` sont les filtres de la page
+    s'ils n'ont pas été appliqués au queryset: chaque facette tient compte
+    des autres filtres mais pas du sien (on peut changer de ville en
+    voyant le nombre d'hôtels de chacune).
+    """
+    def city_matches(row):
+        return not city or city.lower() in row['city'].lower()
+    
+    def stars_matches(row):
+        return not stars or str(row['stars']) == str(stars)
+    
+    cities, star_counts = Counter(), Counter()
+    amenities = Counter(dict.fromkeys(AMENITIES, 0))
+    prices = [0] * len(PRICE_BUCKETS)
+    for row in rows:
+        if stars_matches(row):
+            cities[row['city']] += row['count']
+        if city_matches(row):
+            star_counts[row['stars']] += row['count']
+        if city_matches(row) and stars_matches(row):
+            amenities.update(row['amenities'])
+            prices = [total + count for total, count in zip(prices, row['prices'])]
+    
+    return {
+        'city': [{'value': value, 'count': count}
+                 for value, count in sorted(cities.items(), key=lambda item: (-item[1], item[0]))],
+        'stars': [{'value': value, 'count': count} for value, count in sorted(star_counts.items(), reverse=True)],
+        'amenities': dict(amenities),
+        'price': [
+            {'min': low, 'max': high, 'count': count}
+            for (low, high), count in zip(PRICE_BUCKETS, prices)
+        ],
+    }
+
+def _filter_items(params):
+    """Paramètres de filtre (QueryDict ou dict) -> liste triée, sans valeurs vides ni paramètres ignorés"""
+    lists = params.lists() if hasattr(params, 'lists') else ((name, [value]) for name, value in params.items())
+    items = []
+    for name, values in sorted(lists):
+        values = sorted(str(value).strip() for value in values if value not in (None, ''))
+        if name not in IGNORED_PARAMS and values:
+            items.append((name, values))
+    return items
+
+def hotel_facets(hotels, params=None, city=None, stars=None):
+    """Facettes d'un queryset d'hôtels, en cache par paramètres de filtre.
+    
+    `params` sont les paramètres de la requête dont le queryset est issu:
+    même paramètres, mêmes hôtels (le SQL du queryset, lui, dépend de la
+    compilation de Django et se recompile à chaque appel).
+    """
+    digest = hashlib.sha1(repr((_filter_items(params or {}), city, stars)).encode()).hexdigest()
+    key = f'facets:{generation()}:{digest}'
+    facets = _cache().get(key)
+    if facets is None:
+        facets = summarize(facet_rows(hotels), city=city, stars=stars)
+        _cache().set(key, facets, _config().get('TIMEOUT', 10 * 60))
+    return facets
@@ -0,0 +1,86 @@
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend, SearchFilter
+from . import amenities, geo
+
+# Index plein texte disponible, par alias de base (vérifié une fois)
+_has_index = {}
+
+def index_exists(alias, table):
+    key = (alias, table)
+    if key not in _has_index:
+        connection = connections[alias]
+        _has_index[key] = connection.vendor == 'sqlite' and table in connection.introspection.table_names()
+    return _has_index[key]
+
+def match_query(terms):
+    """Termes de ?search= -> requête FTS5: chaque terme en préfixe ("par" trouve Paris), tous requis"""
+    return ' '.join('"%s"*' % term.replace('"', '""') for term in terms)
+
+class FullTextSearchFilter(SearchFilter):
+    """SearchFilter de DRF adossé à un index plein texte (FTS5 sur SQLite).
+    
+    La vue désigne l'index avec `search_index` (table FTS5 dont le rowid est
+    la clé primaire) et peut pondérer ses colonnes avec `search_rank_weights`.
+    Les résultats sont triés par pertinence (bm25), sauf si ?ordering= est
+    donné. Sans index (autre base de données), on retombe sur les icontains
+    de `search_fields`.
+    """
+    
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        table = getattr(view, 'search_index', None)
+        if not terms or table is None or not index_exists(queryset.db, table):
+            return super().filter_queryset(request, queryset, view)
+        
+        query = match_query(terms)
+        weights = ''.join(f', {weight}' for weight in getattr(view, 'search_rank_weights', ()))
+        model_table = queryset.model._meta.db_table
+        pk_column = queryset.model._meta.pk.column
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', (query,))
+        ).annotate(
+            search_rank=RawSQL(
+                f'SELECT bm25({table}{weights}) FROM {table} '
+                f'WHERE {table} MATCH %s AND rowid = "{model_table}"."{pk_column}"',
+                (query,)
+            )
+        ).order_by('search_rank', 'pk')
+
+class GeoFilter(BaseFilterBackend):
+    """?bbox=sud,ouest,nord,est et ?near=lat,lon&radius_km= sur les coordonnées.
+    
+    bbox est un simple filtre sur les colonnes latitude / longitude
+    (index composite). near préfiltre sur la boîte qui contient le cercle,
+    puis calcule en SQL la distance exacte (haversine) des seuls candidats:
+    les résultats reçoivent `distance_km` et sont triés du plus proche au
+    plus loin, sauf si ?ordering= est donné. Rien n'est chargé en Python:
+    le tri et le curseur de pagination portent sur la colonne calculée.
+    """
+    
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        if params.get('bbox'):
+            queryset = queryset.filter(geo.box_filter(geo.parse_bbox(params['bbox'])))
+        if not params.get('near'):
+            return queryset
+        
+        lat, lon, radius_km = geo.parse_near(params['near'], params.get('radius_km'))
+        return queryset.filter(geo.box_filter(geo.around(lat, lon, radius_km))).annotate(
+            distance_km=geo.distance_expression(lat, lon)
+        ).filter(distance_km__lte=radius_km).order_by('distance_km', 'pk')
+
+class AmenityFilter(BaseFilterBackend):
+    """?amenities=wifi,pool,spa: lignes ayant tous ces équipements.
+    
+    Un seul prédicat sur la colonne amenity_mask (indexée) au lieu d'un ET
+    par booléen. La vue donne ses équipements avec `amenity_fields`
+    (amenities.HOTEL_AMENITIES, ROOM_AMENITIES).
+    """
+    
+    def filter_queryset(self, request, queryset, view):
+        value = request.query_params.get('amenities')
+        if not value:
+            return queryset
+        mask, = amenities.parse(value, view.amenity_fields)
+        return amenities.has_all(queryset, mask, view.amenity_fields)
@@ -0,0 +1,117 @@
+import math
+import numpy as np
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Round, Sin, Sqrt
+from rest_framework.exceptions import ValidationError
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Rayon de ?near= (km)
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 500
+
+def _numbers(value, count, name):
+    try:
+        numbers = [float(part) for part in str(value).split(',')]
+    except ValueError:
+        numbers = []
+    if len(numbers) != count or not all(math.isfinite(number) for number in numbers):
+        raise ValidationError({name: [f"{count} nombre(s) séparé(s) par des virgules attendu(s)"]})
+    return numbers
+
+def parse_near(near, radius_km=None):
+    """near='lat,lon' et radius_km -> (lat, lon, rayon en km)"""
+    lat, lon = _numbers(near, 2, 'near')
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValidationError({'near': ["Coordonnées hors limites"]})
+    if radius_km in (None, ''):
+        return lat, lon, DEFAULT_RADIUS_KM
+    radius_km, = _numbers(radius_km, 1, 'radius_km')
+    if not 0 < radius_km <= MAX_RADIUS_KM:
+        raise ValidationError({'radius_km': [f"Rayon compris entre 0 et {MAX_RADIUS_KM} km"]})
+    return lat, lon, radius_km
+
+def parse_bbox(bbox):
+    """bbox='sud,ouest,nord,est' (lat min, lon min, lat max, lon max) -> boîte.
+    
+    ouest > est désigne une boîte qui traverse l'antiméridien.
+    """
+    south, west, north, east = _numbers(bbox, 4, 'bbox')
+    if not (-90 <= south <= north <= 90 and -180 <= west <= 180 and -180 <= east <= 180):
+        raise ValidationError({'bbox': ["Boîte hors limites (sud,ouest,nord,est)"]})
+    return south, west, north, east
+
+def around(lat, lon, radius_km):
+    """Boîte (sud, ouest, nord, est) qui contient le cercle de rayon radius_km"""
+    angle = radius_km / EARTH_RADIUS_KM
+    south = lat - math.degrees(angle)
+    north = lat + math.degrees(angle)
+    if south <= -90 or north >= 90:
+        # Le cercle contient un pôle: toutes les longitudes
+        return max(south, -90), -180, min(north, 90), 180
+    
+    spread = math.sin(angle) / math.cos(math.radians(lat))
+    if spread >= 1:
+        return south, -180, north, 180
+    delta = math.degrees(math.asin(spread))
+    west, east = lon - delta, lon + delta
+    if west < -180:
+        west += 360
+    if east > 180:
+        east -= 360
+    return south, west, north, east
+
+def box_filter(box, prefix=''):
+    """Q des lignes dont (latitude, longitude) est dans la boîte (index hotel_lat_lon_idx)"""
+    south, west, north, east = box
+    condition = Q(**{f'{prefix}latitude__gte': south, f'{prefix}latitude__lte': north})
+    if west <= east:
+        return condition & Q(**{f'{prefix}longitude__gte': west, f'{prefix}longitude__lte': east})
+    return condition & (Q(**{f'{prefix}longitude__gte': west}) | Q(**{f'{prefix}longitude__lte': east}))
+
+def haversine_km(lat, lon, lats, lons):
+    """Distances (km) de (lat, lon) à chacun des points (lats, lons)"""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    lon2 = np.radians(np.asarray(lons, dtype=np.float64))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def distance_expression(lat, lon, prefix=''):
+    """Expression SQL de la distance (km, arrondie au mètre) de (lat, lon) aux colonnes latitude / longitude.
+    
+    Même formule que haversine_km; sur SQLite, Django fournit les fonctions
+    trigonométriques.
+    """
+    lat2 = Radians(F(f'{prefix}latitude'), output_field=FloatField())
+    lon2 = Radians(F(f'{prefix}longitude'), output_field=FloatField())
+    a = (Power(Sin((lat2 - math.radians(lat)) / 2), 2)
+         + math.cos(math.radians(lat)) * Cos(lat2) * Power(Sin((lon2 - math.radians(lon)) / 2), 2))
+    distance = 2 * EARTH_RADIUS_KM * ASin(Sqrt(Least(a, Value(1.0))))
+    return Round(distance, 3, output_field=FloatField())
+
+def nearest(points, lat, lon, radius_km):
+    """[(clé, latitude, longitude)] -> [(clé, distance_km)] dans le rayon, du plus proche au plus loin.
+    
+    À distance égale, l'ordre d'entrée est conservé.
+    """
+    if not points:
+        return []
+    distances = haversine_km(lat, lon, [p[1] for p in points], [p[2] for p in points])
+    order = np.argsort(distances, kind='stable')
+    order = order[distances[order] <= radius_km]
+    return [(points[i][0], round(float(distances[i]), 3)) for i in order.tolist()]
+
+def by_distance(objects, lat, lon, radius_km, hotel=lambda obj: obj):
+    """Objets dont l'hôtel (hotel(obj)) est dans le rayon, du plus proche au plus loin, avec `distance_km`"""
+    objects = list(objects)
+    points = [
+        (i, hotel(obj).latitude, hotel(obj).longitude)
+        for i, obj in enumerate(objects)
+        if hotel(obj).latitude is not None and hotel(obj).longitude is not None
+    ]
+    results = []
+    for i, distance in nearest(points, lat, lon, radius_km):
+        objects[i].distance_km = distance
+        results.append(objects[i])
+    return results
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from hotels.amenities import HOTEL_AMENITIES, ROOM_AMENITIES, backfill
+from hotels.models import Hotel, RoomType
+
+class Command(BaseCommand):
+    help = "Recalcule amenity_mask des hôtels et types de chambre (après des update() en masse)"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+    
+    def handle(self, *args, **options):
+        hotels = backfill(Hotel, HOTEL_AMENITIES, options['batch_size'])
+        room_types = backfill(RoomType, ROOM_AMENITIES, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Masques corrigés: {hotels} hôtel(s), {room_types} type(s) de chambre"
+        ))
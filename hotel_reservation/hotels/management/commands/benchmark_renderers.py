@@ -0,0 +1,67 @@
+import json
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from hotel_reservation.fast_serializers import FastListSerializer
+from hotel_reservation.renderers import FastJSONRenderer, MessagePackRenderer, msgpack, orjson
+from hotels.serializers import AvailableRoomTypeSerializer
+from hotels.search import available_room_types
+from bookings.models import Booking
+from bookings.serializers import BookingSerializer
+from .benchmark_serializers import Command as SerializerBenchmark
+
+class Command(BaseCommand):
+    help = "Compare les encodeurs de réponse (JSON DRF, JSON rapide, MessagePack) sur des réponses réelles"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help="Lignes temporaires ajoutées avant la mesure")
+        parser.add_argument('--repeat', type=int, default=5)
+    
+    def handle(self, *args, **options):
+        renderers = [('JSON DRF', JSONRenderer(), json.loads)]
+        if orjson is not None:
+            renderers.append(('JSON orjson', FastJSONRenderer(), orjson.loads))
+        if msgpack is not None:
+            renderers.append(('MessagePack', MessagePackRenderer(), lambda body: msgpack.unpackb(body, raw=False)))
+        
+        with transaction.atomic():
+            if options['rows']:
+                SerializerBenchmark().create_rows(options['rows'])
+            
+            # Réponse de SearchHotelsView pour tout l'inventaire, et liste de réservations
+            check_in = timezone.now().date() + timedelta(days=30)
+            rooms = available_room_types(check_in, check_in + timedelta(days=2)).select_related('hotel').prefetch_related('images')
+            bookings = Booking.objects.select_related('user', 'room_type__hotel').prefetch_related('room_type__images')
+            payloads = [
+                ('Recherche', FastListSerializer(list(rooms), AvailableRoomTypeSerializer).data),
+                ('Réservations', FastListSerializer(list(bookings), BookingSerializer).data),
+            ]
+            transaction.set_rollback(True)
+        
+        for label, data in payloads:
+            expected = json.loads(JSONRenderer().render(data))
+            self.stdout.write(f"{label}: {len(data)} objets")
+            
+            for name, renderer, loads in renderers:
+                body = renderer.render(data)
+                if loads(body) != expected:
+                    raise CommandError(f"{label}: {name} ne décode pas vers les mêmes données")
+                encode = self.measure(lambda: renderer.render(data), options['repeat'])
+                decode = self.measure(lambda: loads(body), options['repeat'])
+                self.stdout.write(
+                    f"  {name:<12} {len(body) / 1024:8.1f} Ko  encodage {encode * 1000:7.2f} ms  "
+                    f"décodage {decode * 1000:7.2f} ms"
+                )
+    
+    def measure(self, func, repeat):
+        """Meilleur temps sur `repeat` essais"""
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -0,0 +1,95 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from hotel_reservation.fast_serializers import FastListSerializer
+from hotels.models import Hotel, HotelImage, RoomType, RoomImage
+from hotels.serializers import HotelSerializer, RoomTypeSerializer
+from bookings.models import Booking
+from bookings.serializers import BookingSerializer
+
+User = get_user_model()
+
+class Command(BaseCommand):
+    help = "Compare les sérialiseurs DRF et FastListSerializer sur des pages de N lignes"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+    
+    def handle(self, *args, **options):
+        rows = options['rows']
+        context = {'request': Request(APIRequestFactory().get('/api/'))}
+        
+        # Données temporaires, annulées à la fin
+        with transaction.atomic():
+            self.create_rows(rows)
+            cases = [
+                ('Hôtels', HotelSerializer, Hotel.objects.prefetch_related('images').order_by('-id')[:rows]),
+                ('Types de chambre', RoomTypeSerializer, RoomType.objects.select_related('hotel').prefetch_related('images').order_by('-id')[:rows]),
+                ('Réservations', BookingSerializer, Booking.objects.select_related('user', 'room_type__hotel').prefetch_related('room_type__images').order_by('-id')[:rows]),
+            ]
+            for label, serializer_class, queryset in cases:
+                instances = list(queryset)
+                drf = self.measure(lambda: serializer_class(instances, many=True, context=context).data, options['repeat'])
+                fast = self.measure(lambda: FastListSerializer(instances, serializer_class, context).data, options['repeat'])
+                
+                identical = (
+                    JSONRenderer().render(serializer_class(instances, many=True, context=context).data) ==
+                    JSONRenderer().render(FastListSerializer(instances, serializer_class, context).data)
+                )
+                if not identical:
+                    raise CommandError(f"{label}: sorties différentes")
+                
+                self.stdout.write(
+                    f"{label} ({len(instances)} lignes): DRF {drf * 1000:.1f} ms, "
+                    f"rapide {fast * 1000:.1f} ms, x{drf / fast:.1f}"
+                )
+            transaction.set_rollback(True)
+    
+    def measure(self, func, repeat):
+        """Meilleur temps sur `repeat` essais"""
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+    
+    def create_rows(self, rows):
+        user = User.objects.create_user(username='benchmark_serializers', first_name='Bench', last_name='Mark')
+        hotels = Hotel.objects.bulk_create([
+            Hotel(
+                name=f'Hôtel {i}', description='Hôtel de test', address=f'{i} rue du Test',
+                city='Paris', country='France', stars=1 + i % 5,
+                email='hotel@test.com', phone='0100000000', has_wifi=bool(i % 2)
+            )
+            for i in range(rows)
+        ])
+        HotelImage.objects.bulk_create([
+            HotelImage(hotel=hotel, image='hotel_images/test.jpg', is_main=True) for hotel in hotels
+        ])
+        room_types = RoomType.objects.bulk_create([
+            RoomType(
+                hotel=hotel, name='Chambre Double', room_type='double', description='Chambre double',
+                capacity=2, price_per_night=120, size=20, quantity_available=5
+            )
+            for hotel in hotels
+        ])
+        RoomImage.objects.bulk_create([
+            RoomImage(room_type=room_type, image='room_images/test.jpg') for room_type in room_types
+        ])
+        check_in = timezone.now().date() + timedelta(days=30)
+        Booking.objects.bulk_create([
+            Booking(
+                user=user, room_type=room_type, check_in_date=check_in,
+                check_out_date=check_in + timedelta(days=2), number_of_guests=2, total_price=240
+            )
+            for room_type in room_types
+        ])
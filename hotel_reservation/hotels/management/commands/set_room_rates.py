@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from django.core.management.base import BaseCommand, CommandError
+from hotels.models import RoomType, RoomRate
+from hotels.availability import invalidate_hotel
+from hotels import search_cache
+
+class Command(BaseCommand):
+    help = "Définit le tarif d'un type de chambre sur une période (saison, week-ends, événement)"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('room_type', type=int)
+        parser.add_argument('--from', dest='start', required=True, help="Première nuit (AAAA-MM-JJ)")
+        parser.add_argument('--to', dest='end', required=True, help="Nuit suivant la dernière (AAAA-MM-JJ)")
+        parser.add_argument('--price', help="Prix de la nuit")
+        parser.add_argument('--weekdays', help="Jours concernés, 0=lundi (ex: 4,5 pour vendredi et samedi)")
+        parser.add_argument('--label', default='')
+        parser.add_argument('--clear', action='store_true', help="Supprimer les tarifs de la période (retour à price_per_night)")
+    
+    def handle(self, *args, **options):
+        try:
+            room_type = RoomType.objects.get(id=options['room_type'])
+        except RoomType.DoesNotExist:
+            raise CommandError(f"Type de chambre {options['room_type']} introuvable")
+        try:
+            start = datetime.strptime(options['start'], '%Y-%m-%d').date()
+            end = datetime.strptime(options['end'], '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError("Format de date invalide")
+        weekdays = None
+        if options['weekdays']:
+            weekdays = {int(day) for day in options['weekdays'].split(',')}
+        
+        nights = [start + timedelta(days=i) for i in range((end - start).days)]
+        if weekdays is not None:
+            nights = [night for night in nights if night.weekday() in weekdays]
+        
+        if options['clear']:
+            deleted, _ = RoomRate.objects.filter(room_type=room_type, date__in=nights).delete()
+            self.stdout.write(self.style.SUCCESS(f"{deleted} tarif(s) supprimé(s)"))
+        else:
+            try:
+                price = Decimal(options['price'])
+            except (TypeError, InvalidOperation):
+                raise CommandError("--price est obligatoire (ex: 149.90)")
+            RoomRate.objects.bulk_create(
+                [RoomRate(room_type=room_type, date=night, price=price, label=options['label']) for night in nights],
+                update_conflicts=True,
+                unique_fields=['room_type', 'date'],
+                update_fields=['price', 'label']
+            )
+            self.stdout.write(self.style.SUCCESS(f"{len(nights)} nuit(s) à {price}€ pour {room_type}"))
+        
+        # bulk_create ne déclenche pas les signaux
+        invalidate_hotel(room_type.hotel_id)
+        search_cache.record(room_type.hotel_id, start, end)
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0002_room_type_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('label', models.CharField(blank=True, help_text='Week-end, haute saison, événement...', max_length=50)),
+                ('room_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rates', to='hotels.roomtype')),
+            ],
+            options={
+                'ordering': ['room_type', 'date'],
+                'constraints': [models.UniqueConstraint(fields=('room_type', 'date'), name='unique_room_type_rate')],
+            },
+        ),
+    ]
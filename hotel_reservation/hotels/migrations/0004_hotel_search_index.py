@@ -0,0 +1,66 @@
+from django.db import migrations
+
+# Index plein texte des hôtels (SQLite FTS5). Table à contenu externe: seuls
+# les index sont stockés, le texte reste dans hotels_hotel. Les triggers le
+# tiennent à jour, y compris pour les update() en masse et l'admin.
+# unicode61 + remove_diacritics: "hotel" trouve "Hôtel", "orleans" trouve "Orléans".
+
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE hotels_hotel_fts USING fts5(
+        name, city, country, description,
+        content='hotels_hotel',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER hotels_hotel_fts_insert AFTER INSERT ON hotels_hotel BEGIN
+        INSERT INTO hotels_hotel_fts(rowid, name, city, country, description)
+        VALUES (new.id, new.name, new.city, new.country, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER hotels_hotel_fts_delete AFTER DELETE ON hotels_hotel BEGIN
+        INSERT INTO hotels_hotel_fts(hotels_hotel_fts, rowid, name, city, country, description)
+        VALUES ('delete', old.id, old.name, old.city, old.country, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER hotels_hotel_fts_update AFTER UPDATE OF name, city, country, description ON hotels_hotel BEGIN
+        INSERT INTO hotels_hotel_fts(hotels_hotel_fts, rowid, name, city, country, description)
+        VALUES ('delete', old.id, old.name, old.city, old.country, old.description);
+        INSERT INTO hotels_hotel_fts(rowid, name, city, country, description)
+        VALUES (new.id, new.name, new.city, new.country, new.description);
+    END
+    """,
+    # Indexer les hôtels existants
+    "INSERT INTO hotels_hotel_fts(hotels_hotel_fts) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS hotels_hotel_fts_insert",
+    "DROP TRIGGER IF EXISTS hotels_hotel_fts_delete",
+    "DROP TRIGGER IF EXISTS hotels_hotel_fts_update",
+    "DROP TABLE IF EXISTS hotels_hotel_fts",
+]
+
+def run(statements):
+    def operation(apps, schema_editor):
+        # Autres bases: pas d'index, la recherche reste en icontains
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0003_room_rate'),
+    ]
+    
+    operations = [
+        migrations.RunPython(run(CREATE_SQL), run(DROP_SQL)),
+    ]
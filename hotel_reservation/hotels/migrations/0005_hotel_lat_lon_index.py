@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0004_hotel_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hotel',
+            index=models.Index(fields=['latitude', 'longitude'], name='hotel_lat_lon_idx'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:24
+
+from importlib import import_module
+from django.db import migrations, models
+
+# Ajouter ou retirer une colonne NOT NULL reconstruit la table hotels_hotel
+# sur SQLite, ce qui supprime les triggers de l'index plein texte (0004)
+search_index = import_module('hotels.migrations.0004_hotel_search_index')
+restore_search_index = search_index.run(search_index.DROP_SQL + search_index.CREATE_SQL)
+
+
+# Bits du masque à la date de cette migration (copie figée de hotels.amenities:
+# la migration ne doit pas dépendre du code de l'application)
+HOTEL_AMENITY_FIELDS = ('has_wifi', 'has_parking', 'has_pool', 'has_spa', 'has_restaurant', 'has_gym')
+ROOM_AMENITY_FIELDS = ('has_tv', 'has_ac', 'has_minibar', 'has_safe', 'has_balcony', 'is_smoking')
+
+
+def backfill(model, fields, batch_size=500):
+    stale = []
+    for obj in model.objects.only('pk', 'amenity_mask', *fields).iterator(chunk_size=batch_size):
+        mask = sum(1 << i for i, field in enumerate(fields) if getattr(obj, field))
+        if obj.amenity_mask != mask:
+            obj.amenity_mask = mask
+            stale.append(obj)
+    model.objects.bulk_update(stale, ['amenity_mask'], batch_size=batch_size)
+
+
+def fill_amenity_masks(apps, schema_editor):
+    backfill(apps.get_model('hotels', 'Hotel'), HOTEL_AMENITY_FIELDS)
+    backfill(apps.get_model('hotels', 'RoomType'), ROOM_AMENITY_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0005_hotel_lat_lon_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_search_index),
+        migrations.AddField(
+            model_name='hotel',
+            name='amenity_mask',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='roomtype',
+            name='amenity_mask',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='hotel',
+            index=models.Index(fields=['amenity_mask'], name='hotel_amenity_mask_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='roomtype',
+            index=models.Index(fields=['amenity_mask'], name='room_type_amenity_mask_idx'),
+        ),
+        migrations.RunPython(restore_search_index, migrations.RunPython.noop),
+        migrations.RunPython(fill_amenity_masks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0006_amenity_mask'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hotel',
+            index=models.Index(fields=['name', 'id'], name='hotel_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hotel',
+            index=models.Index(fields=['stars', 'id'], name='hotel_stars_id_idx'),
+        ),
+    ]
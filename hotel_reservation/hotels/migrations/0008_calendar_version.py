@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0007_hotel_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarVersion',
+            fields=[
+                ('hotel', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='calendar_version', serialize=False, to='hotels.hotel')),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
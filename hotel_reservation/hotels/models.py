@@ -1,5 +1,11 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from . import amenities
+
+def update_masks(save_kwargs):
+    """save(update_fields=...) enregistre aussi amenity_mask"""
+    if save_kwargs.get('update_fields') is not None:
+        save_kwargs['update_fields'] = {*save_kwargs['update_fields'], 'amenity_mask'}
 
 class Hotel(models.Model):
     STAR_CHOICES = [
@@ -32,9 +38,26 @@ class Hotel(models.Model):
     has_spa = models.BooleanField(default=False)
     has_restaurant = models.BooleanField(default=False)
     has_gym = models.BooleanField(default=False)
+    # Équipements ci-dessus en un entier (bits de amenities.HOTEL_AMENITIES), tenu à jour par save()
+    amenity_mask = models.PositiveSmallIntegerField(default=0, editable=False)
+    
+    class Meta:
+        indexes = [
+            # Recherche géographique: préfiltre sur une boîte (?near=, ?bbox=)
+            models.Index(fields=['latitude', 'longitude'], name='hotel_lat_lon_idx'),
+            models.Index(fields=['amenity_mask'], name='hotel_amenity_mask_idx'),
+            # Pagination par clé sur ?ordering=name / stars
+            models.Index(fields=['name', 'id'], name='hotel_name_id_idx'),
+            models.Index(fields=['stars', 'id'], name='hotel_stars_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.city}"
+    
+    def save(self, *args, **kwargs):
+        self.amenity_mask = amenities.mask_of(self, amenities.HOTEL_AMENITIES)
+        update_masks(kwargs)
+        super().save(*args, **kwargs)
 
 class HotelImage(models.Model):
     hotel = models.ForeignKey(Hotel, related_name='images', on_delete=models.CASCADE)
@@ -68,11 +91,54 @@ class RoomType(models.Model):
     has_safe = models.BooleanField(default=False)
     has_balcony = models.BooleanField(default=False)
     is_smoking = models.BooleanField(default=False)
+    # Équipements ci-dessus en un entier (bits de amenities.ROOM_AMENITIES), tenu à jour par save()
+    amenity_mask = models.PositiveSmallIntegerField(default=0, editable=False)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['amenity_mask'], name='room_type_amenity_mask_idx'),
+        ]
     
     def __str__(self):
         return f"{self.hotel.name} - {self.name}"
+    
+    def save(self, *args, **kwargs):
+        self.amenity_mask = amenities.mask_of(self, amenities.ROOM_AMENITIES)
+        update_masks(kwargs)
+        super().save(*args, **kwargs)
 
 class RoomImage(models.Model):
     room_type = models.ForeignKey(RoomType, related_name='images', on_delete=models.CASCADE)
     image = models.ImageField(upload_to='room_images/')
-    uploaded_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    uploaded_at = models.DateTimeField(auto_now_add=True)
+
+class RoomRate(models.Model):
+    """Prix d'un type de chambre pour une nuit donnée (remplace price_per_night cette nuit-là)"""
+    room_type = models.ForeignKey(RoomType, related_name='rates', on_delete=models.CASCADE)
+    date = models.DateField()
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    label = models.CharField(max_length=50, blank=True, help_text="Week-end, haute saison, événement...")
+    
+    class Meta:
+        ordering = ['room_type', 'date']
+        constraints = [
+            models.UniqueConstraint(fields=['room_type', 'date'], name='unique_room_type_rate'),
+        ]
+    
+    def __str__(self):
+        return f"{self.room_type} - {self.date}: {self.price}€"
+
+class CalendarVersion(models.Model):
+    """Version des calendriers de disponibilité d'un hôtel, partagée par tous les processus.
+    
+    Incrémentée par chaque écriture qui change le calendrier (réservation,
+    type de chambre, tarif): un calendrier en cache sous une autre version
+    n'est plus servi, quel que soit le processus qui l'a construit.
+    """
+    hotel = models.OneToOneField(Hotel, primary_key=True, related_name='calendar_version', on_delete=models.CASCADE)
+    version = models.BigIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.hotel_id} - calendrier v{self.version}"
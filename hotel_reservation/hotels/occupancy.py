@@ -0,0 +1,239 @@
+import logging
+import threading
+import time
+from datetime import timedelta
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from bookings import inventory
+from bookings.inventory import inventory_changed
+from bookings.models import RoomInventory
+from .amenities import matches
+from .models import Hotel, RoomType
+
+logger = logging.getLogger(__name__)
+
+class OccupancyMatrix:
+    """Matrice d'occupation en mémoire (types de chambre × nuits de l'horizon).
+    
+    `sold[i, j]` contient les chambres vendues du type `room_type_ids[i]`
+    pour la nuit `start + j`. Une recherche se résume à un min() vectorisé
+    sur une tranche de colonnes, et les équipements demandés à un ET sur
+    les masques `amenities[i] = (masque de l'hôtel, masque de la chambre)`. La matrice est construite depuis
+    l'inventaire par nuit puis tenue à jour par le signal inventory_changed.
+    
+    Elle retient la version de l'inventaire (ligne InventoryVersion, en
+    base, donc commune à tous les processus) sous laquelle elle est à
+    jour: chaque écriture de ce processus l'avance d'un cran, une écriture
+    d'un autre processus (ou rebuild_inventory) la met en retard et la
+    matrice est reconstruite à la recherche suivante.
+    """
+    
+    def __init__(self, horizon_days=365, max_age=300):
+        self.horizon_days = horizon_days
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.room_type_ids = np.empty(0, dtype=np.int64)
+        self.capacity = np.empty(0, dtype=np.int32)
+        self.hotel_ids = np.empty(0, dtype=np.int64)
+        self.amenities = np.empty((0, 2), dtype=np.int32)
+        self.sold = np.empty((0, horizon_days), dtype=np.int32)
+        self.rows = {}
+        self.start = None
+        self.built_at = None
+        self.version = None
+        self.stale = True
+    
+    def _load(self, start):
+        """Lit les types de chambre et l'inventaire de l'horizon depuis la base"""
+        room_types = list(RoomType.objects.order_by('id').values_list(
+            'id', 'quantity_available', 'hotel_id', 'hotel__amenity_mask', 'amenity_mask'
+        ))
+        ids = np.array([r[0] for r in room_types], dtype=np.int64)
+        capacity = np.array([r[1] for r in room_types], dtype=np.int32)
+        hotel_ids = np.array([r[2] for r in room_types], dtype=np.int64)
+        amenities = np.array([r[3:] for r in room_types], dtype=np.int32).reshape(-1, 2)
+        rows = {room_type_id: i for i, room_type_id in enumerate(ids.tolist())}
+        
+        sold = np.zeros((len(ids), self.horizon_days), dtype=np.int32)
+        nights = list(RoomInventory.objects.filter(
+            date__gte=start,
+            date__lt=start + timedelta(days=self.horizon_days),
+            rooms_sold__gt=0
+        ).values_list('room_type_id', 'date', 'rooms_sold'))
+        if nights:
+            row_idx = np.array([rows[n[0]] for n in nights], dtype=np.int64)
+            col_idx = np.array([(n[1] - start).days for n in nights], dtype=np.int64)
+            sold[row_idx, col_idx] = [n[2] for n in nights]
+        return ids, capacity, hotel_ids, amenities, rows, sold
+    
+    def rebuild(self):
+        """Reconstruit la matrice à partir de la base"""
+        start = timezone.now().date()
+        # Lue avant les données: une écriture concurrente rend la matrice en retard, jamais faussement à jour
+        version = inventory.version()
+        ids, capacity, hotel_ids, amenities, rows, sold = self._load(start)
+        with self._lock:
+            # Contrôle de cohérence: une matrice réputée à jour ne doit pas diverger de la base
+            if not self.stale and self.start == start and np.array_equal(ids, self.room_type_ids):
+                drift = (sold != self.sold).any(axis=1) | (capacity != self.capacity)
+                if drift.any():
+                    logger.warning("Matrice d'occupation divergente pour les types %s", ids[drift].tolist())
+            self.room_type_ids, self.capacity, self.rows, self.sold = ids, capacity, rows, sold
+            self.hotel_ids, self.amenities = hotel_ids, amenities
+            self.start = start
+            self.version = version
+            self.built_at = time.monotonic()
+            self.stale = False
+    
+    def is_fresh(self):
+        """La matrice reflète-t-elle toutes les écritures connues ? (une requête)"""
+        if self.stale or self.built_at is None:
+            return False
+        if time.monotonic() - self.built_at > self.max_age:
+            return False
+        if self.start != timezone.now().date():
+            return False
+        return inventory.version() == self.version
+    
+    def _advance(self, version):
+        """Écriture de ce processus sous `version` (verrou tenu): la suivante attendue, sinon en retard"""
+        if version is None or self.version is None or version != self.version + 1:
+            self.stale = True
+            return False
+        self.version = version
+        return True
+    
+    def covers(self, check_in, check_out):
+        """Le séjour est-il entièrement dans l'horizon ?"""
+        if self.start is None:
+            return False
+        return self.start <= check_in and check_out <= self.start + timedelta(days=self.horizon_days)
+    
+    def apply(self, room_type_id, check_in, check_out, rooms, version):
+        """Applique une variation de chambres vendues sur un séjour (écriture sous `version`)"""
+        with self._lock:
+            if self.stale or self.start is None:
+                return
+            row = self.rows.get(room_type_id)
+            # Type de chambre inconnu ou écriture d'un autre processus manquée
+            if row is None or not self._advance(version):
+                self.stale = True
+                return
+            first = max((check_in - self.start).days, 0)
+            last = min((check_out - self.start).days, self.horizon_days)
+            if first < last:
+                self.sold[row, first:last] += rooms
+    
+    def set_capacity(self, room_type_id, quantity, amenity_mask=None, version=None):
+        """Met à jour le nombre de chambres d'un type (et ses équipements)"""
+        with self._lock:
+            row = self.rows.get(room_type_id)
+            if row is None or not self._advance(version):
+                self.stale = True
+            else:
+                self.capacity[row] = quantity
+                if amenity_mask is not None:
+                    self.amenities[row, 1] = amenity_mask
+    
+    def set_hotel_amenities(self, hotel_id, amenity_mask, version=None):
+        """Met à jour le masque d'équipements d'un hôtel sur tous ses types de chambre"""
+        with self._lock:
+            if self._advance(version):
+                self.amenities[self.hotel_ids == hotel_id, 0] = amenity_mask
+    
+    def invalidate(self):
+        self.stale = True
+    
+    def available(self, check_in, check_out, number_of_rooms=1, amenity_masks=(0, 0)):
+        """Dictionnaire {room_type_id: rooms_left} des types ayant assez de chambres chaque nuit.
+        
+        amenity_masks: équipements requis (masque hôtel, masque chambre).
+        """
+        first = (check_in - self.start).days
+        last = (check_out - self.start).days
+        with self._lock:
+            rooms_left = self.capacity - self.sold[:, first:last].max(axis=1, initial=0)
+            mask = rooms_left >= number_of_rooms
+            if any(amenity_masks):
+                mask &= matches(self.amenities, np.array(amenity_masks, dtype=np.int32)).all(axis=1)
+            return dict(zip(self.room_type_ids[mask].tolist(), rooms_left[mask].tolist()))
+    
+    def verify(self):
+        """Compare la matrice à la base et renvoie les types de chambre divergents"""
+        if self.start is None:
+            return []
+        ids, capacity, hotel_ids, amenities, rows, sold = self._load(self.start)
+        with self._lock:
+            if not np.array_equal(ids, self.room_type_ids):
+                self.stale = True
+                return sorted(set(ids.tolist()) ^ set(self.room_type_ids.tolist()))
+            diff = (
+                (sold != self.sold).any(axis=1) | (capacity != self.capacity)
+                | (hotel_ids != self.hotel_ids) | (amenities != self.amenities).any(axis=1)
+            )
+            mismatched = ids[diff].tolist()
+            if mismatched:
+                self.stale = True
+            return mismatched
+
+_config = getattr(settings, 'OCCUPANCY_MATRIX', {})
+matrix = OccupancyMatrix(
+    horizon_days=_config.get('HORIZON_DAYS', 365),
+    max_age=_config.get('MAX_AGE', 300)
+)
+_rebuild_lock = threading.Lock()
+
+def is_enabled():
+    return getattr(settings, 'OCCUPANCY_MATRIX', {}).get('ENABLED', True)
+
+def lookup(check_in, check_out, number_of_rooms=1, amenity_masks=(0, 0)):
+    """Disponibilités depuis la matrice, ou None s'il faut passer par SQL"""
+    if not is_enabled():
+        return None
+    if not matrix.is_fresh():
+        # Un seul thread reconstruit, les autres passent par SQL
+        if not _rebuild_lock.acquire(blocking=False):
+            return None
+        try:
+            matrix.rebuild()
+        finally:
+            _rebuild_lock.release()
+    if not matrix.covers(check_in, check_out):
+        return None
+    return matrix.available(check_in, check_out, number_of_rooms, amenity_masks)
+
+# ==================== SIGNAUX ====================
+
+# Les modifications du catalogue avancent aussi la version, après commit,
+# pour que les matrices des autres processus se reconstruisent
+
+@receiver(inventory_changed)
+def apply_inventory_change(sender, room_type_id, check_in, check_out, rooms, version=None, **kwargs):
+    if rooms is None:
+        # Inventaire recalculé (rebuild_inventory)
+        matrix.invalidate()
+        return
+    matrix.apply(room_type_id, check_in, check_out, rooms, version)
+
+@receiver(post_save, sender=RoomType)
+def update_room_capacity(sender, instance, created, **kwargs):
+    if created:
+        matrix.invalidate()
+        transaction.on_commit(inventory.bump_version)
+    else:
+        transaction.on_commit(lambda: matrix.set_capacity(
+            instance.id, instance.quantity_available, instance.amenity_mask, inventory.bump_version()
+        ))
+
+@receiver(post_save, sender=Hotel)
+def update_hotel_amenities(sender, instance, **kwargs):
+    transaction.on_commit(lambda: matrix.set_hotel_amenities(instance.id, instance.amenity_mask, inventory.bump_version()))
+
+@receiver(post_delete, sender=RoomType)
+def remove_room_type(sender, instance, **kwargs):
+    matrix.invalidate()
+    transaction.on_commit(inventory.bump_version)
@@ -0,0 +1,58 @@
+from decimal import Decimal
+import numpy as np
+from .models import RoomRate
+
+def _cents(price):
+    return int(round(price * 100))
+
+def from_cents(cents):
+    return Decimal(int(cents)).scaleb(-2)
+
+def nightly_prices(base_prices, check_in, check_out, rates=None):
+    """Prix par nuit, en centimes, de plusieurs types de chambre.
+    
+    `base_prices` associe l'id du type de chambre à son price_per_night.
+    Retourne (ids, matrice[type de chambre, nuit]): le prix de base partout,
+    remplacé par les tarifs RoomRate du séjour (une seule requête, sauf si
+    l'appelant les a déjà lus: `rates` = [(id, date, prix)]).
+    """
+    ids = list(base_prices)
+    nights = (check_out - check_in).days
+    prices = np.repeat(
+        np.array([_cents(base_prices[room_type_id]) for room_type_id in ids], dtype=np.int64)[:, None],
+        max(nights, 0),
+        axis=1
+    )
+    if not ids or nights <= 0:
+        return ids, prices
+    
+    if rates is None:
+        rates = list(RoomRate.objects.filter(
+            room_type_id__in=ids,
+            date__gte=check_in,
+            date__lt=check_out
+        ).order_by().values_list('room_type_id', 'date', 'price'))
+    if rates:
+        rows = {room_type_id: i for i, room_type_id in enumerate(ids)}
+        row_idx = np.array([rows[rate[0]] for rate in rates], dtype=np.int64)
+        col_idx = np.array([(rate[1] - check_in).days for rate in rates], dtype=np.int64)
+        prices[row_idx, col_idx] = [_cents(rate[2]) for rate in rates]
+    return ids, prices
+
+def stay_prices(base_prices, check_in, check_out):
+    """{id du type de chambre: prix d'une chambre pour tout le séjour}"""
+    ids, prices = nightly_prices(base_prices, check_in, check_out)
+    totals = prices.sum(axis=1)
+    return {room_type_id: from_cents(total) for room_type_id, total in zip(ids, totals.tolist())}
+
+def quote(room_type, check_in, check_out, rooms=1):
+    """Prix total d'un séjour pour `rooms` chambres d'un type"""
+    return stay_prices({room_type.id: room_type.price_per_night}, check_in, check_out)[room_type.id] * rooms
+
+def annotate_stay_prices(room_types, check_in, check_out, rooms=1):
+    """Ajoute `total_price` (séjour complet, `rooms` chambres) à chaque type de chambre"""
+    room_types = list(room_types)
+    totals = stay_prices({room.id: room.price_per_night for room in room_types}, check_in, check_out)
+    for room in room_types:
+        room.total_price = totals[room.id] * rooms
+    return room_types
@@ -0,0 +1,73 @@
+import numpy as np
+from bookings.models import RoomInventory
+from .models import RoomType
+from . import pricing
+
+# Limites d'un appel à POST /api/quotes/
+MAX_QUOTES = 500
+MAX_SPAN_DAYS = 366
+
+def quote_many(items):
+    """Disponibilité et prix de plusieurs (type de chambre, séjour, chambres) en bloc.
+    
+    Trois requêtes quel que soit le nombre d'éléments: types de chambre,
+    tarifs et inventaire de toute la période couverte. Chaque élément
+    devient un masque de nuits sur cette période, et le prix (somme) comme
+    la nuit la plus chargée (max) sont calculés pour tous à la fois.
+    Un type de chambre inconnu est simplement indisponible.
+    """
+    if not items:
+        return []
+    start = min(item['check_in'] for item in items)
+    end = max(item['check_out'] for item in items)
+    span = (end - start).days
+    
+    room_types = {
+        room_type_id: (price, quantity)
+        for room_type_id, price, quantity in RoomType.objects.filter(
+            id__in={item['room_type'] for item in items}
+        ).values_list('id', 'price_per_night', 'quantity_available')
+    }
+    ids, prices = pricing.nightly_prices({k: v[0] for k, v in room_types.items()}, start, end)
+    rows = {room_type_id: i for i, room_type_id in enumerate(ids)}
+    
+    # Chambres vendues par (type de chambre, nuit) sur la période
+    sold = np.zeros((len(ids), span), dtype=np.int64)
+    nights = list(RoomInventory.objects.filter(
+        room_type_id__in=ids,
+        date__gte=start,
+        date__lt=end
+    ).order_by().values_list('room_type_id', 'date', 'rooms_sold'))
+    if nights:
+        sold[
+            np.array([rows[n[0]] for n in nights], dtype=np.int64),
+            np.array([(n[1] - start).days for n in nights], dtype=np.int64)
+        ] = [n[2] for n in nights]
+    
+    row = np.array([rows.get(item['room_type'], -1) for item in items], dtype=np.int64)
+    first = np.array([(item['check_in'] - start).days for item in items], dtype=np.int64)
+    last = np.array([(item['check_out'] - start).days for item in items], dtype=np.int64)
+    rooms = np.array([item['rooms'] for item in items], dtype=np.int64)
+    known = row >= 0
+    
+    if ids:
+        row = np.where(known, row, 0)
+        columns = np.arange(span)
+        stay = (columns >= first[:, None]) & (columns < last[:, None])
+        totals = np.where(stay, prices[row], 0).sum(axis=1) * rooms
+        quantity = np.array([room_types[room_type_id][1] for room_type_id in ids], dtype=np.int64)
+        rooms_left = np.maximum(quantity[row] - np.where(stay, sold[row], 0).max(axis=1), 0)
+    else:
+        totals = rooms_left = np.zeros(len(items), dtype=np.int64)
+    rooms_left = np.where(known, rooms_left, 0)
+    
+    return [
+        {
+            **item,
+            'nights': (item['check_out'] - item['check_in']).days,
+            'available': bool(is_known and left >= item['rooms']),
+            'rooms_left': left,
+            'total_price': pricing.from_cents(total) if is_known else None,
+        }
+        for item, is_known, left, total in zip(items, known.tolist(), rooms_left.tolist(), totals.tolist())
+    ]
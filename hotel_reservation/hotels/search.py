@@ -0,0 +1,150 @@
+import numpy as np
+from datetime import timedelta
+from numpy.lib.stride_tricks import sliding_window_view
+from django.db.models import F, FilteredRelation, Max, Q
+from django.db.models.functions import Coalesce
+from bookings.models import RoomInventory
+from .models import RoomType
+from . import amenities, geo, occupancy, pricing
+
+def _filter_room_types(number_of_guests, city, min_price, max_price, stars, area=None, amenity_masks=(0, 0)):
+    """Filtres indépendants de la disponibilité.
+    
+    `area`: boîte (sud, ouest, nord, est) de l'hôtel; `amenity_masks`:
+    équipements requis (masque hôtel, masque chambre).
+    """
+    rooms = RoomType.objects.select_related('hotel').prefetch_related('images').filter(
+        capacity__gte=number_of_guests
+    )
+    if city:
+        rooms = rooms.filter(hotel__city__icontains=city)
+    if min_price:
+        rooms = rooms.filter(price_per_night__gte=min_price)
+    if max_price:
+        rooms = rooms.filter(price_per_night__lte=max_price)
+    if stars:
+        rooms = rooms.filter(hotel__stars=stars)
+    if area:
+        rooms = rooms.filter(geo.box_filter(area, prefix='hotel__'))
+    hotel_mask, room_mask = amenity_masks
+    rooms = amenities.has_all(rooms, hotel_mask, amenities.HOTEL_AMENITIES, prefix='hotel__')
+    return amenities.has_all(rooms, room_mask, amenities.ROOM_AMENITIES)
+
+def available_room_types(check_in, check_out, number_of_rooms=1, number_of_guests=1,
+                         city='', min_price=None, max_price=None, stars=None, area=None,
+                         amenity_masks=(0, 0)):
+    """Types de chambre ayant assez de chambres libres sur tout le séjour.
+    
+    Une seule requête groupée sur l'inventaire par nuit: la nuit la plus
+    chargée du séjour (max de rooms_sold) est comparée à quantity_available.
+    Chaque type de chambre est annoté avec `rooms_left`.
+    """
+    rooms = _filter_room_types(number_of_guests, city, min_price, max_price, stars, area, amenity_masks)
+    
+    # La jointure ne porte que sur les nuits du séjour (index room_type, date)
+    return rooms.annotate(
+        stay_nights=FilteredRelation(
+            'inventory',
+            condition=Q(inventory__date__gte=check_in, inventory__date__lt=check_out)
+        )
+    ).annotate(
+        rooms_booked=Coalesce(Max('stay_nights__rooms_sold'), 0)
+    ).annotate(
+        rooms_left=F('quantity_available') - F('rooms_booked')
+    ).filter(
+        rooms_left__gte=number_of_rooms
+    )
+
+def find_available_rooms(check_in, check_out, number_of_rooms=1, number_of_guests=1,
+                         city='', min_price=None, max_price=None, stars=None, area=None,
+                         amenity_masks=(0, 0)):
+    """Recherche de disponibilité: matrice en mémoire si elle est à jour, sinon SQL.
+    
+    Avec la matrice, disponibilité et équipements sont filtrés en mémoire
+    (masques); la requête ne charge que les types de chambre retenus.
+    """
+    rooms_left = occupancy.lookup(check_in, check_out, number_of_rooms, amenity_masks)
+    if rooms_left is None:
+        return available_room_types(
+            check_in, check_out,
+            number_of_rooms=number_of_rooms,
+            number_of_guests=number_of_guests,
+            city=city,
+            min_price=min_price,
+            max_price=max_price,
+            stars=stars,
+            area=area,
+            amenity_masks=amenity_masks
+        )
+    
+    rooms = list(_filter_room_types(number_of_guests, city, min_price, max_price, stars, area).filter(
+        id__in=list(rooms_left)
+    ))
+    for room in rooms:
+        room.rooms_left = rooms_left[room.id]
+    return rooms
+
+def find_cheapest_stays(date_from, date_to, nights, number_of_rooms=1, number_of_guests=1,
+                        city='', min_price=None, max_price=None, stars=None, limit=3, area=None,
+                        amenity_masks=(0, 0)):
+    """Dates flexibles: séjours de `nights` nuits les moins chers dans [date_from, date_to).
+    
+    Prix et chambres restantes par nuit forment deux matrices (types de
+    chambre × nuits de la période). Pour chaque date d'arrivée possible,
+    une fenêtre glissante de `nights` colonnes donne en une passe le prix
+    du séjour (somme) et les chambres libres sur tout le séjour (minimum).
+    Chaque type de chambre disponible reçoit `cheapest_stays` (au plus
+    `limit`, du moins cher au plus cher, puis par date), et les types de
+    chambre sont triés par leur meilleur prix.
+    """
+    rooms = list(_filter_room_types(number_of_guests, city, min_price, max_price, stars, area, amenity_masks))
+    if not rooms:
+        return []
+    
+    ids, prices = pricing.nightly_prices({room.id: room.price_per_night for room in rooms}, date_from, date_to)
+    rows = {room_type_id: i for i, room_type_id in enumerate(ids)}
+    
+    # Chambres libres par nuit: quantité moins les chambres vendues (inventaire par nuit)
+    rooms_left = np.repeat(
+        np.array([room.quantity_available for room in rooms], dtype=np.int64)[:, None],
+        prices.shape[1],
+        axis=1
+    )
+    sold = list(RoomInventory.objects.filter(
+        room_type_id__in=ids,
+        date__gte=date_from,
+        date__lt=date_to
+    ).order_by().values_list('room_type_id', 'date', 'rooms_sold'))
+    if sold:
+        row_idx = np.array([rows[n[0]] for n in sold], dtype=np.int64)
+        col_idx = np.array([(n[1] - date_from).days for n in sold], dtype=np.int64)
+        rooms_left[row_idx, col_idx] -= [n[2] for n in sold]
+    
+    # [type de chambre, date d'arrivée]
+    stay_prices = sliding_window_view(prices, nights, axis=1).sum(axis=2)
+    stay_rooms_left = sliding_window_view(rooms_left, nights, axis=1).min(axis=2)
+    available = stay_rooms_left >= number_of_rooms
+    ranked = np.where(available, stay_prices, np.iinfo(np.int64).max)
+    best = np.argsort(ranked, axis=1, kind='stable')[:, :limit]
+    
+    results = []
+    for room in rooms:
+        i = rows[room.id]
+        starts = [j for j in best[i].tolist() if available[i, j]]
+        if not starts:
+            continue
+        room.cheapest_stays = [
+            {
+                'check_in': date_from + timedelta(days=j),
+                'check_out': date_from + timedelta(days=j + nights),
+                'total_price': pricing.from_cents(stay_prices[i, j]) * number_of_rooms,
+                'rooms_left': max(int(stay_rooms_left[i, j]), 0),
+            }
+            for j in starts
+        ]
+        room.total_price = room.cheapest_stays[0]['total_price']
+        room.rooms_left = room.cheapest_stays[0]['rooms_left']
+        results.append(room)
+    
+    results.sort(key=lambda room: room.total_price)
+    return results
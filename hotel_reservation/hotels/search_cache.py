@@ -0,0 +1,150 @@
+import hashlib
+import time
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from bookings.inventory import inventory_changed
+from .models import Hotel, HotelImage, RoomType, RoomImage, RoomRate
+
+# Cache des résultats de recherche, par requête normalisée.
+#
+# Chaque écriture d'inventaire ou de tarif est journalisée avec ses nuits:
+# par hôtel pour des chambres vendues (un hôtel ne peut que disparaître des
+# résultats où il figure), dans un journal commun pour des chambres
+# libérées (n'importe quel hôtel peut apparaître). Une entrée retient la
+# version des journaux de ses hôtels et du journal commun: elle n'est
+# périmée que si une écriture postérieure chevauche ses dates. Une
+# modification du catalogue (hôtel, type de chambre, images) change la
+# génération et périme tout.
+
+GENERATION_KEY = 'search:generation'
+WRITES_KEY = 'search:writes'
+RELEASED = 'released'
+
+# Au-delà, une entrée est jugée périmée sans relire le journal
+MAX_LOG_READS = 100
+
+def _config():
+    return getattr(settings, 'SEARCH_CACHE', {})
+
+def _cache():
+    return caches[_config().get('CACHE_ALIAS', 'default')]
+
+def _timeout():
+    return _config().get('TIMEOUT', 5 * 60)
+
+def is_enabled():
+    return _config().get('ENABLED', True)
+
+def _log_key(log):
+    return f'search:log:{log}'
+
+def _record_key(log, version):
+    return f'search:log:{log}:{version}'
+
+def _seed():
+    # Un compteur évincé repart plus haut: les entrées qui en dépendent
+    # ne retrouvent pas leurs versions et sont jugées périmées
+    return time.time_ns() // 1000
+
+def _counter(key):
+    cache = _cache()
+    cache.add(key, _seed(), None)
+    return cache.get(key)
+
+def _bump(key):
+    cache = _cache()
+    cache.add(key, _seed(), None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, _seed(), None)
+        return None
+
+def invalidate_all():
+    """Périme tout le cache de recherche (modification du catalogue)"""
+    _bump(GENERATION_KEY)
+
+def record(log, start, end):
+    """Journalise une écriture portant sur les nuits [start, end) (log: id d'hôtel ou RELEASED)"""
+    _bump(WRITES_KEY)
+    version = _bump(_log_key(log))
+    if version is not None:
+        _cache().set(_record_key(log, version), (start, end), _timeout())
+
+def normalize(params):
+    """Paramètres de recherche -> clé stable (casse, espaces, ordre, valeurs vides ignorés)"""
+    items = []
+    for name, value in sorted(params.items()):
+        if value is None or value == '' or value == ():
+            continue
+        if isinstance(value, str):
+            value = value.strip().lower()
+        elif isinstance(value, date):
+            value = value.isoformat()
+        items.append((name, str(value)))
+    return hashlib.sha1(repr(items).encode()).hexdigest()
+
+def _is_fresh(entry):
+    cache = _cache()
+    logs = entry['versions']
+    current = cache.get_many([_log_key(log) for log in logs])
+    keys = []
+    for log, version in logs.items():
+        now = current.get(_log_key(log))
+        if now is None or now < version or now - version > MAX_LOG_READS:
+            return False
+        keys.extend(_record_key(log, v) for v in range(version + 1, now + 1))
+    if not keys:
+        return True
+    records = cache.get_many(keys)
+    if len(records) != len(keys):
+        return False
+    return not any(start < entry['end'] and entry['start'] < end for start, end in records.values())
+
+def cached_search(kind, params, start, end, search):
+    """Résultat de la recherche `params` portant sur les nuits [start, end).
+    
+    search() calcule (données, ids des hôtels présents dans les données);
+    il n'est appelé que si aucune entrée à jour n'est en cache.
+    """
+    if not is_enabled():
+        return search()[0]
+    
+    cache = _cache()
+    key = f'search:{kind}:{_counter(GENERATION_KEY)}:{normalize(params)}'
+    entry = cache.get(key)
+    if entry is not None and _is_fresh(entry):
+        return entry['data']
+    
+    writes = _counter(WRITES_KEY)
+    data, hotel_ids = search()
+    versions = {log: _counter(_log_key(log)) for log in [RELEASED, *sorted(set(hotel_ids))]}
+    # Une écriture pendant le calcul: résultat peut-être déjà dépassé, non mis en cache
+    if cache.get(WRITES_KEY) == writes:
+        cache.set(key, {'data': data, 'start': start, 'end': end, 'versions': versions}, _timeout())
+    return data
+
+# ==================== SIGNAUX ====================
+
+@receiver(inventory_changed)
+def record_inventory_change(sender, hotel_id, check_in, check_out, rooms, **kwargs):
+    if rooms is None:
+        # Inventaire recalculé: n'importe quel résultat a pu changer
+        invalidate_all()
+        return
+    record(hotel_id if rooms > 0 else RELEASED, check_in, check_out)
+
+@receiver(post_save, sender=RoomRate)
+@receiver(post_delete, sender=RoomRate)
+def record_rate_change(sender, instance, **kwargs):
+    record(instance.room_type.hotel_id, instance.date, instance.date + timedelta(days=1))
+
+@receiver([post_save, post_delete], sender=Hotel)
+@receiver([post_save, post_delete], sender=HotelImage)
+@receiver([post_save, post_delete], sender=RoomType)
+@receiver([post_save, post_delete], sender=RoomImage)
+def invalidate_on_catalogue_change(sender, instance, **kwargs):
+    invalidate_all()
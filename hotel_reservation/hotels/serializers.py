@@ -1,5 +1,8 @@
+from functools import lru_cache
 from rest_framework import serializers
+from django.utils import timezone
 from .models import Hotel, HotelImage, RoomType, RoomImage
+from .availability import MAX_CALENDAR_DAYS
 
 class HotelImageSerializer(serializers.ModelSerializer):
     class Meta:
@@ -11,9 +14,17 @@ class HotelSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Hotel
-        fields = '__all__'
+        # amenity_mask: index interne, les équipements sont déjà exposés (has_*)
+        exclude = ['amenity_mask']
         read_only_fields = ['created_at', 'updated_at']
 
+@lru_cache(maxsize=None)
+def with_distance(serializer_class):
+    """Variante du sérialiseur avec `distance_km` (recherche autour d'un point)"""
+    return type(f'{serializer_class.__name__}WithDistance', (serializer_class,), {
+        'distance_km': serializers.FloatField(read_only=True),
+    })
+
 class RoomImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = RoomImage
@@ -26,10 +37,80 @@ class RoomTypeSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = RoomType
-        fields = '__all__'
+        exclude = ['amenity_mask']
+
+class AvailableRoomTypeSerializer(RoomTypeSerializer):
+    rooms_left = serializers.IntegerField(read_only=True)
+    total_price = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+class StaySerializer(serializers.Serializer):
+    check_in = serializers.DateField()
+    check_out = serializers.DateField()
+    total_price = serializers.DecimalField(max_digits=12, decimal_places=2)
+    rooms_left = serializers.IntegerField()
+
+class FlexibleRoomTypeSerializer(AvailableRoomTypeSerializer):
+    """Type de chambre avec ses séjours les moins chers (recherche à dates flexibles)"""
+    cheapest_stays = StaySerializer(many=True, read_only=True)
 
 class AvailableRoomSerializer(serializers.Serializer):
     check_in = serializers.DateField()
     check_out = serializers.DateField()
     number_of_rooms = serializers.IntegerField(min_value=1, default=1)
-    number_of_guests = serializers.IntegerField(min_value=1, default=1)
\ No newline at end of file
+    number_of_guests = serializers.IntegerField(min_value=1, default=1)
+    
+    def validate(self, data):
+        # Refusé ici, avant toute lecture de l'inventaire
+        if data['check_in'] >= data['check_out']:
+            raise serializers.ValidationError("La date de départ doit être après la date d'arrivée")
+        if data['check_in'] < timezone.now().date():
+            raise serializers.ValidationError("La date d'arrivée ne peut pas être dans le passé")
+        if (data['check_out'] - data['check_in']).days > MAX_CALENDAR_DAYS:
+            raise serializers.ValidationError(f"Séjour limité à {MAX_CALENDAR_DAYS} jours")
+        return data
+
+class SearchFiltersSerializer(serializers.Serializer):
+    """Filtres communs aux deux modes de recherche; une valeur vide = pas de filtre"""
+    city = serializers.CharField(required=False, allow_blank=True, default='')
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False, default=None)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False, default=None)
+    stars = serializers.IntegerField(min_value=1, max_value=5, required=False, default=None)
+    
+    def to_internal_value(self, data):
+        data = {name: data[name] for name in self.fields if data.get(name) not in (None, '')}
+        return super().to_internal_value(data)
+
+class FlexibleSearchSerializer(serializers.Serializer):
+    """Dates flexibles: séjours de `nights` nuits compris dans [date_from, date_to)"""
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    nights = serializers.IntegerField(min_value=1)
+    number_of_rooms = serializers.IntegerField(min_value=1, default=1)
+    number_of_guests = serializers.IntegerField(min_value=1, default=1)
+    results_per_room = serializers.IntegerField(min_value=1, max_value=31, default=3)
+    
+    def validate(self, data):
+        if data['date_from'] < timezone.now().date():
+            raise serializers.ValidationError("La période ne peut pas commencer dans le passé")
+        span = (data['date_to'] - data['date_from']).days
+        if data['nights'] > span:
+            raise serializers.ValidationError("La période est plus courte que le séjour")
+        if span > MAX_CALENDAR_DAYS:
+            raise serializers.ValidationError(f"Période limitée à {MAX_CALENDAR_DAYS} jours")
+        return data
+
+class QuoteSerializer(serializers.Serializer):
+    """Élément de POST /api/quotes/ (en entrée), complété par le devis (en sortie)"""
+    room_type = serializers.IntegerField()
+    check_in = serializers.DateField()
+    check_out = serializers.DateField()
+    rooms = serializers.IntegerField(min_value=1, default=1)
+    nights = serializers.IntegerField(read_only=True)
+    available = serializers.BooleanField(read_only=True)
+    rooms_left = serializers.IntegerField(read_only=True)
+    total_price = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    
+    def validate(self, data):
+        if data['check_in'] >= data['check_out']:
+            raise serializers.ValidationError("La date de départ doit être après la date d'arrivée")
+        return data
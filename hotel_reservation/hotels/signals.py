@@ -0,0 +1,34 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from hotel_reservation import charts
+from .models import Hotel, HotelImage, RoomType, RoomImage
+from . import facets
+
+# Les images font partie des réponses hôtel / chambre: leur modification
+# doit changer updated_at (ETag et Last-Modified de l'API)
+
+@receiver([post_save, post_delete], sender=HotelImage)
+def touch_hotel(sender, instance, **kwargs):
+    Hotel.objects.filter(pk=instance.hotel_id).update(updated_at=timezone.now())
+
+@receiver([post_save, post_delete], sender=RoomImage)
+def touch_room_type(sender, instance, **kwargs):
+    RoomType.objects.filter(pk=instance.room_type_id).update(updated_at=timezone.now())
+
+# Graphiques des pages (spécifications en cache)
+
+@receiver([post_save, post_delete], sender=Hotel)
+def invalidate_city_chart(sender, instance, **kwargs):
+    charts.invalidate('hotels_by_city', 'all')
+
+@receiver([post_save, post_delete], sender=RoomType)
+def invalidate_price_chart(sender, instance, **kwargs):
+    charts.invalidate('room_prices', instance.hotel_id)
+
+# Facettes de recherche (comptes en cache)
+
+@receiver([post_save, post_delete], sender=Hotel)
+@receiver([post_save, post_delete], sender=RoomType)
+def invalidate_facets(sender, instance, **kwargs):
+    facets.invalidate()
@@ -0,0 +1,239 @@
+import heapq
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from bookings.inventory import inventory_changed
+from bookings.models import Booking
+from .models import Hotel
+
+DEFAULT_LIMIT = 5
+MAX_LIMIT = 20
+
+# Ligatures que NFKD ne décompose pas
+_LIGATURES = str.maketrans({'œ': 'oe', 'æ': 'ae'})
+
+def fold(text):
+    """Forme de comparaison: sans accents ni casse, ponctuation ramenée à des espaces ("Saint-Étienne" -> "saint etienne")"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c if c.isalnum() else ' ' for c in text if not unicodedata.combining(c))
+    return ' '.join(text.casefold().translate(_LIGATURES).split())
+
+def _keys(text):
+    """Clés d'un libellé: le libellé entier puis chaque fin à partir d'un mot ("ritz" trouve "Hôtel Ritz")"""
+    words = fold(text).split()
+    return {' '.join(words[i:]) for i in range(len(words))}
+
+class SuggestIndex:
+    """Index de préfixes en mémoire des villes et des noms d'hôtels.
+    
+    Les clés (repliées par fold) sont dans une liste triée: les clés qui
+    commencent par un préfixe forment une tranche contiguë, trouvée par
+    deux bisect. Chaque clé pointe vers une ville ou un hôtel; parmi les
+    correspondances, les plus populaires passent en premier (villes: nombre
+    d'hôtels, hôtels: chambres réservées), d'après un classement recalculé
+    dès qu'un nom ou une ville change, mais au plus toutes les
+    ranking_max_age secondes après des réservations (une réservation ne
+    reconstruit pas le classement à elle seule). Les préfixes courts qui
+    couvrent une grande partie de l'index ("h", "hotel") sont mémorisés
+    jusqu'au classement suivant. Construit depuis la base puis tenu à jour
+    par les signaux (hôtel enregistré ou supprimé, réservation).
+    """
+    
+    # Au-delà de ce nombre de clés correspondantes, le résultat est mémorisé
+    MEMO_MIN_KEYS = 256
+    
+    def __init__(self, max_age=600, ranking_max_age=60):
+        self.max_age = max_age
+        self.ranking_max_age = ranking_max_age
+        self._lock = threading.Lock()
+        self.keys = []
+        # (clé, ('city', ville repliée) ou ('hotel', id)), trié comme keys
+        self.entries = []
+        # id -> (nom, ville, nom replié, clés)
+        self.hotels = {}
+        # ville repliée -> (ville, clés)
+        self.cities = {}
+        self.city_counts = Counter()
+        self.bookings = Counter()
+        self._ranking = None
+        self._ranked_at = None
+        # Réservations comptées depuis le dernier classement
+        self._bookings_changed = False
+        self._memo = {}
+        self.built_at = None
+    
+    def rebuild(self):
+        """Reconstruit l'index à partir de la base (deux requêtes)"""
+        hotels = list(Hotel.objects.values_list('id', 'name', 'city'))
+        bookings = Counter(dict(
+            Booking.objects.exclude(status='cancelled').values('room_type__hotel')
+            .annotate(rooms=Sum('number_of_rooms')).values_list('room_type__hotel', 'rooms')
+        ))
+        with self._lock:
+            self.hotels, self.cities, self.city_counts = {}, {}, Counter()
+            self.bookings = bookings
+            entries = []
+            for hotel_id, name, city in hotels:
+                entries.extend(self._add_hotel(hotel_id, name, city))
+            entries.sort()
+            self.entries = entries
+            self.keys = [key for key, _ in entries]
+            self._ranking = None
+            self.built_at = time.monotonic()
+    
+    def is_fresh(self):
+        return self.built_at is not None and time.monotonic() - self.built_at <= self.max_age
+    
+    def invalidate(self):
+        self.built_at = None
+    
+    def _add_hotel(self, hotel_id, name, city):
+        """Enregistre l'hôtel et renvoie les entrées à insérer (verrou tenu)"""
+        keys = _keys(name)
+        self.hotels[hotel_id] = (name, city, fold(name), keys)
+        entries = [(key, ('hotel', hotel_id)) for key in keys]
+        folded = fold(city)
+        if folded:
+            if not self.city_counts[folded]:
+                keys = _keys(city)
+                self.cities[folded] = (city, keys)
+                entries.extend((key, ('city', folded)) for key in keys)
+            self.city_counts[folded] += 1
+        self._ranking = None
+        return entries
+    
+    def _remove(self, entries):
+        for entry in entries:
+            i = bisect_left(self.entries, entry)
+            if i < len(self.entries) and self.entries[i] == entry:
+                del self.entries[i]
+                del self.keys[i]
+    
+    def _remove_hotel(self, hotel_id):
+        _, city, _, keys = self.hotels.pop(hotel_id)
+        self._remove((key, ('hotel', hotel_id)) for key in keys)
+        folded = fold(city)
+        if folded:
+            self.city_counts[folded] -= 1
+            if self.city_counts[folded] <= 0:
+                del self.city_counts[folded]
+                _, keys = self.cities.pop(folded)
+                self._remove((key, ('city', folded)) for key in keys)
+        self._ranking = None
+    
+    def update_hotel(self, hotel_id, name, city):
+        """Hôtel créé ou modifié: remplace ses entrées (et celles de sa ville)"""
+        with self._lock:
+            if self.built_at is None:
+                return
+            if self.hotels.get(hotel_id, ())[:2] == (name, city):
+                return
+            if hotel_id in self.hotels:
+                self._remove_hotel(hotel_id)
+            for entry in self._add_hotel(hotel_id, name, city):
+                i = bisect_left(self.entries, entry)
+                self.entries.insert(i, entry)
+                self.keys.insert(i, entry[0])
+    
+    def remove_hotel(self, hotel_id):
+        with self._lock:
+            if hotel_id in self.hotels:
+                self._remove_hotel(hotel_id)
+    
+    def add_bookings(self, hotel_id, rooms):
+        """Compte les chambres réservées; le classement en tiendra compte au plus tard dans ranking_max_age secondes"""
+        with self._lock:
+            self.bookings[hotel_id] += rooms
+            self._bookings_changed = True
+    
+    def ranking(self):
+        """Rang de popularité des villes et des hôtels (verrou tenu).
+        
+        Recalculé après une modification des hôtels, ou des réservations
+        si le classement a plus de ranking_max_age secondes.
+        """
+        now = time.monotonic()
+        if self._ranking is None or (self._bookings_changed and now - self._ranked_at > self.ranking_max_age):
+            self._memo = {}
+            self._ranked_at, self._bookings_changed = now, False
+            cities = sorted(self.cities, key=lambda folded: (-self.city_counts[folded], folded))
+            hotels = sorted(self.hotels, key=lambda hotel_id: (-self.bookings[hotel_id], self.hotels[hotel_id][2], hotel_id))
+            self._ranking = (
+                cities,
+                {folded: rank for rank, folded in enumerate(cities)},
+                {hotel_id: rank for rank, hotel_id in enumerate(hotels)},
+            )
+        return self._ranking
+    
+    def suggest(self, query, limit=DEFAULT_LIMIT):
+        """{'cities': [...], 'hotels': [...]} dont un libellé commence par query, les plus populaires d'abord"""
+        prefix = fold(query)
+        with self._lock:
+            cities, city_rank, hotel_rank = self.ranking()
+            if not prefix:
+                # Sans saisie: les villes les plus fournies
+                return {'cities': [self._city(folded) for folded in cities[:limit]], 'hotels': []}
+            if (prefix, limit) in self._memo:
+                return self._memo[prefix, limit]
+            
+            start = bisect_left(self.keys, prefix)
+            # Toutes les clés qui commencent par prefix sont < prefix + '\uffff'
+            end = bisect_right(self.keys, prefix + '\uffff', lo=start)
+            city_matches, hotel_matches = set(), set()
+            for _, (kind, value) in self.entries[start:end]:
+                (city_matches if kind == 'city' else hotel_matches).add(value)
+            cities = heapq.nsmallest(limit, city_matches, key=city_rank.__getitem__)
+            hotels = heapq.nsmallest(limit, hotel_matches, key=hotel_rank.__getitem__)
+            
+            result = {
+                'cities': [self._city(folded) for folded in cities],
+                'hotels': [{'id': hotel_id, 'name': self.hotels[hotel_id][0], 'city': self.hotels[hotel_id][1]}
+                           for hotel_id in hotels],
+            }
+            if end - start > self.MEMO_MIN_KEYS:
+                self._memo[prefix, limit] = result
+            return result
+    
+    def _city(self, folded):
+        return {'name': self.cities[folded][0], 'hotels': self.city_counts[folded]}
+
+_config = getattr(settings, 'SUGGEST', {})
+index = SuggestIndex(max_age=_config.get('MAX_AGE', 600), ranking_max_age=_config.get('RANKING_MAX_AGE', 60))
+_rebuild_lock = threading.Lock()
+
+def suggest(query, limit=DEFAULT_LIMIT):
+    """Suggestions depuis l'index, reconstruit s'il est trop ancien (les autres processus n'y écrivent pas)"""
+    if not index.is_fresh():
+        with _rebuild_lock:
+            if not index.is_fresh():
+                index.rebuild()
+    return index.suggest(query, limit)
+
+# ==================== SIGNAUX ====================
+
+# L'index n'est modifié qu'après commit: une transaction annulée n'y laisse rien
+
+@receiver(post_save, sender=Hotel)
+def update_hotel(sender, instance, **kwargs):
+    hotel_id, name, city = instance.id, instance.name, instance.city
+    transaction.on_commit(lambda: index.update_hotel(hotel_id, name, city))
+
+@receiver(post_delete, sender=Hotel)
+def remove_hotel(sender, instance, **kwargs):
+    hotel_id = instance.id
+    transaction.on_commit(lambda: index.remove_hotel(hotel_id))
+
+@receiver(inventory_changed)
+def count_booking(sender, hotel_id, rooms, **kwargs):
+    if rooms is None:
+        # Inventaire recalculé: les comptes sont relus à la reconstruction
+        index.invalidate()
+        return
+    index.add_bookings(hotel_id, rooms)
@@ -1,3 +1,1112 @@
+import gzip
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+from datetime import timedelta
+from io import StringIO
+from decimal import Decimal
+from unittest import mock, skipUnless
+from urllib.parse import parse_qs, urlsplit
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db.models import F
+from django.http import HttpResponse
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from hotel_reservation.fast_serializers import FastListSerializer
+from hotel_reservation import charts, compression
+from hotel_reservation.query_budget import QueryBudgetExceeded
+from hotel_reservation.renderers import FastJSONRenderer, MessagePackRenderer, msgpack, orjson
+from .models import CalendarVersion, Hotel, HotelImage, RoomType, RoomImage, RoomRate
+from .serializers import HotelSerializer, QuoteSerializer, RoomTypeSerializer
+from bookings import inventory
+from bookings.models import InventoryVersion, RoomInventory
+from .views import HotelListCreateView
+from . import amenities, facets, geo, occupancy, pricing, suggest
+from .quotes import MAX_QUOTES
+from .search import available_room_types, find_available_rooms
 
-# Create your tests here.
+def create_hotels(count, rooms_per_hotel=2, city='Paris'):
+    """Hôtels avec images et types de chambre (eux aussi avec images)"""
+    hotels = []
+    for i in range(count):
+        hotel = Hotel.objects.create(
+            name=f'Hôtel {city} {i}',
+            description='Hôtel de test',
+            address='1 rue du Test',
+            city=city,
+            country='France',
+            stars=3,
+            email='hotel@test.com',
+            phone='0100000000'
+        )
+        HotelImage.objects.create(hotel=hotel, image='hotel_images/test.jpg', is_main=True)
+        for j in range(rooms_per_hotel):
+            room_type = RoomType.objects.create(
+                hotel=hotel,
+                name=f'Chambre {j}',
+                room_type='double',
+                description='Chambre double',
+                capacity=2,
+                price_per_night=100,
+                size=20,
+                quantity_available=5
+            )
+            RoomImage.objects.create(room_type=room_type, image='room_images/test.jpg')
+        hotels.append(hotel)
+    return hotels
+
+class QueryCountTests(TestCase):
+    """Nombre de requêtes constant quelle que soit la taille de la page"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.check_in = timezone.now().date() + timedelta(days=10)
+    
+    def assertConstantQueries(self, expected, method, url, grow, data=None):
+        for size in (1, 8):
+            grow(size)
+            with self.assertNumQueries(expected):
+                response = getattr(self.client, method)(url, data, format='json')
+            self.assertEqual(response.status_code, 200)
+    
+    def test_hotel_list(self):
+        # validateurs ETag + hôtels + images (pagination par clé: pas de count)
+        self.assertConstantQueries(3, 'get', '/api/hotels/', create_hotels)
+    
+    def test_sparse_fields_skip_prefetch(self):
+        create_hotels(3)
+        # validateurs ETag + hôtels, sans les images
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/hotels/?fields=id,name,city')
+        self.assertEqual(list(response.data['results'][0]), ['id', 'name', 'city'])
+        
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/hotels/?expand=')
+        self.assertNotIn('images', response.data['results'][0])
+        self.assertIn('has_wifi', response.data['results'][0])
+        
+        response = self.client.get('/api/hotels/?fields=id,images.image')
+        self.assertEqual(response.data['results'][0]['images'], [{'image': 'http://testserver/media/hotel_images/test.jpg'}])
+    
+    def test_hotel_detail(self):
+        hotel = create_hotels(1)[0]
+        with self.assertNumQueries(3):
+            self.assertEqual(self.client.get(f'/api/hotels/{hotel.id}/').status_code, 200)
+    
+    def test_room_list(self):
+        hotel = create_hotels(1, rooms_per_hotel=0)[0]
+        
+        def grow(size):
+            for i in range(size):
+                room_type = RoomType.objects.create(
+                    hotel=hotel, name=f'Chambre {size}-{i}', room_type='single', description='-',
+                    capacity=1, price_per_night=80, size=15, quantity_available=3
+                )
+                RoomImage.objects.create(room_type=room_type, image='room_images/test.jpg')
+        
+        # validateurs ETag + count + types de chambre (avec l'hôtel) + images
+        self.assertConstantQueries(4, 'get', f'/api/hotels/{hotel.id}/rooms/', grow)
+    
+    def test_availability(self):
+        hotel = create_hotels(1)[0]
+        url = f'/api/hotels/{hotel.id}/availability/'
+        # hôtel et version + ligne de version (première fois) + calendrier (UNION), puis le cache suffit
+        with self.assertNumQueries(3):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).status_code, 200)
+    
+    def test_search(self):
+        data = {
+            'check_in': self.check_in.isoformat(),
+            'check_out': (self.check_in + timedelta(days=2)).isoformat(),
+            'city': 'Paris'
+        }
+        with self.settings(OCCUPANCY_MATRIX={'ENABLED': False}):
+            # types de chambre (avec l'hôtel et la disponibilité) + images + tarifs
+            self.assertConstantQueries(3, 'post', '/api/hotels/search/', create_hotels, data)
+    
+    def test_invalid_search_rejected_before_matrix(self):
+        create_hotels(2)
+        check_out = (self.check_in + timedelta(days=2)).isoformat()
+        invalid = [
+            {'check_in': check_out, 'check_out': self.check_in.isoformat()},
+            {'check_in': (self.check_in - timedelta(days=30)).isoformat(), 'check_out': self.check_in.isoformat()},
+            {'check_in': self.check_in.isoformat(), 'check_out': check_out, 'min_price': 'abc'},
+            {'check_in': self.check_in.isoformat(), 'check_out': check_out, 'stars': 9},
+        ]
+        for data in invalid:
+            occupancy.matrix.invalidate()
+            with self.assertNumQueries(0):
+                response = self.client.post('/api/hotels/search/', data, format='json')
+            self.assertEqual(response.status_code, 400, data)
+        
+        # Pire cas d'une recherche valide, matrice à reconstruire: dans le budget (STRICT)
+        occupancy.matrix.invalidate()
+        response = self.client.post('/api/hotels/search/', {
+            'check_in': self.check_in.isoformat(), 'check_out': check_out, 'stars': '', 'min_price': '10'
+        }, format='json')
+        self.assertEqual(len(response.data['results']), 4)
+    
+    def test_budget_exceeded_fails_in_strict_mode(self):
+        create_hotels(2)
+        with mock.patch.object(HotelListCreateView, 'query_budget', {'*': 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/api/hotels/')
+
+class FastSerializerTests(TestCase):
+    """FastListSerializer produit exactement le JSON des sérialiseurs DRF"""
+    
+    def assertSameJSON(self, serializer_class, instances):
+        context = {'request': Request(APIRequestFactory().get('/api/hotels/'))}
+        self.assertEqual(
+            JSONRenderer().render(FastListSerializer(instances, serializer_class, context).data),
+            JSONRenderer().render(serializer_class(instances, many=True, context=context).data)
+        )
+    
+    def test_hotels_and_room_types(self):
+        hotels = create_hotels(3)
+        Hotel.objects.filter(id=hotels[0].id).update(latitude='48.856600', longitude='2.352200', has_pool=True)
+        
+        self.assertSameJSON(HotelSerializer, list(Hotel.objects.prefetch_related('images')))
+        self.assertSameJSON(RoomTypeSerializer, list(RoomType.objects.select_related('hotel').prefetch_related('images')))
+
+class ConditionalGetTests(TestCase):
+    """ETag / Last-Modified et réponses 304"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.hotel = create_hotels(2)[0]
+    
+    def test_list_not_modified_until_a_hotel_changes(self):
+        response = self.client.get('/api/hotels/')
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+        
+        # Seul l'agrégat des validateurs est exécuté
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/hotels/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        
+        # Une autre page ou d'autres champs: autre représentation
+        self.assertNotEqual(self.client.get('/api/hotels/?fields=id')['ETag'], etag)
+        
+        self.hotel.name = 'Nouveau nom'
+        self.hotel.save()
+        response = self.client.get('/api/hotels/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+    
+    def test_detail_if_modified_since(self):
+        url = f'/api/hotels/{self.hotel.id}/'
+        last_modified = self.client.get(url)['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+    
+    def test_images_and_hotel_change_invalidate_rooms(self):
+        url = f'/api/hotels/{self.hotel.id}/rooms/'
+        etag = self.client.get(url)['ETag']
+        
+        RoomImage.objects.create(room_type=self.hotel.room_types.first(), image='room_images/autre.jpg')
+        etag_after_image = self.client.get(url, HTTP_IF_NONE_MATCH=etag)['ETag']
+        self.assertNotEqual(etag_after_image, etag)
+        
+        # hotel_name fait partie de la réponse
+        Hotel.objects.filter(pk=self.hotel.pk).update(updated_at=timezone.now() + timedelta(seconds=1))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag_after_image).status_code, 200)
+
+class RendererTests(TestCase):
+    """Les encodeurs rapides produisent les mêmes données que le JSON de DRF"""
+    
+    payload = {
+        'name': 'Hôtel «Étoile»\u2028',
+        'price': Decimal('129.90'),
+        'check_in': timezone.now().date(),
+        'created_at': timezone.now(),
+        'rooms': [{'id': 1, 'rooms_left': None, 'has_wifi': True}],
+        3: 'clé entière',
+    }
+    
+    @skipUnless(orjson, "orjson n'est pas installé")
+    def test_fast_json_is_byte_identical(self):
+        self.assertEqual(FastJSONRenderer().render(self.payload), JSONRenderer().render(self.payload))
+    
+    @skipUnless(msgpack, "msgpack n'est pas installé")
+    def test_msgpack_decodes_to_same_data(self):
+        body = MessagePackRenderer().render(self.payload)
+        expected = {str(k): v for k, v in json.loads(JSONRenderer().render(self.payload)).items()}
+        self.assertEqual({str(k): v for k, v in msgpack.unpackb(body, raw=False, strict_map_key=False).items()}, expected)
+    
+    @skipUnless(msgpack, "msgpack n'est pas installé")
+    def test_content_negotiation(self):
+        create_hotels(2)
+        response = APIClient().get('/api/hotels/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(len(msgpack.unpackb(response.content, raw=False)['results']), 2)
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        create_hotels(5)
+        self.client = APIClient()
+    
+    def test_gzip_response_and_cached_bytes(self):
+        plain = self.client.get('/api/hotels/')
+        
+        with mock.patch.object(compression, 'compress', wraps=compression.compress) as compress:
+            response = self.client.get('/api/hotels/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(gzip.decompress(response.content), plain.content)
+            self.assertEqual(response['ETag'], 'W/' + plain['ETag'])
+            self.assertIn('Accept-Encoding', response['Vary'])
+            
+            # Même ETag: octets compressés repris du cache
+            self.client.get('/api/hotels/', HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(compress.call_count, 1)
+        
+        # Le client renvoie l'ETag faible: toujours un 304
+        response = self.client.get('/api/hotels/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+    
+    def test_only_etag_or_public_responses_cached(self):
+        data = {
+            'check_in': (timezone.now().date() + timedelta(days=10)).isoformat(),
+            'check_out': (timezone.now().date() + timedelta(days=12)).isoformat(),
+        }
+        with mock.patch.object(compression, 'compress', wraps=compression.compress) as compress:
+            # Résultats de recherche: ni ETag ni Cache-Control public
+            for _ in range(2):
+                response = self.client.post('/api/hotels/search/', data, HTTP_ACCEPT_ENCODING='gzip')
+                self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(compress.call_count, 2)
+        
+        public = HttpResponse(b'x' * 2048, content_type='application/json')
+        public['Cache-Control'] = 'public, max-age=60'
+        middleware = compression.CompressionMiddleware(None)
+        self.assertIsNotNone(middleware.cache_key(public, 'gzip'))
+        public['Cache-Control'] = 'private, max-age=60'
+        self.assertIsNone(middleware.cache_key(public, 'gzip'))
+    
+    def test_small_or_refused_responses_are_not_compressed(self):
+        response = self.client.get('/api/hotels/?fields=id', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        
+        response = self.client.get('/api/hotels/', HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+class ChartTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.hotels = create_hotels(2)
+    
+    def test_home_chart_is_cached_json_spec(self):
+        response = self.client.get('/')
+        self.assertEqual(response.context['city_chart']['data'][0]['y'], [2])
+        # Spécification JSON + plotly.js chargé séparément, pas embarqué dans la page
+        self.assertContains(response, 'id="city-chart"')
+        self.assertContains(response, '/charts/plotly.js')
+        self.assertNotContains(response, 'cdn.plot.ly')
+        self.assertLess(len(response.content), 100 * 1024)
+        
+        with mock.patch.object(charts, 'figure', wraps=charts.figure) as figure:
+            self.client.get('/')
+            self.assertEqual(figure.call_count, 0)
+            
+            # Un nouvel hôtel invalide le graphique
+            create_hotels(1, city='Lyon')
+            response = self.client.get('/')
+            self.assertEqual(figure.call_count, 1)
+            self.assertEqual(response.context['city_chart']['data'][0]['x'], ['Paris', 'Lyon'])
+    
+    def test_room_price_change_invalidates_hotel_chart(self):
+        hotel = self.hotels[0]
+        response = self.client.get(f'/hotels/{hotel.id}/')
+        self.assertEqual(response.context['price_chart']['data'][0]['y'], [100.0, 100.0])
+        
+        room_type = hotel.room_types.first()
+        room_type.price_per_night = 150
+        room_type.save()
+        response = self.client.get(f'/hotels/{hotel.id}/')
+        self.assertIn(150.0, response.context['price_chart']['data'][0]['y'])
+    
+    def test_views_do_not_import_plotly(self):
+        code = "import django; django.setup(); import sys, hotel_reservation.views; print('plotly' in sys.modules)"
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'hotel_reservation.settings'}
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env, check=True)
+        self.assertEqual(output.stdout.strip(), 'False')
+    
+    @skipUnless(importlib.util.find_spec('plotly'), "plotly non installé")
+    def test_plotly_js_is_served_with_etag(self):
+        response = self.client.get('/charts/plotly.js')
+        self.assertEqual(response['Content-Type'], 'application/javascript')
+        self.assertIn('max-age', response['Cache-Control'])
+        
+        response = self.client.get('/charts/plotly.js', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+class PricingTests(TestCase):
+    def setUp(self):
+        self.hotel = create_hotels(1)[0]
+        self.standard, self.suite = self.hotel.room_types.order_by('id')
+        self.suite.price_per_night = Decimal('250.50')
+        self.suite.save()
+        self.check_in = timezone.now().date() + timedelta(days=30)
+        self.check_out = self.check_in + timedelta(days=3)
+        # Week-end / événement: la 2e nuit plus chère pour la chambre standard
+        RoomRate.objects.create(room_type=self.standard, date=self.check_in + timedelta(days=1), price=Decimal('180.25'), label='Salon')
+        # Tarif hors séjour: ignoré
+        RoomRate.objects.create(room_type=self.suite, date=self.check_out, price=1)
+    
+    def test_stay_prices_in_one_query(self):
+        base_prices = {room.id: room.price_per_night for room in (self.standard, self.suite)}
+        with self.assertNumQueries(1):
+            totals = pricing.stay_prices(base_prices, self.check_in, self.check_out)
+        self.assertEqual(totals, {self.standard.id: Decimal('380.25'), self.suite.id: Decimal('751.50')})
+        self.assertEqual(pricing.quote(self.standard, self.check_in, self.check_out, rooms=2), Decimal('760.50'))
+    
+    def test_search_and_calendar_use_rates(self):
+        data = {
+            'check_in': self.check_in.isoformat(),
+            'check_out': self.check_out.isoformat(),
+            'number_of_rooms': 2,
+        }
+        response = self.client.post('/api/hotels/search/', data, content_type='application/json')
+        prices = {room['id']: room['total_price'] for room in response.json()['results']}
+        self.assertEqual(prices[self.standard.id], '760.50')
+        
+        response = self.client.get(
+            f'/api/hotels/{self.hotel.id}/availability/?from={self.check_in}&to={self.check_out}'
+        )
+        calendar = {room['id']: room['prices'] for room in response.json()['room_types']}
+        self.assertEqual(calendar[self.standard.id], ['100.00', '180.25', '100.00'])
+        
+        # Un nouveau tarif invalide le calendrier en cache
+        RoomRate.objects.create(room_type=self.standard, date=self.check_in, price=90)
+        response = self.client.get(
+            f'/api/hotels/{self.hotel.id}/availability/?from={self.check_in}&to={self.check_out}'
+        )
+        self.assertEqual(response.json()['room_types'][0]['prices'][0], '90.00')
+
+class OccupancyMatrixTests(TestCase):
+    def setUp(self):
+        self.hotel = create_hotels(1, rooms_per_hotel=1)[0]
+        self.room = self.hotel.room_types.get()
+        self.check_in = timezone.now().date() + timedelta(days=10)
+        self.check_out = self.check_in + timedelta(days=2)
+        self.matrix = occupancy.matrix
+        self.matrix.rebuild()
+    
+    def tearDown(self):
+        self.matrix.invalidate()
+    
+    def book(self, rooms):
+        with self.captureOnCommitCallbacks(execute=True):
+            inventory.adjust(self.room, self.check_in, self.check_out, rooms)
+    
+    def rooms_left(self):
+        return self.matrix.available(self.check_in, self.check_out)[self.room.id]
+    
+    def test_own_writes_keep_matrix_fresh(self):
+        self.assertTrue(self.matrix.is_fresh())
+        self.book(2)
+        self.assertTrue(self.matrix.is_fresh())
+        self.assertEqual(self.rooms_left(), 3)
+        self.assertEqual(self.matrix.version, inventory.version())
+    
+    def test_other_process_write_makes_matrix_stale(self):
+        # Écriture d'un autre processus: seule la version partagée (en base) change
+        InventoryVersion.objects.update(version=F('version') + 1)
+        self.assertFalse(self.matrix.is_fresh())
+        
+        # Et la suivante de ce processus ne recolle pas les morceaux
+        self.matrix.rebuild()
+        InventoryVersion.objects.update(version=F('version') + 1)
+        self.book(1)
+        self.assertTrue(self.matrix.stale)
+    
+    def test_max_age_and_rebuild_command(self):
+        self.matrix.built_at -= self.matrix.max_age + 1
+        self.assertFalse(self.matrix.is_fresh())
+        
+        self.matrix.rebuild()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('rebuild_inventory', stdout=StringIO())
+        self.assertFalse(self.matrix.is_fresh())
+    
+    def test_verify_detects_drift(self):
+        self.book(2)
+        self.assertEqual(self.matrix.verify(), [])
+        RoomInventory.objects.filter(room_type=self.room).update(rooms_sold=4, rooms_left=1)
+        self.assertEqual(self.matrix.verify(), [self.room.id])
+        self.assertFalse(self.matrix.is_fresh())
+    
+    def test_stale_matrix_falls_back_to_sql(self):
+        self.book(2)
+        self.matrix.invalidate()
+        # Reconstruction déjà en cours dans un autre thread: réponse SQL
+        with occupancy._rebuild_lock:
+            self.assertIsNone(occupancy.lookup(self.check_in, self.check_out))
+            rooms = find_available_rooms(self.check_in, self.check_out)
+        self.assertEqual([(room.id, room.rooms_left) for room in rooms], [(self.room.id, 3)])
+        
+        # Sinon la matrice est reconstruite et donne le même résultat
+        self.assertEqual(occupancy.lookup(self.check_in, self.check_out), {self.room.id: 3})
+        self.assertTrue(self.matrix.is_fresh())
+
+class AvailableRoomTypesTests(TestCase):
+    """Disponibilité SQL (FilteredRelation + Max) comparée au registre par nuit"""
+    
+    def setUp(self):
+        # Calendriers en cache d'autres tests (ids réutilisés après rollback)
+        cache.clear()
+        self.hotel = create_hotels(1, rooms_per_hotel=2)[0]
+        self.double, self.suite = self.hotel.room_types.order_by('id')
+        self.day = timezone.now().date() + timedelta(days=10)
+        # Nuits 0-1: 2 doubles; nuits 1-3: 2 doubles de plus; nuit 2: 4 suites
+        self.stay(self.double, 0, 2, 2)
+        self.stay(self.double, 1, 4, 2)
+        self.stay(self.suite, 2, 3, 4)
+    
+    def stay(self, room, first, last, rooms):
+        inventory.adjust(room, self.day + timedelta(days=first), self.day + timedelta(days=last), rooms)
+    
+    def rooms_left(self, first, last, rooms=1):
+        check_in, check_out = self.day + timedelta(days=first), self.day + timedelta(days=last)
+        return {room.id: room.rooms_left for room in available_room_types(check_in, check_out, number_of_rooms=rooms)}
+    
+    def ledger(self, first, last):
+        check_in, check_out = self.day + timedelta(days=first), self.day + timedelta(days=last)
+        return {room.id: inventory.available_rooms(room, check_in, check_out) for room in (self.double, self.suite)}
+    
+    def test_matches_ledger_for_every_stay(self):
+        for first in range(-1, 5):
+            for last in range(first + 1, 6):
+                with self.subTest(first=first, last=last):
+                    self.assertEqual(self.rooms_left(first, last), {
+                        room_id: left for room_id, left in self.ledger(first, last).items() if left >= 1
+                    })
+    
+    def test_partial_overlap_and_checkout_day(self):
+        # Séjour qui chevauche la fin du premier: la nuit 1 porte les deux réservations
+        self.assertEqual(self.rooms_left(1, 2)[self.double.id], 1)
+        # Le jour du départ (nuit 4) n'est pas occupé
+        self.assertEqual(self.rooms_left(4, 6), {self.double.id: 5, self.suite.id: 5})
+        # Arrivée le jour du départ de la suite (nuit 3): libre
+        self.assertEqual(self.rooms_left(3, 4)[self.suite.id], 5)
+    
+    def test_multiple_rooms(self):
+        self.assertEqual(self.rooms_left(1, 3, rooms=2), {})
+        self.assertEqual(self.rooms_left(2, 4, rooms=2), {self.double.id: 3})
+        self.assertEqual(self.rooms_left(0, 1, rooms=3), {self.double.id: 3, self.suite.id: 5})
+    
+    def test_calendar_matches_ledger(self):
+        response = self.client.get(
+            f'/api/hotels/{self.hotel.id}/availability/?from={self.day}&to={self.day + timedelta(days=5)}'
+        )
+        calendar = {room['id']: room['rooms_left'] for room in response.json()['room_types']}
+        for room_id in (self.double.id, self.suite.id):
+            self.assertEqual(calendar[room_id], [self.ledger(i, i + 1)[room_id] for i in range(5)])
+
+class AvailabilityCalendarTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.hotel = create_hotels(1, rooms_per_hotel=1)[0]
+        self.room = self.hotel.room_types.get()
+        self.start = timezone.now().date() + timedelta(days=5)
+        self.url = f'/api/hotels/{self.hotel.id}/availability/?from={self.start}&to={self.start + timedelta(days=3)}'
+    
+    def rooms_left(self):
+        return self.client.get(self.url).json()['room_types'][0]['rooms_left']
+    
+    def test_cached_until_booking(self):
+        self.assertEqual(self.rooms_left(), [5, 5, 5])
+        # Calendrier en cache: seule la version (lue avec l'hôtel) reste
+        with self.assertNumQueries(1):
+            self.assertEqual(self.rooms_left(), [5, 5, 5])
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            inventory.adjust(self.room, self.start + timedelta(days=1), self.start + timedelta(days=3), 2)
+        RoomRate.objects.create(room_type=self.room, date=self.start, price=80)
+        # version + types de chambre, tarifs et nuits vendues (UNION)
+        with self.assertNumQueries(2):
+            calendar = self.client.get(self.url).json()['room_types'][0]
+        self.assertEqual(calendar['rooms_left'], [5, 3, 3])
+        self.assertEqual(calendar['prices'], ['80.00', '100.00', '100.00'])
+    
+    def test_write_from_another_process_invalidates(self):
+        self.assertEqual(self.rooms_left(), [5, 5, 5])
+        # Autre processus: ni signal ni cache communs, seulement la base
+        RoomInventory.objects.create(room_type=self.room, date=self.start, rooms_sold=1, rooms_left=4)
+        CalendarVersion.objects.filter(hotel=self.hotel).update(version=F('version') + 1)
+        self.assertEqual(self.rooms_left(), [4, 5, 5])
+        
+        self.assertEqual(self.client.get(f'/api/hotels/0/availability/').status_code, 404)
+
+class QuoteTests(TestCase):
+    def setUp(self):
+        self.hotel = create_hotels(1)[0]
+        self.standard, self.suite = self.hotel.room_types.order_by('id')
+        self.check_in = timezone.now().date() + timedelta(days=30)
+        RoomRate.objects.create(room_type=self.standard, date=self.check_in + timedelta(days=1), price=150)
+        # 4 des 5 chambres standard vendues la 3e nuit
+        inventory.adjust(self.standard, self.check_in + timedelta(days=2), self.check_in + timedelta(days=3), 4)
+    
+    def quote(self, room_type, offset, nights, rooms=1):
+        check_in = self.check_in + timedelta(days=offset)
+        return {
+            'room_type': room_type,
+            'check_in': check_in.isoformat(),
+            'check_out': (check_in + timedelta(days=nights)).isoformat(),
+            'rooms': rooms,
+        }
+    
+    def test_batch_matches_single_quotes(self):
+        items = [
+            self.quote(self.standard.id, 0, 2),
+            self.quote(self.standard.id, 1, 3, rooms=2),
+            self.quote(self.suite.id, 5, 1, rooms=2),
+            self.quote(999, 0, 1),
+        ]
+        # types de chambre + tarifs + inventaire
+        with self.assertNumQueries(3):
+            response = self.client.post('/api/quotes/', items, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        quotes = response.json()
+        
+        self.assertEqual([q['total_price'] for q in quotes], ['250.00', '700.00', '200.00', None])
+        self.assertEqual([q['rooms_left'] for q in quotes], [5, 1, 5, 0])
+        self.assertEqual([q['available'] for q in quotes], [True, False, True, False])
+        self.assertEqual(quotes[1]['nights'], 3)
+        
+        check_in = self.check_in + timedelta(days=1)
+        self.assertEqual(
+            Decimal(quotes[1]['total_price']),
+            pricing.quote(self.standard, check_in, check_in + timedelta(days=3), rooms=2)
+        )
+    
+    def test_query_count_does_not_grow_with_items(self):
+        items = [self.quote(room.id, offset, 2) for room in (self.standard, self.suite) for offset in range(60)]
+        with self.assertNumQueries(3):
+            response = self.client.post('/api/quotes/', items, content_type='application/json')
+        self.assertEqual(len(response.json()), 120)
+    
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.post('/api/quotes/', [self.quote(self.standard.id, 2, 0)], content_type='application/json').status_code, 400)
+        self.assertEqual(self.client.post('/api/quotes/', {'room_type': 1}, content_type='application/json').status_code, 400)
+        too_wide = [self.quote(self.standard.id, 0, 1), self.quote(self.standard.id, 400, 1)]
+        self.assertEqual(self.client.post('/api/quotes/', too_wide, content_type='application/json').status_code, 400)
+        
+        # Trop d'éléments: refusé avant la validation de chacun
+        too_many = [self.quote(self.standard.id, 0, 1)] * (MAX_QUOTES + 1)
+        with mock.patch.object(QuoteSerializer, 'validate') as validate:
+            response = self.client.post('/api/quotes/', too_many, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+        validate.assert_not_called()
+
+class FlexibleSearchTests(TestCase):
+    def setUp(self):
+        self.hotel = create_hotels(1, city='Lyon')[0]
+        self.standard, self.suite = self.hotel.room_types.order_by('id')
+        self.date_from = timezone.now().date() + timedelta(days=30)
+        self.date_to = self.date_from + timedelta(days=10)
+        self.suite.price_per_night = 200
+        self.suite.save()
+        # Standard: nuits 0-1 chères, nuit 5 complète
+        for offset in (0, 1):
+            RoomRate.objects.create(room_type=self.standard, date=self.date_from + timedelta(days=offset), price=300)
+        inventory.adjust(self.standard, self.date_from + timedelta(days=5), self.date_from + timedelta(days=6), 5)
+    
+    def search(self, **extra):
+        data = {
+            'date_from': self.date_from.isoformat(),
+            'date_to': self.date_to.isoformat(),
+            'nights': 3,
+            'city': 'Lyon',
+            **extra,
+        }
+        return self.client.post('/api/hotels/search/', data, content_type='application/json')
+    
+    def test_cheapest_stays_match_brute_force(self):
+        # types de chambre (avec l'hôtel) + images + tarifs + inventaire
+        with self.assertNumQueries(4):
+            response = self.search(results_per_room=10)
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([room['id'] for room in results], [self.standard.id, self.suite.id])
+        
+        for room_type, room in zip((self.standard, self.suite), results):
+            expected = []
+            for offset in range(10 - 3 + 1):
+                check_in = self.date_from + timedelta(days=offset)
+                check_out = check_in + timedelta(days=3)
+                if inventory.available_rooms(room_type, check_in, check_out) >= 1:
+                    expected.append((pricing.quote(room_type, check_in, check_out), check_in.isoformat()))
+            expected.sort()
+            self.assertEqual(
+                [(Decimal(stay['total_price']), stay['check_in']) for stay in room['cheapest_stays']],
+                expected
+            )
+        
+        # Les séjours passant par la nuit complète sont exclus
+        starts = [stay['check_in'] for stay in results[0]['cheapest_stays']]
+        self.assertNotIn((self.date_from + timedelta(days=4)).isoformat(), starts)
+        self.assertEqual(results[0]['total_price'], results[0]['cheapest_stays'][0]['total_price'])
+    
+    def test_limit_and_validation(self):
+        results = self.search().json()['results']
+        self.assertEqual([len(room['cheapest_stays']) for room in results], [3, 3])
+        
+        self.assertEqual(self.search(nights=11).status_code, 400)
+        self.assertEqual(self.search(date_to=(self.date_from + timedelta(days=400)).isoformat()).status_code, 400)
+
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        self.plaza, self.lyon = create_hotels(1, city='Paris') + create_hotels(1, city='Lyon')
+        self.plaza.name = 'Hôtel Plaza Athénée'
+        self.plaza.save()
+        # "plaza" seulement dans la description: moins pertinent qu'un nom
+        self.lyon.description = 'À deux pas de la plaza centrale'
+        self.lyon.save()
+    
+    def search(self, terms):
+        response = self.client.get('/api/hotels/', {'search': terms, 'fields': 'id'})
+        return [hotel['id'] for hotel in response.json()['results']]
+    
+    def test_ranked_accent_insensitive_prefix_search(self):
+        self.assertEqual(self.search('plaza'), [self.plaza.id, self.lyon.id])
+        self.assertEqual(self.search('athenee'), [self.plaza.id])
+        self.assertEqual(self.search('HÔTEL lyo'), [self.lyon.id])
+        self.assertEqual(self.search('"plaza'), [self.plaza.id, self.lyon.id])
+        self.assertEqual(self.search('inconnu'), [])
+    
+    def test_index_follows_writes(self):
+        # Les triggers couvrent aussi les update() en masse
+        Hotel.objects.filter(pk=self.lyon.pk).update(city='Orléans')
+        self.assertEqual(self.search('orleans'), [self.lyon.id])
+        self.assertEqual(self.search('lyon'), [self.lyon.id])  # toujours dans le nom
+        
+        self.plaza.delete()
+        self.assertEqual(self.search('athenee'), [])
+    
+    def test_falls_back_to_icontains_without_index(self):
+        with mock.patch('hotels.filters.index_exists', return_value=False):
+            self.assertEqual(sorted(self.search('plaza')), sorted([self.plaza.id, self.lyon.id]))
+            self.assertEqual(self.search('athenee'), [])
+
+class GeoSearchTests(TestCase):
+    def setUp(self):
+        self.louvre, self.versailles, self.lyon, self.nowhere = create_hotels(4, rooms_per_hotel=1)
+        for hotel, lat, lon in ((self.louvre, '48.860611', '2.337644'),
+                                (self.versailles, '48.804865', '2.120355'),
+                                (self.lyon, '45.764043', '4.835659')):
+            hotel.latitude, hotel.longitude = Decimal(lat), Decimal(lon)
+            hotel.save()
+        self.near = '48.856613,2.352222'  # Notre-Dame
+    
+    def hotels(self, **params):
+        response = self.client.get('/api/hotels/', {'fields': 'id,distance_km', **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [(hotel['id'], hotel.get('distance_km')) for hotel in response.json()['results']]
+    
+    def test_haversine_and_bounding_box(self):
+        # Paris - Lyon: ~391,5 km
+        self.assertAlmostEqual(float(geo.haversine_km(48.856613, 2.352222, [45.764043], [4.835659])[0]), 391.5, delta=0.1)
+        south, west, north, east = geo.around(48.856613, 2.352222, 20)
+        self.assertTrue(south < 48.68 < 48.70 < north and west < 2.08 and east > 2.62)
+        # Près de l'antiméridien, la boîte le traverse (ouest > est)
+        south, west, north, east = geo.around(0, 179.9, 50)
+        self.assertGreater(west, east)
+    
+    def test_near_filters_and_sorts_by_distance(self):
+        # validateurs ETag + hôtels (distance calculée en SQL)
+        with self.assertNumQueries(2):
+            results = self.hotels(near=self.near, radius_km=25)
+        self.assertEqual([pk for pk, _ in results], [self.louvre.id, self.versailles.id])
+        self.assertAlmostEqual(results[0][1], 1.15, delta=0.05)
+        self.assertAlmostEqual(results[1][1], 17.9, delta=0.2)
+        self.assertEqual([pk for pk, _ in self.hotels(near=self.near)], [self.louvre.id])
+        self.assertEqual(self.hotels(near='0,0', radius_km=5), [])
+        # Sans near, pas de distance
+        self.assertNotIn('distance_km', self.client.get('/api/hotels/').json()['results'][0])
+    
+    def test_near_pages_follow_distance(self):
+        # Des hôtels en spirale autour de Notre-Dame: le curseur porte sur la distance
+        for i, hotel in enumerate(create_hotels(25, rooms_per_hotel=0, city='Autour')):
+            hotel.latitude = Decimal('48.856613') + Decimal(i % 5 - 2) * Decimal('0.01')
+            hotel.longitude = Decimal('2.352222') + Decimal(i // 5 - 2) * Decimal('0.013')
+            hotel.save()
+        hotels = Hotel.objects.filter(latitude__isnull=False)
+        expected = dict(zip(
+            hotels.values_list('id', flat=True),
+            geo.haversine_km(48.856613, 2.352222, hotels.values_list('latitude', flat=True),
+                             hotels.values_list('longitude', flat=True)),
+        ))
+        
+        results, url, params = [], '/api/hotels/', {'fields': 'id,distance_km', 'near': self.near, 'radius_km': 25, 'page_size': 7}
+        while url:
+            data = self.client.get(url, params).json()
+            results += [(hotel['id'], hotel['distance_km']) for hotel in data['results']]
+            url, params = data['next'], None
+        
+        self.assertEqual(sorted(pk for pk, _ in results), sorted(pk for pk, d in expected.items() if d <= 25))
+        self.assertEqual(results, sorted(results, key=lambda result: (result[1], result[0])))
+        for pk, distance in results:
+            self.assertAlmostEqual(distance, float(expected[pk]), places=3)
+    
+    def test_bbox_and_invalid_parameters(self):
+        ids = [pk for pk, _ in self.hotels(bbox='45,4,46,5')]
+        self.assertEqual(ids, [self.lyon.id])
+        for params in ({'near': '48.8'}, {'near': '91,0'}, {'near': self.near, 'radius_km': 0},
+                       {'near': self.near, 'radius_km': 'loin'}, {'bbox': '46,4,45,5'}):
+            self.assertEqual(self.client.get('/api/hotels/', params).status_code, 400)
+    
+    def test_search_endpoint_near(self):
+        check_in = timezone.now().date() + timedelta(days=10)
+        response = self.client.post('/api/hotels/search/', {
+            'check_in': check_in.isoformat(),
+            'check_out': (check_in + timedelta(days=2)).isoformat(),
+            'near': self.near,
+            'radius_km': 500,
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([room['hotel'] for room in response.data['results']], [self.louvre.id, self.versailles.id, self.lyon.id])
+        self.assertTrue(all('distance_km' in room for room in response.data['results']))
+
+class FacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.paris = create_hotels(2, city='Paris')
+        self.lyon = create_hotels(1, city='Lyon')[0]
+        self.lyon.stars, self.lyon.has_wifi = 5, True
+        self.lyon.save()
+        self.lyon.room_types.update(price_per_night=250)
+    
+    def test_api_facets_one_cached_query(self):
+        # validateurs ETag + hôtels + facettes
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/hotels/', {'facets': 1, 'fields': 'id'})
+        data = response.json()['facets']
+        self.assertEqual(data['city'], [{'value': 'Paris', 'count': 2}, {'value': 'Lyon', 'count': 1}])
+        self.assertEqual(data['stars'], [{'value': 5, 'count': 1}, {'value': 3, 'count': 2}])
+        self.assertEqual(data['amenities']['has_wifi'], 1)
+        self.assertEqual([bucket['count'] for bucket in data['price']], [0, 0, 2, 1])
+        
+        # Filtres appliqués; puis facettes en cache
+        response = self.client.get('/api/hotels/', {'facets': 1, 'city': 'Paris'})
+        self.assertEqual(response.json()['facets']['city'], [{'value': 'Paris', 'count': 2}])
+        with self.assertNumQueries(2):
+            self.client.get('/api/hotels/', {'facets': 1, 'fields': 'id'})
+        # Clé: paramètres de filtre seulement (pagination et affichage ignorés)
+        next_url = self.client.get('/api/hotels/', {'facets': 1, 'fields': 'id', 'page_size': 1}).json()['next']
+        with self.assertNumQueries(2):
+            response = self.client.get(next_url)
+        self.assertEqual(response.json()['facets']['city'][0], {'value': 'Paris', 'count': 2})
+        self.assertNotIn('facets', self.client.get('/api/hotels/').json())
+    
+    def test_room_type_change_invalidates_facets_and_etag(self):
+        response = self.client.get('/api/hotels/', {'facets': 1})
+        room_type = self.paris[0].room_types.first()
+        room_type.price_per_night = 40
+        room_type.save()
+        
+        response = self.client.get('/api/hotels/', {'facets': 1}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([bucket['count'] for bucket in response.json()['facets']['price']], [1, 0, 1, 1])
+    
+    def test_web_list_counts_ignore_own_filter(self):
+        response = self.client.get('/hotels/', {'city': 'Lyon'})
+        self.assertEqual(list(response.context['hotels']), [self.lyon])
+        # Les autres villes restent proposées, avec leurs comptes
+        self.assertContains(response, 'Paris (2)')
+        self.assertEqual(response.context['facets']['stars'], [{'value': 5, 'count': 1}])
+        self.assertEqual(response.context['facets']['amenities']['has_wifi'], 1)
+    
+    def test_search_facets_from_results(self):
+        check_in = timezone.now().date() + timedelta(days=10)
+        data = {'check_in': check_in.isoformat(), 'check_out': (check_in + timedelta(days=2)).isoformat()}
+        client = APIClient()
+        # Même enveloppe avec ou sans facettes
+        self.assertEqual(list(client.post('/api/hotels/search/', data, format='json').data), ['results'])
+        # Comptées sur les résultats chargés: aucune requête de plus (version de l'inventaire + chambres + images + tarifs)
+        with self.assertNumQueries(4):
+            response = client.post('/api/hotels/search/', {**data, 'facets': True}, format='json')
+        self.assertEqual(len(response.data['results']), 6)
+        self.assertEqual(response.data['facets']['city'], [{'value': 'Paris', 'count': 2}, {'value': 'Lyon', 'count': 1}])
+        self.assertEqual(response.data['facets']['price'][3]['count'], 1)
+
+class AmenityMaskTests(TestCase):
+    def setUp(self):
+        self.spa, self.basic = create_hotels(2, rooms_per_hotel=1)
+        self.spa.has_wifi = self.spa.has_pool = self.spa.has_spa = True
+        self.spa.save()
+        self.basic.has_wifi = True
+        self.basic.save(update_fields=['has_wifi'])
+        self.suite = self.spa.room_types.get()
+        self.suite.has_balcony = True
+        self.suite.save()
+    
+    def hotel_ids(self, value):
+        response = self.client.get('/api/hotels/', {'amenities': value, 'fields': 'id'})
+        return [hotel['id'] for hotel in response.json()['results']]
+    
+    def search(self, value):
+        check_in = timezone.now().date() + timedelta(days=10)
+        response = self.client.post('/api/hotels/search/', {
+            'check_in': check_in.isoformat(),
+            'check_out': (check_in + timedelta(days=2)).isoformat(),
+            'amenities': value,
+        })
+        return [room['id'] for room in response.data['results']]
+    
+    def test_mask_maintained_on_save(self):
+        self.spa.refresh_from_db()
+        self.basic.refresh_from_db()
+        self.assertEqual(self.spa.amenity_mask, 0b1101)  # wifi, pool, spa
+        self.assertEqual(self.basic.amenity_mask, 0b1)
+        self.assertEqual(amenities.parse('pool, wifi,TV', amenities.HOTEL_AMENITIES, amenities.ROOM_AMENITIES), [0b101, 0b1])
+        self.assertTrue(all(mask & 0b101 == 0b101 for mask in amenities.with_all(0b101, amenities.HOTEL_AMENITIES)))
+        self.assertEqual(len(amenities.with_all(0b101, amenities.HOTEL_AMENITIES)), 16)
+    
+    def test_backfill_after_bulk_update(self):
+        Hotel.objects.update(has_gym=True)
+        call_command('backfill_amenity_masks', stdout=StringIO())
+        self.assertEqual(self.hotel_ids('gym,wifi'), [self.spa.id, self.basic.id])
+    
+    def test_api_filters(self):
+        self.assertEqual(self.hotel_ids('wifi'), [self.spa.id, self.basic.id])
+        self.assertEqual(self.hotel_ids('wifi,pool,spa'), [self.spa.id])
+        self.assertEqual(self.hotel_ids('gym'), [])
+        self.assertEqual(self.client.get('/api/hotels/', {'amenities': 'sauna'}).status_code, 400)
+        response = self.client.get(f'/api/hotels/{self.spa.id}/rooms/', {'amenities': 'balcony,tv'})
+        self.assertEqual([room['id'] for room in response.json()['results']], [self.suite.id])
+        self.assertNotIn('amenity_mask', response.json()['results'][0])
+    
+    def test_search_matrix_and_sql_paths(self):
+        for enabled in (True, False):
+            with self.settings(OCCUPANCY_MATRIX={'ENABLED': enabled}):
+                self.assertEqual(self.search('pool,balcony'), [self.suite.id])
+                self.assertEqual(len(self.search('wifi')), 2)
+                self.assertEqual(self.search('gym'), [])
+        
+        # La matrice suit les équipements modifiés après sa construction (au commit)
+        self.basic.has_pool = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.basic.save()
+        self.assertEqual(len(self.search('pool')), 2)
+
+class SearchCacheTests(TestCase):
+    def setUp(self):
+        caches['search'].clear()
+        self.paris = create_hotels(1, rooms_per_hotel=1, city='Paris')[0]
+        self.lyon = create_hotels(1, rooms_per_hotel=1, city='Lyon')[0]
+        self.room = self.paris.room_types.get()
+        self.check_in = timezone.now().date() + timedelta(days=10)
+    
+    def search(self, city, offset=0, **extra):
+        check_in = self.check_in + timedelta(days=offset)
+        return self.client.post('/api/hotels/search/', {
+            'check_in': check_in.isoformat(),
+            'check_out': (check_in + timedelta(days=2)).isoformat(),
+            'city': city,
+            **extra,
+        })
+    
+    def assertCached(self, city, offset=0):
+        with self.assertNumQueries(0):
+            return self.search(city, offset)
+    
+    def book(self, rooms, offset=0):
+        check_in = self.check_in + timedelta(days=offset)
+        with self.captureOnCommitCallbacks(execute=True):
+            inventory.adjust(self.room, check_in, check_in + timedelta(days=2), rooms)
+    
+    def test_normalized_query_served_from_cache(self):
+        self.assertEqual(self.search('Paris').data['results'][0]['rooms_left'], 5)
+        response = self.assertCached(' paris ')
+        self.assertEqual(response.data['results'][0]['hotel'], self.paris.id)
+        # Autres paramètres: autre entrée
+        self.assertEqual(self.search('Paris', number_of_rooms=6).data['results'], [])
+    
+    def test_booking_invalidates_only_its_hotel_and_dates(self):
+        self.search('Paris')
+        self.search('Lyon')
+        self.search('Paris', offset=5)
+        
+        self.book(2)
+        self.assertCached('Lyon')
+        self.assertCached('Paris', offset=5)
+        self.assertEqual(self.search('Paris').data['results'][0]['rooms_left'], 3)
+        self.assertCached('Paris')
+    
+    def test_released_rooms_invalidate_overlapping_searches(self):
+        self.book(5)
+        self.assertEqual(self.search('Paris').data['results'], [])
+        self.search('Lyon')
+        self.search('Lyon', offset=5)
+        
+        # Annulation: l'hôtel peut réapparaître dans n'importe quelle recherche sur ces dates
+        self.book(-5)
+        self.assertCached('Lyon', offset=5)
+        self.assertEqual(self.search('Paris').data['results'][0]['rooms_left'], 5)
+        # version de l'inventaire + chambres + images + tarifs
+        with self.assertNumQueries(4):
+            self.search('Lyon')
+    
+    def test_rebuild_invalidates_every_search(self):
+        self.book(2)
+        self.assertEqual(self.search('Paris').data['results'][0]['rooms_left'], 3)
+        
+        # Registre faussé puis recalculé depuis les réservations (aucune ici)
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('rebuild_inventory', stdout=StringIO())
+        self.assertEqual(self.search('Paris').data['results'][0]['rooms_left'], 5)
+    
+    def test_catalogue_and_rate_changes(self):
+        self.search('Paris')
+        RoomRate.objects.create(room_type=self.room, date=self.check_in + timedelta(days=1), price=300)
+        self.assertEqual(self.search('Paris').data['results'][0]['total_price'], '400.00')
+        
+        self.search('Lyon')
+        self.lyon.name = 'Hôtel Bellecour'
+        self.lyon.save()
+        self.assertEqual(self.search('Lyon').data['results'][0]['hotel_name'], 'Hôtel Bellecour')
+    
+    def test_web_search_api_cached(self):
+        payload = json.dumps({
+            'check_in': self.check_in.isoformat(),
+            'check_out': (self.check_in + timedelta(days=2)).isoformat(),
+            'city': 'Lyon',
+        })
+        first = self.client.post('/api/search/', payload, content_type='application/json').json()
+        with self.assertNumQueries(0):
+            second = self.client.post('/api/search/', payload, content_type='application/json').json()
+        self.assertEqual(first, second)
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.hotels = create_hotels(7, rooms_per_hotel=0)
+        for i, hotel in enumerate(self.hotels):
+            hotel.stars = i % 3 + 3
+            hotel.save()
+    
+    def walk(self, url, params):
+        """Suit les liens next; renvoie les pages d'ids et la dernière réponse"""
+        pages = []
+        response = self.client.get(url, params)
+        while True:
+            data = response.json()
+            self.assertNotIn('count', data)
+            pages.append([hotel['id'] for hotel in data['results']])
+            if data['next'] is None:
+                return pages, data
+            response = self.client.get(data['next'])
+    
+    def test_follows_next_then_previous(self):
+        pages, last = self.walk('/api/hotels/', {'page_size': 3, 'ordering': '-stars', 'fields': 'id'})
+        expected = [hotel.id for hotel in sorted(self.hotels, key=lambda hotel: (-hotel.stars, -hotel.id))]
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), expected)
+        
+        response = self.client.get(last['previous'])
+        self.assertEqual([hotel['id'] for hotel in response.json()['results']], pages[1])
+        self.assertIsNotNone(response.json()['next'])
+    
+    def test_ordering_by_name_and_first_page(self):
+        pages, _ = self.walk('/api/hotels/', {'page_size': 4, 'ordering': 'name', 'fields': 'id'})
+        self.assertEqual(sum(pages, []), [hotel.id for hotel in sorted(self.hotels, key=lambda hotel: hotel.name)])
+        self.assertIsNone(self.client.get('/api/hotels/', {'page_size': 4}).json()['previous'])
+    
+    def test_deep_page_one_query(self):
+        _, last = self.walk('/api/hotels/', {'page_size': 2, 'fields': 'id'})
+        # Page profonde: validateurs ETag + hôtels WHERE id > ..., ni OFFSET ni COUNT
+        with self.assertNumQueries(2):
+            response = self.client.get(last['previous'])
+        self.assertEqual(len(response.json()['results']), 2)
+    
+    def test_tampered_cursor(self):
+        self.assertEqual(self.client.get('/api/hotels/', {'cursor': 'abc'}).status_code, 404)
+        next_url = self.client.get('/api/hotels/', {'page_size': 2}).json()['next']
+        cursor = parse_qs(urlsplit(next_url).query)['cursor'][0]
+        self.assertEqual(self.client.get('/api/hotels/', {'cursor': cursor, 'page_size': 2}).status_code, 200)
+        self.assertEqual(self.client.get('/api/hotels/', {'cursor': cursor[:-3] + 'abc'}).status_code, 404)
+
+class SuggestTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        create_hotels(2, city='Saint-Étienne')
+        create_hotels(1, city='Paris')
+        self.lyon = create_hotels(3, rooms_per_hotel=1, city='Lyon')
+        suggest.index.rebuild()
+    
+    def tearDown(self):
+        # Index partagé par le processus: les hôtels des tests disparaissent au rollback
+        suggest.index.invalidate()
+    
+    def get(self, q, **params):
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/hotels/suggest/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+    
+    def test_fold(self):
+        self.assertEqual(suggest.fold("  Saint-Étienne L'Œuf "), 'saint etienne l oeuf')
+    
+    def test_accent_folded_prefix_popular_first(self):
+        self.assertEqual(self.get('st')['cities'], [])
+        self.assertEqual(self.get('saint e')['cities'], [{'name': 'Saint-Étienne', 'hotels': 2}])
+        self.assertEqual(self.get('ETIEN')['cities'], [{'name': 'Saint-Étienne', 'hotels': 2}])
+        # Villes: les plus fournies d'abord, y compris sans saisie
+        self.assertEqual([city['name'] for city in self.get('')['cities']], ['Lyon', 'Saint-Étienne', 'Paris'])
+        
+        # Hôtels: les plus réservés d'abord, par n'importe quel mot du nom
+        self.assertEqual(self.get('lyon', limit=2)['hotels'][0]['id'], self.lyon[0].id)
+        with self.captureOnCommitCallbacks(execute=True):
+            inventory.adjust(self.lyon[2].room_types.get(), timezone.now().date(), timezone.now().date() + timedelta(days=1), 2)
+        # Classement inchangé tant qu'il n'a pas ranking_max_age secondes
+        self.assertEqual(self.get('lyon', limit=2)['hotels'][0]['id'], self.lyon[0].id)
+        later = suggest.time.monotonic() + suggest.index.ranking_max_age + 1
+        with mock.patch.object(suggest.time, 'monotonic', return_value=later):
+            hotels = self.get('lyon', limit=2)['hotels']
+        self.assertEqual(hotels[0], {'id': self.lyon[2].id, 'name': 'Hôtel Lyon 2', 'city': 'Lyon'})
+        self.assertEqual(len(hotels), 2)
+    
+    def test_incremental_updates(self):
+        hotel = self.lyon[0]
+        hotel.name, hotel.city = 'Le Négresco', 'Nice'
+        with self.captureOnCommitCallbacks(execute=True):
+            hotel.save()
+        self.assertEqual(self.get('negr')['hotels'], [{'id': hotel.id, 'name': 'Le Négresco', 'city': 'Nice'}])
+        self.assertEqual(self.get('lyo')['cities'], [{'name': 'Lyon', 'hotels': 2}])
+        self.assertEqual(self.get('ni')['cities'], [{'name': 'Nice', 'hotels': 1}])
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            hotel.delete()
+        self.assertEqual(self.get('ni'), {'cities': [], 'hotels': []})
+        self.assertEqual(len(self.get('hotel', limit=20)['hotels']), 5)
+    
+    def test_rolled_back_change_not_indexed(self):
+        hotel = self.lyon[0]
+        # Pas de commit (transaction du test annulée): index inchangé
+        with self.captureOnCommitCallbacks():
+            hotel.name = 'Le Négresco'
+            hotel.save()
+        self.assertEqual(self.get('negr')['hotels'], [])
+    
+    def test_rebuilt_when_stale(self):
+        suggest.index.invalidate()
+        with self.assertNumQueries(2):
+            self.client.get('/api/hotels/suggest/', {'q': 'par'})
+        self.assertEqual(self.client.get('/api/hotels/suggest/', {'limit': 'x'}).status_code, 400)
+    
+    def test_web_search_page_lists_cities_without_query(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/search/')
+        self.assertEqual(response.context['cities'], ['Lyon', 'Saint-Étienne', 'Paris'])
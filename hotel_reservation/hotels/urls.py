@@ -1,9 +1,12 @@
 from django.urls import path
-from .views import HotelListCreateView, HotelDetailView, RoomTypeListView, SearchHotelsView
+from .views import (HotelListCreateView, HotelDetailView, RoomTypeListView, SearchHotelsView, HotelAvailabilityView,
+                    HotelSuggestView)
 
 urlpatterns = [
     path('', HotelListCreateView.as_view(), name='hotel-list'),
     path('<int:pk>/', HotelDetailView.as_view(), name='hotel-detail'),
     path('<int:hotel_id>/rooms/', RoomTypeListView.as_view(), name='room-list'),
+    path('<int:hotel_id>/availability/', HotelAvailabilityView.as_view(), name='hotel-availability'),
     path('search/', SearchHotelsView.as_view(), name='hotel-search'),
+    path('suggest/', HotelSuggestView.as_view(), name='hotel-suggest'),
 ]
\ No newline at end of file
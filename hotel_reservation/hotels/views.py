@@ -4,70 +4,281 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q, Count
+from django.http import Http404
+from django.utils import timezone
+from datetime import datetime, timedelta
 from .models import Hotel, RoomType
-from .serializers import HotelSerializer, RoomTypeSerializer, AvailableRoomSerializer
-from bookings.models import Booking
+from .filters import AmenityFilter, FullTextSearchFilter, GeoFilter
+from .serializers import (HotelSerializer, RoomTypeSerializer, AvailableRoomSerializer, AvailableRoomTypeSerializer,
+                          FlexibleSearchSerializer, FlexibleRoomTypeSerializer, QuoteSerializer, SearchFiltersSerializer,
+                          with_distance)
+from .search import find_available_rooms, find_cheapest_stays
+from . import amenities, facets, geo, pricing, search_cache, suggest
+from .quotes import quote_many, MAX_QUOTES, MAX_SPAN_DAYS
+from .availability import hotel_calendar, MAX_CALENDAR_DAYS
+from hotel_reservation.query_budget import query_budget
+from hotel_reservation.fast_serializers import FastListMixin, FastListSerializer
+from hotel_reservation.sparse_fields import SparseFieldsMixin
+from hotel_reservation.conditional import ConditionalGetMixin
+from hotel_reservation.pagination import KeysetPagination
 
-class HotelListCreateView(generics.ListCreateAPIView):
-    queryset = Hotel.objects.all()
+@query_budget(GET=6, POST=4)
+class HotelListCreateView(ConditionalGetMixin, SparseFieldsMixin, FastListMixin, generics.ListCreateAPIView):
+    queryset = Hotel.objects.order_by('id')
     serializer_class = HotelSerializer
+    expandable_fields = ('images',)
+    field_relations = {'images': ([], ['images'])}
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, AmenityFilter, FullTextSearchFilter, GeoFilter, filters.OrderingFilter]
     filterset_fields = ['city', 'country', 'stars', 'has_wifi', 'has_parking']
+    # ?amenities=wifi,pool,spa
+    amenity_fields = amenities.HOTEL_AMENITIES
     search_fields = ['name', 'city', 'country', 'description']
+    # ?search= via l'index plein texte (name, city, country, description), classé par bm25
+    search_index = 'hotels_hotel_fts'
+    search_rank_weights = (10.0, 5.0, 2.0, 1.0)
     ordering_fields = ['stars', 'name']
+    # Curseur sur (id), (name, id) ou (stars, id) selon ?ordering=, sans COUNT(*)
+    pagination_class = KeysetPagination
+    
+    def get_serializer_class(self):
+        # ?near=: chaque hôtel porte sa distance
+        if self.request.method == 'GET' and self.request.query_params.get('near'):
+            return with_distance(HotelSerializer)
+        return super().get_serializer_class()
+    
+    def wants_facets(self):
+        return self.request.query_params.get('facets') in ('1', 'true')
+    
+    def get_validator_extra(self):
+        # Les tranches de prix dépendent des types de chambre, absents des validateurs
+        return facets.generation() if self.wants_facets() else None
+    
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        # ?facets=1: comptes par ville, étoiles, équipement et tranche de prix de tous les résultats filtrés
+        if self.wants_facets():
+            response.data['facets'] = facets.hotel_facets(self.filter_queryset(self.get_queryset()), request.query_params)
+        return response
 
-class HotelDetailView(generics.RetrieveUpdateDestroyAPIView):
+@query_budget(5)
+class HotelDetailView(ConditionalGetMixin, SparseFieldsMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Hotel.objects.all()
     serializer_class = HotelSerializer
+    expandable_fields = ('images',)
+    field_relations = {'images': ([], ['images'])}
     permission_classes = [IsAuthenticatedOrReadOnly]
 
-class RoomTypeListView(generics.ListAPIView):
+@query_budget(6)
+class RoomTypeListView(ConditionalGetMixin, SparseFieldsMixin, FastListMixin, generics.ListAPIView):
     serializer_class = RoomTypeSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    # ?amenities=tv,balcony
+    filter_backends = [AmenityFilter]
+    amenity_fields = amenities.ROOM_AMENITIES
+    # hotel_name / hotel_city viennent de l'hôtel
+    last_modified_fields = ('updated_at', 'hotel__updated_at')
+    expandable_fields = ('images',)
+    field_relations = {
+        'images': ([], ['images']),
+        'hotel_name': (['hotel'], []),
+        'hotel_city': (['hotel'], []),
+    }
     
     def get_queryset(self):
         hotel_id = self.kwargs.get('hotel_id')
-        return RoomType.objects.filter(hotel_id=hotel_id)
+        return RoomType.objects.filter(hotel_id=hotel_id).order_by('id')
 
+@query_budget(5)
+class HotelAvailabilityView(APIView):
+    """Calendrier de disponibilité par nuit: GET /api/hotels/<id>/availability/?from=&to="""
+    permission_classes = [permissions.AllowAny]
+    
+    def get(self, request, hotel_id):
+        try:
+            start = self._parse_date(request.query_params.get('from')) or timezone.now().date()
+            end = self._parse_date(request.query_params.get('to')) or start + timedelta(days=30)
+        except ValueError:
+            return Response({"error": "Format de date invalide (AAAA-MM-JJ)"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if end <= start:
+            return Response({"error": "La date de fin doit être après la date de début"}, status=status.HTTP_400_BAD_REQUEST)
+        if (end - start).days > MAX_CALENDAR_DAYS:
+            return Response({"error": f"Période limitée à {MAX_CALENDAR_DAYS} jours"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Vérifie aussi que l'hôtel existe (même requête que la version du calendrier)
+        calendar = hotel_calendar(hotel_id, start, end)
+        if calendar is None:
+            raise Http404
+        return Response(calendar)
+    
+    def _parse_date(self, value):
+        if not value:
+            return None
+        return datetime.strptime(value, '%Y-%m-%d').date()
+
+@query_budget(2)
+class HotelSuggestView(APIView):
+    """Autocomplétion: GET /api/hotels/suggest/?q=&limit= -> villes et hôtels dont un mot commence par q.
+    
+    Servi par l'index en mémoire (aucune requête, sauf reconstruction),
+    sans accents ni casse; les plus populaires d'abord.
+    """
+    permission_classes = [permissions.AllowAny]
+    
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get('limit', suggest.DEFAULT_LIMIT))
+        except ValueError:
+            return Response({"error": "limit doit être un entier"}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(max(limit, 1), suggest.MAX_LIMIT)
+        return Response(suggest.suggest(request.query_params.get('q', ''), limit))
+
+# Pire cas mesuré: 6 requêtes (matrice d'occupation à reconstruire, cache froid);
+# une requête invalide est refusée avant toute lecture
+@query_budget(7)
 class SearchHotelsView(APIView):
     permission_classes = [permissions.AllowAny]  # Ici permissions est maintenant défini
     
     def post(self, request):
+        # Dates flexibles: période + durée du séjour au lieu de dates fixes
+        if 'nights' in request.data:
+            return self.flexible_search(request)
+        
         serializer = AvailableRoomSerializer(data=request.data)
         if serializer.is_valid():
             check_in = serializer.validated_data['check_in']
             check_out = serializer.validated_data['check_out']
             number_of_rooms = serializer.validated_data['number_of_rooms']
             number_of_guests = serializer.validated_data['number_of_guests']
-            city = request.data.get('city', '')
-            min_price = request.data.get('min_price')
-            max_price = request.data.get('max_price')
-            stars = request.data.get('stars')
-            
-            # Trouver les chambres disponibles
-            booked_rooms = Booking.objects.filter(
-                Q(check_in_date__lt=check_out) & Q(check_out_date__gt=check_in),
-                status__in=['confirmed', 'pending']
-            ).values_list('room_type_id', flat=True)
+            filters = self.search_filters(request)
             
-            # Filtrer les chambres
-            rooms = RoomType.objects.filter(
-                quantity_available__gte=number_of_rooms,
-                capacity__gte=number_of_guests
-            ).exclude(id__in=booked_rooms)
+            def search():
+                # Chambres ayant assez de disponibilité sur tout le séjour
+                rooms = find_available_rooms(
+                    check_in, check_out,
+                    number_of_rooms=number_of_rooms,
+                    number_of_guests=number_of_guests,
+                    city=filters['city'],
+                    min_price=filters['min_price'],
+                    max_price=filters['max_price'],
+                    stars=filters['stars'],
+                    area=filters['area'],
+                    amenity_masks=filters['amenity_masks']
+                )
+                
+                # Prix du séjour (tarifs par date), calculé pour toutes les chambres à la fois
+                rooms = pricing.annotate_stay_prices(rooms, check_in, check_out, number_of_rooms)
+                return self.results(rooms, AvailableRoomTypeSerializer, filters)
             
-            # Appliquer les filtres supplémentaires
-            if city:
-                rooms = rooms.filter(hotel__city__icontains=city)
-            if min_price:
-                rooms = rooms.filter(price_per_night__gte=min_price)
-            if max_price:
-                rooms = rooms.filter(price_per_night__lte=max_price)
-            if stars:
-                rooms = rooms.filter(hotel__stars=stars)
-            
-            serializer = RoomTypeSerializer(rooms, many=True)
-            return Response(serializer.data)
+            # Même recherche normalisée: servie depuis le cache tant qu'aucune écriture ne la concerne
+            return Response(search_cache.cached_search(
+                'rooms', {**serializer.validated_data, **filters}, check_in, check_out, search
+            ))
+        
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    def flexible_search(self, request):
+        """Séjours les moins chers de chaque type de chambre sur une période"""
+        serializer = FlexibleSearchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        filters = self.search_filters(request)
+        
+        def search():
+            rooms = find_cheapest_stays(
+                data['date_from'], data['date_to'], data['nights'],
+                number_of_rooms=data['number_of_rooms'],
+                number_of_guests=data['number_of_guests'],
+                city=filters['city'],
+                min_price=filters['min_price'],
+                max_price=filters['max_price'],
+                stars=filters['stars'],
+                limit=data['results_per_room'],
+                area=filters['area'],
+                amenity_masks=filters['amenity_masks']
+            )
+            return self.results(rooms, FlexibleRoomTypeSerializer, filters)
+        
+        return Response(search_cache.cached_search(
+            'flexible', {**data, **filters}, data['date_from'], data['date_to'], search
+        ))
+    
+    def search_filters(self, request):
+        """Filtres du corps de la requête communs aux deux modes (validés).
+        
+        Une valeur invalide lève ValidationError (400) avant toute recherche.
+        """
+        serializer = SearchFiltersSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        near, area = self.location(request)
+        return {
+            **serializer.validated_data,
+            'near': near,
+            'area': area,
+            'amenity_masks': self.amenity_masks(request),
+            'facets': str(request.data.get('facets', '')).lower() in ('1', 'true'),
+        }
+    
+    def location(self, request):
+        """(near, boîte) depuis near / radius_km / bbox du corps de la requête.
+        
+        near = (lat, lon, rayon) ou None; la boîte (bbox, ou celle qui
+        contient le cercle) est appliquée en SQL avant la disponibilité.
+        """
+        near = area = None
+        if request.data.get('bbox'):
+            area = geo.parse_bbox(request.data['bbox'])
+        if request.data.get('near'):
+            near = geo.parse_near(request.data['near'], request.data.get('radius_km'))
+            if area is None:
+                area = geo.around(*near)
+        return near, area
+    
+    def amenity_masks(self, request):
+        """amenities="wifi,pool,tv" -> (masque hôtel, masque chambre)"""
+        return tuple(amenities.parse(
+            request.data.get('amenities', ''), amenities.HOTEL_AMENITIES, amenities.ROOM_AMENITIES
+        ))
+    
+    def results(self, rooms, serializer_class, filters):
+        """(données de la réponse, ids des hôtels présents) pour les chambres trouvées.
+        
+        Toujours {"results": [...]}; avec near: chambres dans le rayon, de
+        l'hôtel le plus proche au plus loin. Avec facets: "facets" en plus,
+        comptées sur les résultats déjà chargés.
+        """
+        if filters['near'] is not None:
+            rooms = geo.by_distance(rooms, *filters['near'], hotel=lambda room: room.hotel)
+            serializer_class = with_distance(serializer_class)
+        rooms = list(rooms)
+        data = {'results': FastListSerializer(rooms, serializer_class).data}
+        if filters['facets']:
+            data['facets'] = facets.summarize(facets.room_facet_rows(rooms))
+        return data, [room.hotel_id for room in rooms]
+
+@query_budget(POST=4)
+class QuoteView(APIView):
+    """Devis groupés: POST /api/quotes/ avec une liste de {room_type, check_in, check_out, rooms}.
+    
+    Renvoie, dans le même ordre, disponibilité et prix total de chaque
+    élément (un hôtel entier, une grille de dates flexibles...).
+    """
+    permission_classes = [permissions.AllowAny]
+    
+    def post(self, request):
+        # Limite contrôlée avant de valider chaque élément
+        if isinstance(request.data, list) and len(request.data) > MAX_QUOTES:
+            return Response({"error": f"{MAX_QUOTES} devis au maximum par appel"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = QuoteSerializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        items = serializer.validated_data
+        if items and (max(i['check_out'] for i in items) - min(i['check_in'] for i in items)).days > MAX_SPAN_DAYS:
+            return Response({"error": f"Les séjours doivent tenir sur {MAX_SPAN_DAYS} jours"}, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response(QuoteSerializer(quote_many(items), many=True).data)